@@ -1,11 +1,15 @@
-from typing import Dict, List
-from langchain_openai import ChatOpenAI
+from collections import deque
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
-from config import LLMConfig, get_llm
+from config import LLMConfig, SimulationConfig, get_llm
+from utils.perf import AgentPerfMonitor
+from utils.ring_buffer import SpillingRingBuffer
 from prompts.director_prompt import get_director_system_prompt
-from prompts.scenarios import get_scenario_script
+from prompts.scenarios import get_scenario_script, fold_accents, TRIGGER_MATCHER
 
 
 def clean_text(text: str) -> str:
@@ -15,6 +19,79 @@ def clean_text(text: str) -> str:
     return text.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
 
 
+@lru_cache(maxsize=None)
+def format_script(scenario: str, current_stage: int) -> str:
+    """
+    Formate le script d'arnaque pour le prompt, étape actuelle marquée "→".
+
+    Les scripts étant statiques, le texte est calculé une seule fois par
+    (scénario, étape) et partagé par tous les Directeurs du processus.
+
+    Args:
+        scenario: Le nom du scénario
+        current_stage: L'index de l'étape actuelle
+
+    Returns:
+        str: Le script formaté en texte lisible
+    """
+    lines = []
+    for i, stage in enumerate(get_scenario_script(scenario)):
+        marker = "→ " if i == current_stage else "  "
+        lines.append(f"{marker}{i+1}. {stage['name']}: {stage['description']}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def render_stage_context(scenario: str, current_stage: int) -> str:
+    """
+    Partie fixe du prompt d'analyse pour un (scénario, étape) donné.
+
+    Args:
+        scenario: Le nom du scénario
+        current_stage: L'index de l'étape actuelle
+
+    Returns:
+        str: Scénario, script formaté et nom de l'étape actuelle
+    """
+    stage_name = get_scenario_script(scenario)[current_stage]["name"]
+    return f"""SCÉNARIO EN COURS: {scenario}
+
+SCRIPT D'ARNAQUE TYPE:
+{format_script(scenario, current_stage)}
+
+ÉTAPE ACTUELLE: {stage_name}"""
+
+
+@lru_cache(maxsize=None)
+def get_analysis_prompt() -> ChatPromptTemplate:
+    """
+    Template du prompt d'analyse, construit une fois par processus.
+
+    Returns:
+        ChatPromptTemplate: Prompt système du Directeur + demande d'analyse
+    """
+    return ChatPromptTemplate.from_messages([
+        ("system", get_director_system_prompt()),
+        ("human", """
+{stage_context}
+
+DERNIER MESSAGE DE L'ARNAQUEUR:
+"{scammer_message}"
+
+HISTORIQUE RÉCENT:
+{recent_history}
+
+ANALYSE REQUISE:
+1. À quelle étape du script sommes-nous ?
+2. L'arnaqueur a-t-il progressé ou est-il bloqué ?
+3. Quel devrait être le prochain objectif de Jeanne ?
+
+Réponds avec UN SEUL objectif clair et concis pour Jeanne.
+Format: "Objectif: [instruction précise]"
+""")
+    ])
+
+
 class DirectorAgent:
     """
     Agent superviseur qui analyse et dirige le scénario.
@@ -30,9 +107,10 @@ class DirectorAgent:
         script: Les étapes du script d'arnaque
         current_stage: L'étape actuelle du script
         analysis_chain: La chaîne LangChain pour l'analyse
+        quiet: Aucun affichage console (moteur multi-sessions)
     """
 
-    def __init__(self, scenario: str = "tech_support", model: str = None):
+    def __init__(self, scenario: str = "tech_support", model: str = None, quiet: bool = False):
         """
         Initialise le Directeur avec un scénario.
 
@@ -40,14 +118,20 @@ class DirectorAgent:
             scenario: Le type d'arnaque à simuler
                      ("tech_support", "bank_fraud", "lottery_scam")
             model: Modèle LLM (optionnel)
+            quiet: Aucun affichage console (changements d'étape, erreurs)
 
         EXPLICATION :
         Le Directeur utilise une température basse (0.3) car
         son analyse doit être précise et cohérente, pas créative.
         """
+        self.quiet = quiet
+        self.perf = AgentPerfMonitor("director", window=SimulationConfig.PERF_WINDOW)
+
         self.llm = get_llm(
             model=model,
-            temperature=0.3
+            temperature=0.3,
+            cache=True,
+            callbacks=[self.perf]
         )
 
 
@@ -55,7 +139,20 @@ class DirectorAgent:
         self.script = get_scenario_script(scenario)
         self.current_stage = 0
 
-        self.analysis_history: List[Dict] = []
+        # Dernières analyses en mémoire, les plus anciennes sur disque
+        self.analysis_history = SpillingRingBuffer(
+            SimulationConfig.ANALYSIS_HISTORY_SIZE,
+            name="director_analysis",
+            spill_dir=SimulationConfig.HISTORY_SPILL_DIR
+        )
+        self.analysis_count = 0
+        self.gated_count = 0
+
+        # Mode économe (SimulationConfig.DIRECTOR_GATING)
+        self.gating = SimulationConfig.DIRECTOR_GATING
+        self._recent_messages = deque(maxlen=SimulationConfig.DIRECTOR_DUPLICATE_WINDOW)
+        self._last_objective: Optional[str] = None
+        self._turns_since_analysis = 0
 
         self._create_analysis_chain()
 
@@ -68,33 +165,9 @@ class DirectorAgent:
 
         C'est une "chain" simple sans outils, car le Directeur
         n'a besoin que d'analyser et de produire du texte.
+        Le template du prompt est partagé par tous les Directeurs.
         """
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", get_director_system_prompt()),
-            ("human", """
-SCÉNARIO EN COURS: {scenario}
-
-SCRIPT D'ARNAQUE TYPE:
-{script}
-
-ÉTAPE ACTUELLE: {current_stage}
-
-DERNIER MESSAGE DE L'ARNAQUEUR:
-"{scammer_message}"
-
-HISTORIQUE RÉCENT:
-{recent_history}
-
-ANALYSE REQUISE:
-1. À quelle étape du script sommes-nous ?
-2. L'arnaqueur a-t-il progressé ou est-il bloqué ?
-3. Quel devrait être le prochain objectif de Jeanne ?
-
-Réponds avec UN SEUL objectif clair et concis pour Jeanne.
-Format: "Objectif: [instruction précise]"
-""")
-        ])
-
+        prompt = get_analysis_prompt()
         self.analysis_chain = prompt | self.llm | StrOutputParser()
 
     def analyze_and_update(
@@ -123,35 +196,151 @@ Format: "Objectif: [instruction précise]"
             "Feindre de ne pas comprendre ce qu'est 'accès à distance'"
         """
         try:
-            scammer_message = clean_text(scammer_message)
-            recent_history = clean_text(recent_history)
+            reason = self._gating_decision(scammer_message)
+            if reason is None:
+                return self._reuse_objective(scammer_message)
 
-            script_text = self._format_script()
+            inputs = self._prepare_analysis(scammer_message, recent_history)
+            result = self.analysis_chain.invoke(inputs)
+            return self._apply_analysis(inputs, result, reason)
 
-            result = self.analysis_chain.invoke({
-                "scenario": self.scenario,
-                "script": script_text,
-                "current_stage": self.script[self.current_stage]["name"],
-                "scammer_message": scammer_message,
-                "recent_history": recent_history
-            })
+        except Exception as e:
+            self._print(f"⚠️ Erreur Directeur: {e}")
+            return "Continuer à être confuse et lente."
+
+    async def aanalyze_and_update(
+        self,
+        scammer_message: str,
+        recent_history: str = ""
+    ) -> str:
+        """
+        Version asynchrone de analyze_and_update.
 
-            objective = self._parse_objective(result)
+        Utilise ainvoke sur la chaîne d'analyse : l'appel au LLM ne bloque
+        pas la boucle asyncio et peut tourner en parallèle d'autres tâches.
 
-            self.analysis_history.append({
-                "scammer_message": scammer_message,
-                "stage": self.current_stage,
-                "objective": objective
-            })
+        Args:
+            scammer_message: Le dernier message de l'arnaqueur
+            recent_history: Les derniers échanges pour le contexte
 
-            self._check_stage_progression(scammer_message)
+        Returns:
+            str: Le nouvel objectif pour l'agent Victime
+        """
+        try:
+            reason = self._gating_decision(scammer_message)
+            if reason is None:
+                return self._reuse_objective(scammer_message)
 
-            return objective
+            inputs = self._prepare_analysis(scammer_message, recent_history)
+            result = await self.analysis_chain.ainvoke(inputs)
+            return self._apply_analysis(inputs, result, reason)
 
         except Exception as e:
-            print(f"⚠️ Erreur Directeur: {e}")
+            self._print(f"⚠️ Erreur Directeur: {e}")
             return "Continuer à être confuse et lente."
 
+    def _prepare_analysis(self, scammer_message: str, recent_history: str) -> Dict:
+        """
+        Construit les variables du prompt d'analyse.
+
+        Args:
+            scammer_message: Le dernier message de l'arnaqueur
+            recent_history: Les derniers échanges pour le contexte
+
+        Returns:
+            Dict: Les variables de la chaîne d'analyse
+        """
+        return {
+            "stage_context": render_stage_context(self.scenario, self.current_stage),
+            "scammer_message": clean_text(scammer_message),
+            "recent_history": clean_text(recent_history)
+        }
+
+    def _apply_analysis(self, inputs: Dict, llm_response: str, reason: str = "analyse") -> str:
+        """
+        Extrait l'objectif, l'historise et fait progresser le script.
+
+        Args:
+            inputs: Les variables envoyées à la chaîne d'analyse
+            llm_response: La réponse brute du LLM
+            reason: Pourquoi l'analyse a eu lieu (voir _gating_decision)
+
+        Returns:
+            str: Le nouvel objectif pour l'agent Victime
+        """
+        objective = self._parse_objective(llm_response)
+
+        self.analysis_history.append({
+            "scammer_message": inputs["scammer_message"],
+            "stage": self.current_stage,
+            "objective": objective,
+            "gated": False,
+            "reason": reason
+        })
+        self.analysis_count += 1
+
+        self._check_stage_progression(inputs["scammer_message"])
+
+        self._last_objective = objective
+        self._turns_since_analysis = 0
+
+        return objective
+
+    def _gating_decision(self, scammer_message: str) -> Optional[str]:
+        """
+        Décide si le message mérite une analyse par le LLM.
+
+        Sans mode économe, tous les messages sont analysés. Sinon, on
+        réutilise l'objectif courant quand rien n'a changé : aucun
+        mot-clé du script (donc pas de changement d'étape) et un message
+        quasi identique à l'un des derniers reçus.
+
+        Args:
+            scammer_message: Le message de l'arnaqueur
+
+        Returns:
+            Optional[str]: La raison de l'analyse, ou None pour la sauter
+        """
+        folded = fold_accents(scammer_message)
+        recent = list(self._recent_messages)
+        self._recent_messages.append(folded)
+
+        if not self.gating:
+            return "analyse"
+        if self._last_objective is None:
+            return "premier message"
+        if self._turns_since_analysis + 1 >= SimulationConfig.DIRECTOR_REANALYZE_EVERY:
+            return "analyse périodique"
+        if TRIGGER_MATCHER.score(self.scenario, scammer_message):
+            return "mots-clés du script"
+
+        threshold = SimulationConfig.DIRECTOR_DUPLICATE_THRESHOLD
+        if not any(SequenceMatcher(None, folded, previous).ratio() >= threshold for previous in recent):
+            return "message nouveau"
+
+        return None
+
+    def _reuse_objective(self, scammer_message: str) -> str:
+        """
+        Garde l'objectif courant sans appeler le LLM et l'historise.
+
+        Args:
+            scammer_message: Le message de l'arnaqueur
+
+        Returns:
+            str: L'objectif courant
+        """
+        self._turns_since_analysis += 1
+        self.analysis_history.append({
+            "scammer_message": clean_text(scammer_message),
+            "stage": self.current_stage,
+            "objective": self._last_objective,
+            "gated": True,
+            "reason": "message répété, aucun mot-clé"
+        })
+        self.gated_count += 1
+        return self._last_objective
+
     def _format_script(self) -> str:
         """
         Formate le script d'arnaque pour le prompt.
@@ -159,11 +348,7 @@ Format: "Objectif: [instruction précise]"
         Returns:
             str: Le script formaté en texte lisible
         """
-        lines = []
-        for i, stage in enumerate(self.script):
-            marker = "→ " if i == self.current_stage else "  "
-            lines.append(f"{marker}{i+1}. {stage['name']}: {stage['description']}")
-        return "\n".join(lines)
+        return format_script(self.scenario, self.current_stage)
 
     def _parse_objective(self, llm_response: str) -> str:
         """
@@ -191,20 +376,25 @@ Format: "Objectif: [instruction précise]"
         """
         Vérifie si l'arnaqueur a fait progresser le script.
 
-        Détecte des mots-clés pour passer à l'étape suivante.
+        Toutes les étapes sont notées en un passage (sans tenir compte
+        des accents) : si le message contient des mots-clés de l'étape
+        actuelle ou d'une étape ultérieure, on passe à l'étape qui suit
+        la plus avancée, quitte à en sauter plusieurs.
 
         Args:
             scammer_message: Le message à analyser
         """
-        message_lower = scammer_message.lower()
-        current_triggers = self.script[self.current_stage].get("triggers", [])
-
-        for trigger in current_triggers:
-            if trigger.lower() in message_lower:
-                if self.current_stage < len(self.script) - 1:
-                    self.current_stage += 1
-                    print(f"🎬 SCRIPT: Passage à l'étape {self.current_stage + 1}")
-                break
+        scores = TRIGGER_MATCHER.score(self.scenario, scammer_message)
+        reached = [stage for stage in scores if stage >= self.current_stage]
+        if not reached:
+            return
+
+        target = min(max(reached) + 1, len(self.script) - 1)
+        if target > self.current_stage:
+            skipped = target - self.current_stage - 1
+            self.current_stage = target
+            suffix = f" ({skipped} étape(s) sautée(s))" if skipped else ""
+            self._print(f"🎬 SCRIPT: Passage à l'étape {self.current_stage + 1}{suffix}")
 
     def get_current_stage_info(self) -> Dict:
         """
@@ -231,6 +421,16 @@ Format: "Objectif: [instruction précise]"
             self.script = get_scenario_script(scenario)
 
         self.current_stage = 0
-        self.analysis_history = []
-        print(f"🔄 Directeur réinitialisé. Scénario: {self.scenario}")
+        self.analysis_history.clear()
+        self.analysis_count = 0
+        self.gated_count = 0
+        self._recent_messages.clear()
+        self._last_objective = None
+        self._turns_since_analysis = 0
+        self._print(f"🔄 Directeur réinitialisé. Scénario: {self.scenario}")
+
+    def _print(self, message: str):
+        """Affiche un message dans la console, sauf en mode silencieux."""
+        if not self.quiet:
+            print(message)
 
@@ -19,12 +19,15 @@ EXEMPLES DE PROPOSITIONS :
 """
 
 from typing import List, Optional, Dict
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 import random
 
-from config import LLMConfig, get_llm
+from config import LLMConfig, SimulationConfig, get_llm
+from utils.perf import AgentPerfMonitor
+from utils.proposal_intake import ProposalIntake, ACCEPTED, FILTERED
+from utils.ring_buffer import SpillingRingBuffer
+from utils.vote_engine import VoteWindow, VoteSimulator, VOTE_CLOSED
 from prompts.moderator_prompt import get_moderator_system_prompt
 
 
@@ -41,26 +44,48 @@ class ModeratorAgent:
 
     Attributes:
         llm: Le modèle de langage pour le filtrage
-        pending_proposals: Propositions en attente
-        vote_history: Historique des votes
+        intake: Collecte en flux des propositions (pré-filtre, liste courte)
+        pending_proposals: Propositions envoyées au dernier filtrage
+        vote_history: Historique des votes (les plus anciens sur disque)
         filter_chain: Chaîne pour filtrer les propositions
+        quiet: Aucun affichage console (moteur multi-sessions)
     """
 
-    def __init__(self, model: str = None):
+    def __init__(self, model: str = None, quiet: bool = False):
         """
         Initialise le Modérateur.
 
         Args:
             model: Modèle LLM (optionnel)
+            quiet: Aucun affichage console (propositions, erreurs)
         """
+        self.quiet = quiet
+        self.perf = AgentPerfMonitor("moderator", window=SimulationConfig.PERF_WINDOW)
+
         self.llm = get_llm(
             model=model,
-            temperature=0.5
+            temperature=0.5,
+            cache=True,
+            callbacks=[self.perf]
         )
 
+        self.intake = ProposalIntake(
+            rate_per_minute=SimulationConfig.PROPOSAL_RATE_PER_MINUTE,
+            burst=SimulationConfig.PROPOSAL_BURST
+        )
         self.pending_proposals: List[str] = []
 
-        self.vote_history: List[Dict] = []
+        self.vote_history = SpillingRingBuffer(
+            SimulationConfig.VOTE_HISTORY_SIZE,
+            name="votes",
+            spill_dir=SimulationConfig.HISTORY_SPILL_DIR
+        )
+
+        # Vote en direct (serveur d'audience) et audience simulée
+        self.live_vote: Optional[VoteWindow] = None
+        self.vote_simulator = VoteSimulator(seed=SimulationConfig.VOTE_SEED)
+        # Tirages des propositions par défaut (reproductibles avec VOTE_SEED)
+        self._rng = random.Random(SimulationConfig.VOTE_SEED)
 
         self._create_filter_chain()
 
@@ -97,27 +122,31 @@ Réponds avec exactement 3 propositions, une par ligne, format:
 
         self.filter_chain = prompt | self.llm | StrOutputParser()
 
-    def add_proposal(self, proposal: str) -> bool:
+    def add_proposal(self, proposal: str, source: str = "local") -> bool:
         """
         Ajoute une proposition de l'audience.
 
+        La proposition passe par la collecte en flux (pré-filtre, limite
+        de débit par source) et est comptée tout de suite dans la liste
+        courte, sans jamais bloquer.
+
         Args:
             proposal: La proposition à ajouter
+            source: Identifiant du spectateur
 
         Returns:
             bool: True si ajoutée, False si rejetée immédiatement
         """
-        if len(proposal.strip()) < 5:
-            return False
+        status = self.intake.submit(proposal, source)
 
-        forbidden_words = ["mort", "tuer", "suicide", "violence"]
-        if any(word in proposal.lower() for word in forbidden_words):
-            print(f"⚠️ Proposition rejetée (contenu interdit)")
-            return False
+        if status == ACCEPTED:
+            self._print(f"✅ Proposition ajoutée: '{proposal[:50]}...'")
+        elif status == FILTERED:
+            self._print("⚠️ Proposition rejetée (trop courte ou contenu interdit)")
+        else:
+            self._print("⚠️ Trop de propositions d'affilée, patientez un peu")
 
-        self.pending_proposals.append(proposal.strip())
-        print(f"✅ Proposition ajoutée: '{proposal[:50]}...'")
-        return True
+        return status == ACCEPTED
 
     def generate_choices(self, context: str = "") -> List[str]:
         """
@@ -131,29 +160,76 @@ Réponds avec exactement 3 propositions, une par ligne, format:
         Returns:
             List[str]: Les 3 propositions à voter
         """
-        if len(self.pending_proposals) < 3:
-            self._add_default_proposals()
-
         try:
-            proposals_text = "\n".join([
-                f"- {p}" for p in self.pending_proposals
-            ])
+            result = self.filter_chain.invoke(self._prepare_filter_inputs(context))
+            return self._consume_choices(result)
+
+        except Exception as e:
+            self._print(f"⚠️ Erreur Modérateur: {e}")
+            return self._get_fallback_choices()
 
-            result = self.filter_chain.invoke({
-                "context": context or "Conversation en cours",
-                "proposals": proposals_text
-            })
+    async def agenerate_choices(self, context: str = "") -> List[str]:
+        """
+        Version asynchrone de generate_choices.
 
-            choices = self._parse_choices(result)
+        Utilise ainvoke sur la chaîne de filtrage pour ne pas bloquer
+        la boucle asyncio pendant l'appel au LLM.
 
-            self.pending_proposals = []
+        Args:
+            context: Le contexte actuel de la conversation
 
-            return choices
+        Returns:
+            List[str]: Les 3 propositions à voter
+        """
+        try:
+            result = await self.filter_chain.ainvoke(self._prepare_filter_inputs(context))
+            return self._consume_choices(result)
 
         except Exception as e:
-            print(f"⚠️ Erreur Modérateur: {e}")
+            self._print(f"⚠️ Erreur Modérateur: {e}")
             return self._get_fallback_choices()
 
+    def _prepare_filter_inputs(self, context: str) -> Dict:
+        """
+        Complète les propositions si besoin et construit les variables du prompt.
+
+        Args:
+            context: Le contexte actuel de la conversation
+
+        Returns:
+            Dict: Les variables de la chaîne de filtrage
+        """
+        # Seule la liste courte (taille fixe) part dans le prompt ; les
+        # propositions reçues pendant l'appel au LLM iront au vote suivant
+        self.pending_proposals = self.intake.drain(SimulationConfig.PROPOSAL_SHORTLIST_SIZE)
+        if len(self.pending_proposals) < 3:
+            self._add_default_proposals()
+
+        proposals_text = "\n".join([
+            f"- {p}" for p in self.pending_proposals
+        ])
+
+        return {
+            "context": context or "Conversation en cours",
+            "proposals": proposals_text
+        }
+
+    def _consume_choices(self, llm_response: str) -> List[str]:
+        """
+        Extrait les choix de la réponse du LLM et oublie les propositions envoyées.
+
+        Args:
+            llm_response: La réponse brute du LLM
+
+        Returns:
+            List[str]: Les 3 choix extraits
+        """
+        choices = self._parse_choices(llm_response)
+
+        self.pending_proposals = []
+
+        return choices
+
     def _add_default_proposals(self):
         """
         Ajoute des propositions par défaut si l'audience n'en a pas assez.
@@ -170,7 +246,7 @@ Réponds avec exactement 3 propositions, une par ligne, format:
         ]
 
         while len(self.pending_proposals) < 5:
-            choice = random.choice(defaults)
+            choice = self._rng.choice(defaults)
             if choice not in self.pending_proposals:
                 self.pending_proposals.append(choice)
 
@@ -194,7 +270,7 @@ Réponds avec exactement 3 propositions, une par ligne, format:
                     choices.append(clean)
 
         while len(choices) < 3:
-            choices.append(random.choice(self._get_fallback_choices()))
+            choices.append(self._rng.choice(self._get_fallback_choices()))
 
         return choices[:3]
 
@@ -211,20 +287,22 @@ Réponds avec exactement 3 propositions, une par ligne, format:
             "La ligne téléphonique grésille"
         ]
 
-    def run_vote(self, choices: List[str], simulate: bool = True) -> Dict:
+    def run_vote(self, choices: List[str], simulate: bool = True, votes: Optional[List[int]] = None) -> Dict:
         """
         Lance un vote sur les 3 propositions.
 
         Args:
             choices: Les 3 propositions à voter
             simulate: Si True, simule des votes aléatoires
+            votes: Votes déjà comptés (rejeu d'une cassette) : ni simulation ni saisie
 
         Returns:
             Dict: Résultat du vote avec le gagnant
         """
-        if simulate:
-            total_votes = 100
-            votes = self._simulate_votes(len(choices), total_votes)
+        if votes is not None:
+            votes = list(votes)
+        elif simulate:
+            votes = self._simulate_votes(len(choices), SimulationConfig.SIMULATED_AUDIENCE_SIZE)
         else:
             votes = [0] * len(choices)
             print("\n👥 VOTE DE L'AUDIENCE:")
@@ -238,6 +316,73 @@ Réponds avec exactement 3 propositions, une par ligne, format:
             except ValueError:
                 votes[0] = 1
 
+        return self._record_vote(choices, votes)
+
+    def open_vote(self, choices: List[str], duration: Optional[float] = None):
+        """
+        Ouvre un vote en direct (votes reçus par le serveur d'audience).
+
+        Args:
+            choices: Les propositions à voter
+            duration: Durée du vote en secondes (None = jusqu'à close_vote)
+        """
+        self.live_vote = VoteWindow(choices, duration)
+
+    def cast_vote(self, client_id: str, choice_index: int) -> str:
+        """
+        Enregistre le vote d'un spectateur (un seul vote par spectateur).
+
+        Args:
+            client_id: Identifiant du spectateur
+            choice_index: Index du choix (à partir de 0)
+
+        Returns:
+            str: "accepted", "duplicate", "invalid" ou "closed"
+        """
+        vote = self.live_vote
+        if vote is None:
+            return VOTE_CLOSED
+        return vote.cast(client_id, choice_index)
+
+    def get_live_vote(self) -> Optional[Dict]:
+        """
+        Retourne l'état du vote en cours.
+
+        Returns:
+            Optional[Dict]: Choix, votes et secondes restantes, ou None si aucun vote n'est ouvert
+        """
+        vote = self.live_vote
+        if vote is None:
+            return None
+        return {"choices": vote.choices, "votes": vote.tally(), "remaining_seconds": vote.remaining()}
+
+    def close_vote(self) -> Optional[Dict]:
+        """
+        Ferme le vote en direct et calcule le résultat.
+
+        Returns:
+            Optional[Dict]: Résultat du vote, ou None si personne n'a voté
+        """
+        vote, self.live_vote = self.live_vote, None
+        if vote is None:
+            return None
+
+        votes = vote.close()
+        if not any(votes):
+            return None
+        return self._record_vote(vote.choices, votes)
+
+    def _record_vote(self, choices: List[str], votes: List[int]) -> Dict:
+        """
+        Calcule le gagnant et historise le vote.
+
+        Args:
+            choices: Les propositions votées
+            votes: Votes par proposition
+
+        Returns:
+            Dict: Résultat du vote avec le gagnant
+        """
         winner_idx = votes.index(max(votes))
         winner = choices[winner_idx]
         total = sum(votes)
@@ -258,6 +403,10 @@ Réponds avec exactement 3 propositions, une par ligne, format:
         """
         Simule une distribution de votes réaliste.
 
+        Préférences du public tirées d'une loi de Dirichlet, puis votes
+        multinomiaux (voir VoteSimulator) : le coût ne dépend pas du
+        nombre de votants.
+
         Args:
             num_choices: Nombre de choix
             total_votes: Nombre total de votes
@@ -265,15 +414,7 @@ Réponds avec exactement 3 propositions, une par ligne, format:
         Returns:
             List[int]: Votes par choix
         """
-        weights = [random.random() for _ in range(num_choices)]
-        total_weight = sum(weights)
-        votes = [int(w/total_weight * total_votes) for w in weights]
-
-        diff = total_votes - sum(votes)
-        if diff > 0:
-            votes[0] += diff
-
-        return votes
+        return self.vote_simulator.simulate(num_choices, total_votes)
 
     def format_vote_result(self, result: Dict) -> str:
         """
@@ -304,6 +445,13 @@ Réponds avec exactement 3 propositions, une par ligne, format:
         Réinitialise le Modérateur.
         """
         self.pending_proposals = []
-        self.vote_history = []
-        print("🔄 Modérateur réinitialisé.")
+        self.intake.clear()
+        self.close_vote()
+        self.vote_history.clear()
+        self._print("🔄 Modérateur réinitialisé.")
+
+    def _print(self, message: str):
+        """Affiche un message dans la console, sauf en mode silencieux."""
+        if not self.quiet:
+            print(message)
 
@@ -1,12 +1,12 @@
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain_openai import ChatOpenAI
 from langchain.memory import ConversationBufferMemory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-from config import LLMConfig, get_llm
-from tools.audio_tools import get_audio_tools
+from config import LLMConfig, SimulationConfig, get_llm
+from tools.audio_tools import SoundEffectEvent, effect_events, get_audio_tools
 from prompts.victim_prompt import get_victim_system_prompt
+from utils.perf import AgentPerfMonitor
 
 
 def clean_text(text: str) -> str:
@@ -16,6 +16,16 @@ def clean_text(text: str) -> str:
     return text.encode('utf-8', errors='ignore').decode('utf-8', errors='ignore')
 
 
+def _chunk_text(content) -> str:
+    """Extrait le texte d'un chunk de message (str ou liste de parts)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content
+    )
+
+
 class VictimAgent:
     """
     Agent LLM représentant Mme Jeanne Dubois.
@@ -30,16 +40,19 @@ class VictimAgent:
         tools: Liste des outils audio disponibles
         memory: Mémoire conversationnelle
         agent_executor: L'exécuteur d'agent LangChain
+        last_effects: Effets sonores joués pendant la dernière réponse
         current_objective: Objectif courant défini par le Directeur
         audience_constraint: Contrainte temporaire de l'audience
+        quiet: Aucun affichage console (moteur multi-sessions)
     """
 
-    def __init__(self, model: str = None):
+    def __init__(self, model: str = None, quiet: bool = False):
         """
         Initialise l'agent Victime.
 
         Args:
             model: Nom du modèle LLM à utiliser (défaut: config)
+            quiet: Aucun affichage console (ni objectifs, ni trace de l'agent)
 
         EXPLICATION :
         1. On crée le LLM avec la clé API de l'environnement
@@ -47,24 +60,52 @@ class VictimAgent:
         3. On initialise la mémoire conversationnelle
         4. On crée l'agent avec le prompt système
         """
+        self.quiet = quiet
+        self.perf = AgentPerfMonitor("victim", window=SimulationConfig.PERF_WINDOW)
+
         self.llm = get_llm(
             model=model,
-            temperature=0.8
+            temperature=0.8,
+            callbacks=[self.perf]
         )
 
         self.tools = get_audio_tools()
 
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            input_key="input"
-        )
+        self.memory = self._create_memory(model)
 
         self.current_objective = "Répondre poliment mais lentement."
         self.audience_constraint = None
+        self.last_effects: List[SoundEffectEvent] = []
 
         self._create_agent()
 
+    def _create_memory(self, model: str = None):
+        """
+        Crée la mémoire conversationnelle selon SimulationConfig.VICTIM_MEMORY.
+
+        - "buffer" : tout l'historique est renvoyé à chaque appel
+        - "summary" : les derniers échanges tels quels + un résumé des plus
+          anciens, calculé en arrière-plan, dans un budget de tokens fixe
+        """
+        if SimulationConfig.VICTIM_MEMORY == "summary":
+            from utils.summary_memory import BudgetedSummaryMemory
+            return BudgetedSummaryMemory(
+                llm=get_llm(model=model, temperature=0.2),
+                memory_key="chat_history",
+                return_messages=True,
+                input_key="input",
+                output_key="output",
+                keep_exchanges=SimulationConfig.VICTIM_MEMORY_KEEP_EXCHANGES,
+                max_tokens=SimulationConfig.VICTIM_MEMORY_TOKEN_BUDGET
+            )
+
+        return ConversationBufferMemory(
+            memory_key="chat_history",
+            return_messages=True,
+            input_key="input",
+            output_key="output"
+        )
+
     def _create_agent(self):
         """
         Crée l'AgentExecutor LangChain avec les Tools.
@@ -100,9 +141,11 @@ class VictimAgent:
             agent=agent,
             tools=self.tools,
             memory=self.memory,
-            verbose=True,
+            verbose=not self.quiet,
             handle_parsing_errors=True,
-            max_iterations=3
+            max_iterations=3,
+            return_intermediate_steps=True,
+            callbacks=[self.perf]
         )
 
     def update_objective(self, new_objective: str):
@@ -119,7 +162,7 @@ class VictimAgent:
             agent.update_objective("Faire croire que l'ordinateur ne démarre pas")
         """
         self.current_objective = new_objective
-        print(f"🎬 DIRECTEUR: Nouvel objectif → {new_objective}")
+        self._print(f"🎬 DIRECTEUR: Nouvel objectif → {new_objective}")
 
     def set_audience_constraint(self, constraint: Optional[str]):
         """
@@ -134,7 +177,7 @@ class VictimAgent:
         """
         self.audience_constraint = constraint
         if constraint:
-            print(f"👥 AUDIENCE: Contrainte appliquée → {constraint}")
+            self._print(f"👥 AUDIENCE: Contrainte appliquée → {constraint}")
 
     def respond(self, scammer_message: str) -> str:
         """
@@ -159,22 +202,111 @@ class VictimAgent:
              [SOUND_EFFECT: DOG_BARKING]
              POUPOUNE ! Pas maintenant !"
         """
+        self.last_effects = []
         try:
-            scammer_message = clean_text(scammer_message)
+            result = self.agent_executor.invoke(self._build_inputs(scammer_message))
+            self.last_effects = effect_events(result["intermediate_steps"])
+            return result["output"]
+
+        except Exception as e:
+            self._print(f"⚠️ Erreur agent: {e}")
+            return "Oh... Excusez-moi, je n'ai pas bien compris... Vous pouvez répéter ?"
+
+    async def arespond(self, scammer_message: str) -> str:
+        """
+        Version asynchrone de respond.
 
+        Utilise ainvoke sur l'AgentExecutor (LLM et outils compris) :
+        plusieurs simulations peuvent partager la même boucle asyncio.
 
-            result = self.agent_executor.invoke({
-                "input": scammer_message,
-                "current_objective": self.current_objective,
-                "audience_constraint": self.audience_constraint or "Aucune contrainte spéciale."
-            })
+        Args:
+            scammer_message: Le message de l'arnaqueur
 
+        Returns:
+            str: La réponse de Jeanne (peut inclure des effets sonores)
+        """
+        self.last_effects = []
+        try:
+            result = await self.agent_executor.ainvoke(self._build_inputs(scammer_message))
+            self.last_effects = effect_events(result["intermediate_steps"])
             return result["output"]
 
         except Exception as e:
-            print(f"⚠️ Erreur agent: {e}")
+            self._print(f"⚠️ Erreur agent: {e}")
+            return "Oh... Excusez-moi, je n'ai pas bien compris... Vous pouvez répéter ?"
+
+    async def astream_respond(
+        self,
+        scammer_message: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_effect: Optional[Callable[[SoundEffectEvent], None]] = None
+    ) -> str:
+        """
+        Génère la réponse de Jeanne en streaming, token par token.
+
+        S'appuie sur astream_events de l'AgentExecutor : chaque token du LLM
+        est transmis à on_token dès son arrivée, et chaque effet sonore est
+        transmis à on_effect dès que l'outil qui le joue se termine.
+
+        Args:
+            scammer_message: Le message de l'arnaqueur
+            on_token: Callback appelé avec chaque morceau de texte
+            on_effect: Callback appelé avec chaque effet joué par un outil
+
+        Returns:
+            str: La réponse finale de Jeanne (sortie de l'AgentExecutor)
+        """
+        self.last_effects = []
+        chunks: List[str] = []
+        output = None
+
+        try:
+            async for event in self.agent_executor.astream_events(
+                self._build_inputs(scammer_message),
+                version="v2"
+            ):
+                kind = event["event"]
+
+                if kind == "on_chat_model_stream":
+                    text = _chunk_text(event["data"]["chunk"].content)
+                    if not text:
+                        continue
+                    chunks.append(text)
+                    if on_token:
+                        on_token(text)
+
+                elif kind == "on_tool_end":
+                    effect = event["data"].get("output")
+                    if isinstance(effect, SoundEffectEvent):
+                        self.last_effects.append(effect)
+                        if on_effect:
+                            on_effect(effect)
+
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    output = event["data"].get("output", {}).get("output")
+
+            return output if output is not None else "".join(chunks)
+
+        except Exception as e:
+            self._print(f"⚠️ Erreur agent: {e}")
             return "Oh... Excusez-moi, je n'ai pas bien compris... Vous pouvez répéter ?"
 
+    def _build_inputs(self, scammer_message: str) -> Dict:
+        """
+        Construit les variables d'entrée de l'AgentExecutor.
+
+        Args:
+            scammer_message: Le message de l'arnaqueur
+
+        Returns:
+            Dict: Message nettoyé, objectif et contrainte courants
+        """
+        return {
+            "input": clean_text(scammer_message),
+            "current_objective": self.current_objective,
+            "audience_constraint": self.audience_constraint or "Aucune contrainte spéciale."
+        }
+
     def reset(self):
         """
         Réinitialise l'agent pour une nouvelle simulation.
@@ -184,5 +316,11 @@ class VictimAgent:
         self.memory.clear()
         self.current_objective = "Répondre poliment mais lentement."
         self.audience_constraint = None
-        print("🔄 Agent Victime réinitialisé.")
+        self.last_effects = []
+        self._print("🔄 Agent Victime réinitialisé.")
+
+    def _print(self, message: str):
+        """Affiche un message dans la console, sauf en mode silencieux."""
+        if not self.quiet:
+            print(message)
 
@@ -0,0 +1,6 @@
+"""
+Benchmarks de la boucle de simulation.
+
+Lancement depuis la racine du projet :
+    python -m benchmarks.turn_pipeline --help
+"""
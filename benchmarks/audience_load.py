@@ -0,0 +1,213 @@
+"""
+Générateur de charge du serveur d'audience
+==========================================
+
+Simule un public qui envoie des propositions et des votes au serveur
+d'audience (utils/audience_server.py) et mesure le débit (requêtes/s),
+la latence (p50/p95/p99) et la répartition des codes de réponse.
+
+Chaque spectateur simulé garde sa connexion ouverte (keep-alive) ;
+les spectateurs sont répartis sur plusieurs processus pour que le
+générateur ne soit pas lui-même limité par le GIL.
+
+Chaque spectateur simulé demande d'abord son jeton (GET /token), puis
+l'envoie avec chacune de ses propositions et chacun de ses votes.
+
+Exemples :
+    # Lance un serveur (provider factice) dans un sous-processus et le charge
+    python -m benchmarks.audience_load --spawn --processes 4 --clients 50
+
+    # Charge un serveur déjà lancé (python main.py --serve-audience)
+    python -m benchmarks.audience_load --url http://127.0.0.1:8765
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.perf import percentiles
+
+
+PROPOSALS = [
+    "Quelqu'un sonne à la porte",
+    "Le chien Poupoune veut sortir",
+    "La bouilloire siffle",
+    "Jeanne renverse son café sur le clavier",
+    "Le chat saute sur la table",
+    "Un voisin l'appelle par la fenêtre",
+    "La télévision change de chaîne toute seule",
+    "Elle ne trouve plus ses lunettes",
+]
+
+
+def serve(port: int):
+    """
+    Lance un serveur d'audience autonome avec un vote ouvert (provider factice).
+
+    Args:
+        port: Port d'écoute
+    """
+    from config import LLMConfig
+    from agents.moderator_agent import ModeratorAgent
+    from utils.audience_server import AudienceServer
+
+    LLMConfig.PROVIDER = "fake"
+    moderator = ModeratorAgent()
+    moderator.open_vote(moderator._get_fallback_choices())
+
+    server = AudienceServer(moderator, port=port)
+    server.start()
+    print(f"READY {server.url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def _client(host: str, port: int, requests: int, vote_ratio: float, seed: int) -> Dict:
+    """Un spectateur : une connexion keep-alive, propositions et votes mélangés."""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.request("GET", "/token")
+    token = json.loads(connection.getresponse().read())["token"]
+    latencies: List[float] = []
+    codes: Counter = Counter()
+
+    for i in range(requests):
+        if rng.random() < vote_ratio:
+            path, body = "/votes", {"token": token, "choice": rng.randint(1, 3)}
+        else:
+            path, body = "/proposals", {"token": token, "text": f"{rng.choice(PROPOSALS)} ({i})"}
+
+        data = json.dumps(body).encode("utf-8")
+        start = time.perf_counter()
+        try:
+            connection.request("POST", path, body=data, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            codes[response.status] += 1
+        except (OSError, http.client.HTTPException):
+            codes["error"] += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+        latencies.append(time.perf_counter() - start)
+
+    connection.close()
+    return {"latencies": latencies, "codes": codes}
+
+
+def _worker(host: str, port: int, process_index: int, clients: int, requests: int, vote_ratio: float) -> Dict:
+    """Un processus du générateur : plusieurs spectateurs en threads."""
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        futures = [
+            pool.submit(_client, host, port, requests, vote_ratio, process_index * 100003 + c)
+            for c in range(clients)
+        ]
+        results = [f.result() for f in futures]
+
+    latencies = [l for r in results for l in r["latencies"]]
+    codes = sum((r["codes"] for r in results), Counter())
+    return {"latencies": latencies, "codes": dict(codes)}
+
+
+def run_load(url: str, processes: int, clients: int, requests: int, vote_ratio: float) -> Dict:
+    """
+    Envoie la charge et agrège les mesures.
+
+    Args:
+        url: Adresse du serveur
+        processes: Nombre de processus générateurs
+        clients: Spectateurs (connexions) par processus
+        requests: Requêtes par spectateur
+        vote_ratio: Part des requêtes qui sont des votes
+
+    Returns:
+        Dict: Débit, percentiles de latence et codes de réponse
+    """
+    target = urlparse(url)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [
+            pool.submit(_worker, target.hostname, target.port, p, clients, requests, vote_ratio)
+            for p in range(processes)
+        ]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - start
+
+    latencies = [l for r in results for l in r["latencies"]]
+    codes: Counter = Counter()
+    for r in results:
+        codes.update(r["codes"])
+
+    return {
+        "requests": len(latencies),
+        "wall_seconds": wall,
+        "requests_per_sec": len(latencies) / wall if wall else 0.0,
+        "latency_ms": percentiles(latencies),
+        "codes": {str(code): count for code, count in sorted(codes.items(), key=str)}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Générateur de charge du serveur d'audience")
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help="Adresse du serveur")
+    parser.add_argument('--spawn', action='store_true', help="Lance un serveur (provider factice) dans un sous-processus")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--processes', type=int, default=min(4, os.cpu_count() or 1), help="Processus générateurs")
+    parser.add_argument('--clients', type=int, default=25, help="Spectateurs par processus")
+    parser.add_argument('--requests', type=int, default=200, help="Requêtes par spectateur")
+    parser.add_argument('--vote-ratio', type=float, default=0.5, help="Part des requêtes qui sont des votes")
+    parser.add_argument('--output', '-o', default=None, help="Fichier JSON de sortie")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(urlparse(args.url).port)
+        return
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.audience_load", "--serve", "--url", args.url],
+            cwd=Path(__file__).resolve().parent.parent,
+            stdout=subprocess.PIPE,
+            text=True
+        )
+        while not server.stdout.readline().startswith("READY"):
+            if server.poll() is not None:
+                sys.exit("Le serveur n'a pas démarré")
+
+    try:
+        result = run_load(args.url, args.processes, args.clients, args.requests, args.vote_ratio)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    lat = result["latency_ms"]
+    print(
+        f"{result['requests']} requêtes en {result['wall_seconds']:.2f}s "
+        f"| {result['requests_per_sec']:.0f} req/s "
+        f"| p50 {lat['p50']:.2f}ms p95 {lat['p95']:.2f}ms p99 {lat['p99']:.2f}ms"
+    )
+    print(f"Codes: {result['codes']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
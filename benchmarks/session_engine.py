@@ -0,0 +1,123 @@
+"""
+Charge du moteur multi-sessions
+===============================
+
+Ouvre N sessions dans un seul processus (utils/session_engine.py) et
+fait jouer à chacune une conversation scriptée en même temps, avec le
+provider factice. Mesure :
+
+- le temps d'ouverture des sessions et la mémoire max du processus ;
+- la latence des tours vue par les joueurs (p50/p95/p99) et le débit
+  (tours/s), avec la limite de tours simultanés du moteur.
+
+Exemple :
+    python -m benchmarks.session_engine --sessions 300 --turns 5 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.turn_pipeline import scenario_lines
+from config import LLMConfig, ScenarioConfig
+from utils.perf import percentiles
+from utils.session_engine import SessionEngine
+
+
+async def run_load(sessions: int, turns: int, audience: bool, max_concurrent_turns: int) -> Dict:
+    """
+    Joue turns tours dans chacune des sessions, toutes en même temps.
+
+    Args:
+        sessions: Nombre de sessions (joueurs)
+        turns: Tours par session
+        audience: Active les votes (simulés) de l'audience
+        max_concurrent_turns: Tours joués en même temps par le moteur
+
+    Returns:
+        Dict: Temps d'ouverture, latence des tours, débit, erreurs, mémoire
+    """
+    engine = SessionEngine(
+        max_sessions=sessions,
+        max_concurrent_turns=max_concurrent_turns,
+        session_log=False
+    )
+    scenarios = ScenarioConfig.AVAILABLE_SCENARIOS
+
+    start = time.perf_counter()
+    session_ids = [
+        await engine.create_session(scenarios[i % len(scenarios)], audience_mode=audience)
+        for i in range(sessions)
+    ]
+    open_seconds = time.perf_counter() - start
+
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def player(session_id: str, lines: List[str]):
+        for line in lines:
+            sent = time.perf_counter()
+            reply = await engine.send(session_id, line)
+            latencies.append(time.perf_counter() - sent)
+            if "error" in reply:
+                errors.append(reply["error"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        player(session_id, scenario_lines(engine.sessions[session_id].scenario, repeat=turns)[:turns])
+        for session_id in session_ids
+    ))
+    wall = time.perf_counter() - start
+
+    await engine.shutdown()
+
+    return {
+        "sessions": sessions,
+        "turns": len(latencies),
+        "open_seconds": open_seconds,
+        "wall_seconds": wall,
+        "turns_per_sec": len(latencies) / wall if wall else 0.0,
+        "latency_ms": percentiles(latencies),
+        "errors": len(errors),
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "counters": engine.snapshot()["counters"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge du moteur multi-sessions")
+    parser.add_argument('--sessions', type=int, default=200, help="Sessions simultanées")
+    parser.add_argument('--turns', type=int, default=5, help="Tours par session")
+    parser.add_argument('--latency-ms', type=float, default=200, help="Latence médiane du provider factice")
+    parser.add_argument('--max-concurrent-turns', type=int, default=None, help="Tours simultanés (défaut: config)")
+    parser.add_argument('--audience', action='store_true', help="Active les votes de l'audience")
+    parser.add_argument('--output', '-o', default=None, help="Fichier JSON de sortie")
+    args = parser.parse_args()
+
+    LLMConfig.PROVIDER = "fake"
+    LLMConfig.FAKE_LATENCY_MS = args.latency_ms
+
+    result = asyncio.run(run_load(args.sessions, args.turns, args.audience, args.max_concurrent_turns))
+
+    lat = result["latency_ms"]
+    print(
+        f"{result['sessions']} sessions ouvertes en {result['open_seconds']:.2f}s "
+        f"| {result['turns']} tours en {result['wall_seconds']:.2f}s ({result['turns_per_sec']:.1f} tours/s) "
+        f"| p50 {lat['p50']:.0f}ms p95 {lat['p95']:.0f}ms p99 {lat['p99']:.0f}ms "
+        f"| erreurs {result['errors']} | mémoire max {result['max_rss_mb']:.0f} Mo"
+    )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
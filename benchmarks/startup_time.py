@@ -0,0 +1,162 @@
+"""
+Budget de démarrage de la CLI
+=============================
+
+Nos lanceurs démarrent beaucoup de processus courts (--list-scenarios,
+--search, --render-log, --help) : la pile LLM (LangChain, SDK OpenAI ou
+Gemini, NumPy) ne doit être importée qu'au démarrage d'une session, et
+seulement pour le provider configuré.
+
+Pour chaque commande, le script lance `python -X importtime main.py ...`
+et vérifie :
+- le temps d'import cumulé (somme des temps propres, en ms) ;
+- qu'aucun module "lourd" n'a été importé ;
+- le temps total du processus (médiane de plusieurs lancements).
+
+Il vérifie aussi qu'importer les agents ne charge aucun SDK de provider
+(ils sont importés par config.get_llm, selon LLM_PROVIDER).
+
+Code de retour 1 si un budget est dépassé.
+
+Exemple :
+    python -m benchmarks.startup_time --budget-ms 300 --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Commandes qui ne démarrent pas de session
+COMMANDS = [
+    ["--help"],
+    ["--list-scenarios"],
+]
+
+# Modules interdits au démarrage de la CLI
+HEAVY_MODULES = [
+    "langchain",
+    "langchain_core",
+    "langchain_openai",
+    "langchain_google_genai",
+    "openai",
+    "google.generativeai",
+    "numpy",
+]
+
+# SDK des providers : chargés par get_llm, jamais par l'import des agents
+PROVIDER_MODULES = [
+    "langchain_openai",
+    "langchain_google_genai",
+    "openai",
+    "google.generativeai",
+]
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Extrait les temps propres (µs) de la sortie de -X importtime.
+
+    Args:
+        stderr: Sortie d'erreur du processus
+
+    Returns:
+        Dict[str, int]: Temps propre par module
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def _loaded(modules: Dict[str, int], prefixes: List[str]) -> List[str]:
+    """Préfixes de la liste dont au moins un module a été importé."""
+    return [p for p in prefixes if any(m == p or m.startswith(p + ".") for m in modules)]
+
+
+def measure(args: List[str], runs: int) -> Dict:
+    """
+    Mesure le démarrage d'une commande.
+
+    Args:
+        args: Arguments passés à l'interpréteur (après -X importtime)
+        runs: Nombre de lancements pour la médiane du temps total
+
+    Returns:
+        Dict: Temps d'import, temps total médian, modules lourds et SDK importés
+    """
+    walls = []
+    modules: Dict[str, int] = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        walls.append(time.perf_counter() - start)
+        modules = parse_importtime(result.stderr)
+
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "command": " ".join(args),
+        "import_ms": sum(modules.values()) / 1000,
+        "wall_ms": statistics.median(walls) * 1000,
+        "heavy_modules": _loaded(modules, HEAVY_MODULES),
+        "provider_modules": _loaded(modules, PROVIDER_MODULES),
+        "slowest": [{"module": name, "ms": us / 1000} for name, us in slowest]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget de démarrage de la CLI")
+    parser.add_argument('--budget-ms', type=float, default=300, help="Temps d'import maximal par commande (ms)")
+    parser.add_argument('--runs', type=int, default=3, help="Lancements par commande (médiane du temps total)")
+    parser.add_argument('--output', '-o', default=None, help="Fichier JSON de sortie")
+    args = parser.parse_args()
+
+    failures = []
+    results = []
+
+    for command in COMMANDS:
+        result = measure(["main.py", *command], args.runs)
+        results.append(result)
+        print(
+            f"{result['command']:<30} import {result['import_ms']:6.1f} ms "
+            f"| processus {result['wall_ms']:6.1f} ms "
+            f"| plus lents: {', '.join(s['module'] for s in result['slowest'][:3])}"
+        )
+        if result["import_ms"] > args.budget_ms:
+            failures.append(f"{result['command']}: {result['import_ms']:.1f} ms > {args.budget_ms:.0f} ms")
+        if result["heavy_modules"]:
+            failures.append(f"{result['command']}: modules lourds importés {result['heavy_modules']}")
+
+    agents = measure(["-c", "import agents"], 1)
+    providers = agents["provider_modules"]
+    results.append(agents)
+    print(f"{'import agents':<30} import {agents['import_ms']:6.1f} ms | SDK de provider: {providers or 'aucun'}")
+    if providers:
+        failures.append(f"import agents: SDK de provider importés {providers}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if failures:
+        print("\n❌ Budget de démarrage dépassé:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ Budget de démarrage respecté")
+
+
+if __name__ == "__main__":
+    main()
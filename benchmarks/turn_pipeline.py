@@ -0,0 +1,283 @@
+"""
+Benchmark de la boucle de tours
+===============================
+
+Joue chaque scénario en entier (phrases d'exemple de chaque étape du
+script) à travers TheatreSimulation, avec et sans mode audience, contre
+le provider factice (latence simulée) ou un vrai provider.
+
+MESURES PAR TOUR :
+- director : analyse du Directeur (en mode pipeliné, seule l'attente
+  de l'analyse précédente est sur le chemin critique : director_wait)
+- victim : AgentExecutor complet (appels LLM et itérations d'outils)
+- moderator : génération des choix de vote
+- bookkeeping : tout le reste (historique, affichage, orchestration)
+
+Le résultat (p50/p95/p99, débit en tours/s, RSS max du processus) est écrit en
+JSON ; --baseline compare à un run précédent et échoue en cas de
+régression du p95 par tour.
+
+Exemple :
+    python -m benchmarks.turn_pipeline --latency-ms 200 --output bench.json
+    python -m benchmarks.turn_pipeline --baseline bench.json
+"""
+
+import argparse
+import io
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import LLMConfig, ScenarioConfig
+from main import TheatreSimulation
+from prompts.scenarios import get_scenario_script
+from utils.perf import percentiles
+
+
+STAGES = ["director", "director_wait", "victim", "moderator", "bookkeeping"]
+
+
+def scenario_lines(scenario: str, repeat: int = 1) -> List[str]:
+    """
+    Répliques de l'arnaqueur couvrant tout le script du scénario.
+
+    Args:
+        scenario: Le nom du scénario
+        repeat: Nombre de passages sur le script
+
+    Returns:
+        List[str]: Les phrases d'exemple de chaque étape, dans l'ordre
+    """
+    lines = [
+        phrase
+        for stage in get_scenario_script(scenario)
+        for phrase in stage["example_phrases"]
+    ]
+    return lines * repeat
+
+
+def _timed(fn, stage: str, state: Dict):
+    """Enveloppe fn pour cumuler sa durée dans le tour en cours."""
+    def wrapper(*args, **kwargs):
+        turn_times = state["current"]
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            turn_times[stage] += time.perf_counter() - start
+    return wrapper
+
+
+def run_case(scenario: str, audience: bool, pipelined: bool, repeat: int, trace_memory: bool) -> Dict:
+    """
+    Joue un scénario complet et mesure chaque tour.
+
+    Args:
+        scenario: Le scénario à jouer
+        audience: Active les votes de l'audience
+        pipelined: Directeur pipeliné (True) ou ordre strict (False)
+        repeat: Nombre de passages sur le script
+        trace_memory: Mesure aussi le pic d'allocation Python (tracemalloc, plus lent)
+
+    Returns:
+        Dict: Résultats du cas (percentiles par étape, débit, mémoire)
+    """
+    lines = scenario_lines(scenario, repeat)
+    state = {"current": dict.fromkeys(STAGES, 0.0)}
+    turns: List[Dict] = []
+
+    if trace_memory:
+        tracemalloc.start()
+
+    with redirect_stdout(io.StringIO()):
+        simulation = TheatreSimulation(scenario=scenario, audience_mode=audience, pipelined=pipelined)
+        if not simulation.initialize():
+            raise RuntimeError("Initialisation de la simulation impossible")
+
+        simulation.victim.agent_executor.verbose = False
+        counter = simulation.victim.perf
+
+        director = simulation.director
+        director.analyze_and_update = _timed(director.analyze_and_update, "director", state)
+        simulation.victim.respond = _timed(simulation.victim.respond, "victim", state)
+        simulation.moderator.generate_choices = _timed(
+            simulation.moderator.generate_choices, "moderator", state
+        )
+        simulation._apply_pending_objective = _timed(
+            simulation._apply_pending_objective, "director_wait", state
+        )
+
+        start = time.perf_counter()
+        for line in lines:
+            state["current"] = dict.fromkeys(STAGES, 0.0)
+            llm_calls, tool_calls = counter.total_calls, counter.total_tool_calls
+
+            simulation.turn += 1
+            turn_start = time.perf_counter()
+            simulation._play_turn(line)
+            total = time.perf_counter() - turn_start
+
+            times = state["current"]
+            critical = times["victim"] + times["moderator"]
+            critical += times["director_wait"] if pipelined else times["director"]
+            times["bookkeeping"] = max(total - critical, 0.0)
+            times["turn"] = total
+            times["victim_llm_calls"] = counter.total_calls - llm_calls
+            times["victim_tool_calls"] = counter.total_tool_calls - tool_calls
+            turns.append(times)
+
+        simulation._shutdown_director()
+        wall = time.perf_counter() - start
+
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    # Pic de RSS du processus depuis son démarrage (tous les cas déjà joués
+    # compris), pas celui de ce cas. ru_maxrss est en Ko sous Linux, en
+    # octets sous macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    process_peak_rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+    return {
+        "scenario": scenario,
+        "audience": audience,
+        "pipelined": pipelined,
+        "turns": len(turns),
+        "wall_seconds": wall,
+        "throughput_turns_per_sec": len(turns) / wall if wall else 0.0,
+        "latency_ms": {
+            stage: percentiles([t[stage] for t in turns])
+            for stage in ["turn"] + STAGES
+        },
+        "victim_llm_calls_per_turn": sum(t["victim_llm_calls"] for t in turns) / len(turns),
+        "victim_tool_calls_per_turn": sum(t["victim_tool_calls"] for t in turns) / len(turns),
+        "process_peak_rss_mb": process_peak_rss_mb,
+        "tracemalloc_peak_mb": traced_peak
+    }
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    Compare le p95 par tour à un run de référence.
+
+    Args:
+        results: Les résultats du run courant
+        baseline_path: Fichier JSON d'un run précédent
+        tolerance: Hausse relative tolérée (0.10 = +10%)
+
+    Returns:
+        List[str]: Les régressions détectées
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    def key(r):
+        return (r["scenario"], r["audience"], r["pipelined"])
+
+    reference = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        ref = reference.get(key(result))
+        if not ref:
+            continue
+        before = ref["latency_ms"]["turn"]["p95"]
+        after = result["latency_ms"]["turn"]["p95"]
+        if before and after > before * (1 + tolerance):
+            regressions.append(
+                f"{result['scenario']} audience={result['audience']} pipelined={result['pipelined']}: "
+                f"p95 {before:.1f}ms → {after:.1f}ms"
+            )
+    return regressions
+
+
+def print_summary(result: Dict):
+    """Affiche une ligne de résumé par cas."""
+    lat = result["latency_ms"]
+    print(
+        f"{result['scenario']:<16} audience={'oui' if result['audience'] else 'non'} "
+        f"| tour p50 {lat['turn']['p50']:7.1f}ms p95 {lat['turn']['p95']:7.1f}ms p99 {lat['turn']['p99']:7.1f}ms "
+        f"| dir {lat['director']['p50']:6.1f} vic {lat['victim']['p50']:6.1f} "
+        f"mod {lat['moderator']['p50']:6.1f} book {lat['bookkeeping']['p50']:5.1f} "
+        f"| {result['throughput_turns_per_sec']:6.2f} tours/s | RSS max processus {result['process_peak_rss_mb']:.0f} Mo"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la boucle de tours du Théâtre de l'Arnaque")
+    parser.add_argument('--provider', default='fake', help="Provider LLM (défaut: fake)")
+    parser.add_argument('--latency-ms', type=float, default=None, help="Latence médiane du provider factice")
+    parser.add_argument('--distribution', default=None, help="constant, uniform ou lognormal")
+    parser.add_argument('--seed', type=int, default=None, help="Graine du provider factice")
+    parser.add_argument('--scenarios', nargs='+', default=ScenarioConfig.AVAILABLE_SCENARIOS)
+    parser.add_argument('--repeat', type=int, default=1, help="Passages sur chaque script")
+    parser.add_argument('--strict-director', action='store_true', help="Désactive le Directeur pipeliné")
+    parser.add_argument('--no-audience', action='store_true', help="Ne mesure que le mode sans audience")
+    parser.add_argument('--tracemalloc', action='store_true', help="Mesure le pic d'allocation Python")
+    parser.add_argument('--output', '-o', default='bench_results.json', help="Fichier JSON de sortie")
+    parser.add_argument('--baseline', default=None, help="JSON d'un run précédent à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Régression tolérée du p95 (défaut: 10%%)")
+    args = parser.parse_args()
+
+    # Le run comparé ne doit pas écraser sa référence (même en cas de régression)
+    if args.baseline and Path(args.output).resolve() == Path(args.baseline).resolve():
+        parser.error("--output doit être différent de --baseline")
+
+    LLMConfig.PROVIDER = args.provider
+    if args.latency_ms is not None:
+        LLMConfig.FAKE_LATENCY_MS = args.latency_ms
+    if args.distribution:
+        LLMConfig.FAKE_LATENCY_DISTRIBUTION = args.distribution
+    if args.seed is not None:
+        LLMConfig.FAKE_SEED = args.seed
+
+    pipelined = not args.strict_director
+    audience_modes = [False] if args.no_audience else [False, True]
+
+    results = []
+    for scenario in args.scenarios:
+        for audience in audience_modes:
+            result = run_case(scenario, audience, pipelined, args.repeat, args.tracemalloc)
+            print_summary(result)
+            results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "provider": LLMConfig.PROVIDER,
+            "model": LLMConfig.DEFAULT_MODEL,
+            "fake_latency_ms": LLMConfig.FAKE_LATENCY_MS,
+            "fake_latency_distribution": LLMConfig.FAKE_LATENCY_DISTRIBUTION,
+            "fake_seed": LLMConfig.FAKE_SEED,
+            "pipelined": pipelined,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+    regressions = compare(results, args.baseline, args.tolerance) if args.baseline else []
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats écrits dans {args.output}")
+
+    if regressions:
+        print("\n⚠️ RÉGRESSIONS:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
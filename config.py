@@ -1,7 +1,9 @@
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 
 env_path = Path(__file__).parent / ".env"
 load_dotenv(env_path)
@@ -18,10 +20,11 @@ class LLMConfig:
     PROVIDERS SUPPORTÉS:
     - openai: GPT-3.5, GPT-4
     - gemini: Gemini 1.5 Flash, Gemini 1.5 Pro, Gemini 2.0
+    - fake: modèle local déterministe (hors ligne, tests et benchmarks)
     """
 
     # Provider LLM - CHARGÉ DEPUIS L'ENVIRONNEMENT
-    # Options: "openai", "gemini"
+    # Options: "openai", "gemini", "fake"
     PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")
 
     # Clé API OpenAI - CHARGÉE DEPUIS L'ENVIRONNEMENT
@@ -43,6 +46,36 @@ class LLMConfig:
     TEMPERATURE: float = 0.7  # Créativité (0=déterministe, 1=créatif)
     MAX_TOKENS: int = 500     # Longueur max des réponses
 
+    # Pool de connexions HTTP partagé par les LLM OpenAI (voir LLMClientPool)
+    HTTP_POOL_SIZE: int = int(os.getenv("LLM_HTTP_POOL_SIZE", "20"))
+    HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("LLM_HTTP_KEEPALIVE", "60"))
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+
+    # Requête minimale envoyée en arrière-plan au démarrage d'une session :
+    # DNS, TLS et démarrage à froid du provider sont payés avant le premier tour
+    WARMUP: bool = os.getenv("LLM_WARMUP", "False").lower() == "true"
+
+    # Provider factice (LLM_PROVIDER=fake) : graine, latence simulée, script
+    FAKE_SEED: int = int(os.getenv("FAKE_LLM_SEED", "42"))
+    FAKE_LATENCY_MS: float = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+    FAKE_LATENCY_DISTRIBUTION: str = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal")
+    FAKE_LATENCY_JITTER: float = float(os.getenv("FAKE_LLM_LATENCY_JITTER", "0.3"))
+    FAKE_TOKEN_LATENCY_MS: float = float(os.getenv("FAKE_LLM_TOKEN_LATENCY_MS", "0"))
+    FAKE_TOOL_RATE: float = float(os.getenv("FAKE_LLM_TOOL_RATE", "0.3"))
+    FAKE_SCRIPT: str = os.getenv("FAKE_LLM_SCRIPT", "")
+
+    # Cache disque des réponses (Directeur et Modérateur uniquement)
+    CACHE_ENABLED: bool = os.getenv("LLM_CACHE", "False").lower() == "true"
+    CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", str(Path(__file__).parent / ".llm_cache.sqlite3"))
+    CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+
+    # Cassette d'enregistrement / rejeu de tous les appels LLM (voir utils/cassette.py)
+    # "record" = appels réels enregistrés, "replay" = rejeu sans réseau, "" = désactivé
+    CASSETTE_MODE: str = os.getenv("LLM_CASSETTE_MODE", "")
+    CASSETTE_PATH: str = os.getenv("LLM_CASSETTE", "session.cassette.jsonl")
+    CASSETTE_REPLAY_LATENCY: bool = os.getenv("LLM_CASSETTE_REPLAY_LATENCY", "False").lower() == "true"
+
     @classmethod
     def validate(cls) -> bool:
         """
@@ -51,6 +84,10 @@ class LLMConfig:
         Returns:
             bool: True si la config est valide, False sinon
         """
+        if cls.CASSETTE_MODE == "replay":
+            print(f"✅ Provider: Cassette (rejeu hors ligne de {cls.CASSETTE_PATH})")
+            return True
+
         if cls.PROVIDER == "gemini":
             if not cls.GOOGLE_API_KEY:
                 print("⚠️  ATTENTION: GOOGLE_API_KEY non définie !")
@@ -77,9 +114,13 @@ class LLMConfig:
             print(f"✅ Provider: OpenAI ({cls.DEFAULT_MODEL})")
             return True
 
+        elif cls.PROVIDER == "fake":
+            print(f"✅ Provider: Fake (hors ligne, seed={cls.FAKE_SEED}, latence={cls.FAKE_LATENCY_MS:.0f}ms)")
+            return True
+
         else:
             print(f"⚠️  Provider inconnu: {cls.PROVIDER}")
-            print("   Options valides: openai, gemini")
+            print("   Options valides: openai, gemini, fake")
             return False
 
 
@@ -104,9 +145,82 @@ class SimulationConfig:
     # Durée simulée des pauses (en secondes textuelles)
     PAUSE_DURATION: int = 2
 
+    # Propositions de l'audience : débit par spectateur et nombre de
+    # propositions envoyées au Modérateur (liste courte)
+    PROPOSAL_RATE_PER_MINUTE: float = float(os.getenv("PROPOSAL_RATE_PER_MINUTE", "6"))
+    PROPOSAL_BURST: int = 3
+    PROPOSAL_SHORTLIST_SIZE: int = int(os.getenv("PROPOSAL_SHORTLIST_SIZE", "8"))
+
+    # Serveur d'audience (propositions et votes en direct, HTTP local)
+    AUDIENCE_SERVER_HOST: str = os.getenv("AUDIENCE_SERVER_HOST", "127.0.0.1")
+    AUDIENCE_SERVER_PORT: int = int(os.getenv("AUDIENCE_SERVER_PORT", "8765"))
+    AUDIENCE_VOTE_SECONDS: float = float(os.getenv("AUDIENCE_VOTE_SECONDS", "15"))
+
+    # Audience simulée (sans serveur) : nombre de votants et graine
+    SIMULATED_AUDIENCE_SIZE: int = int(os.getenv("SIMULATED_AUDIENCE_SIZE", "100"))
+    VOTE_SEED: Optional[int] = int(os.getenv("VOTE_SEED")) if os.getenv("VOTE_SEED") else None
+
     # Activer/désactiver les effets sonores
     SOUND_EFFECTS_ENABLED: bool = True
 
+    # Mémoire de Jeanne : "buffer" (tout l'historique) ou "summary"
+    # (N derniers échanges + résumé en arrière-plan, budget de tokens fixe)
+    VICTIM_MEMORY: str = os.getenv("VICTIM_MEMORY", "buffer")
+    VICTIM_MEMORY_TOKEN_BUDGET: int = int(os.getenv("VICTIM_MEMORY_TOKEN_BUDGET", "2000"))
+    VICTIM_MEMORY_KEEP_EXCHANGES: int = int(os.getenv("VICTIM_MEMORY_KEEP_EXCHANGES", "4"))
+
+    # Historiques bornés en mémoire pour les longues sessions : au-delà,
+    # les entrées les plus anciennes sont écrites sur disque (JSONL) dans
+    # HISTORY_SPILL_DIR (vide = fichiers temporaires supprimés en fin de session)
+    HISTORY_MEMORY_MESSAGES: int = int(os.getenv("HISTORY_MEMORY_MESSAGES", "1000"))
+    ANALYSIS_HISTORY_SIZE: int = int(os.getenv("ANALYSIS_HISTORY_SIZE", "200"))
+    VOTE_HISTORY_SIZE: int = int(os.getenv("VOTE_HISTORY_SIZE", "100"))
+    HISTORY_SPILL_DIR: Optional[str] = os.getenv("HISTORY_SPILL_DIR") or None
+
+    # Journal JSONL de chaque session (écrit au fil de l'eau, résiste aux plantages)
+    SESSION_LOG: bool = os.getenv("SESSION_LOG", "True").lower() == "true"
+    SESSION_LOG_DIR: str = os.getenv("SESSION_LOG_DIR", "sessions")
+    SESSION_LOG_FSYNC_EVERY: int = int(os.getenv("SESSION_LOG_FSYNC_EVERY", "20"))
+    SESSION_LOG_FSYNC_INTERVAL: float = float(os.getenv("SESSION_LOG_FSYNC_INTERVAL", "1.0"))
+    SESSION_LOG_KEEP: int = int(os.getenv("SESSION_LOG_KEEP", "20"))
+
+    # Index de recherche des transcriptions et journaux (mis à jour en fin de session)
+    TRANSCRIPT_INDEX: bool = os.getenv("TRANSCRIPT_INDEX", "True").lower() == "true"
+    TRANSCRIPT_INDEX_PATH: str = os.getenv("TRANSCRIPT_INDEX_PATH", ".transcripts.sqlite3")
+
+    # Nombre d'appels LLM gardés par agent pour /perf (buffers circulaires)
+    PERF_WINDOW: int = int(os.getenv("PERF_WINDOW", "200"))
+
+    # Directeur "pipeliné" : Jeanne répond tout de suite avec l'objectif
+    # courant pendant que le Directeur analyse le message en arrière-plan.
+    # Le nouvel objectif est appliqué avant le tour suivant.
+    # False = ordre strict (analyse du Directeur PUIS réponse de Jeanne)
+    PIPELINED_DIRECTOR: bool = os.getenv("PIPELINED_DIRECTOR", "True").lower() == "true"
+
+    # Directeur "économe" : réutilise l'objectif courant sans appeler le LLM
+    # si aucun mot-clé du script n'apparaît et que le message ressemble aux
+    # derniers reçus ; une analyse complète reste faite tous les K tours.
+    DIRECTOR_GATING: bool = os.getenv("DIRECTOR_GATING", "False").lower() == "true"
+    DIRECTOR_REANALYZE_EVERY: int = int(os.getenv("DIRECTOR_REANALYZE_EVERY", "3"))
+    DIRECTOR_DUPLICATE_THRESHOLD: float = float(os.getenv("DIRECTOR_DUPLICATE_THRESHOLD", "0.8"))
+    DIRECTOR_DUPLICATE_WINDOW: int = 5
+
+    # Affichage des réponses de Jeanne token par token (boucle asynchrone)
+    STREAM_RESPONSES: bool = os.getenv("STREAM_RESPONSES", "False").lower() == "true"
+
+    # Mode batch : nombre de processus et dossier de sortie
+    BATCH_WORKERS: int = int(os.getenv("BATCH_WORKERS", str(os.cpu_count() or 1)))
+    BATCH_OUTPUT_DIR: str = os.getenv("BATCH_OUTPUT_DIR", "batch_results")
+
+    # Moteur multi-sessions (utils/session_engine.py) : nombre de sessions,
+    # tours joués en même temps (toutes sessions confondues), messages en
+    # attente de réponse par session, fermeture des sessions inactives
+    # après X secondes (0 = jamais)
+    ENGINE_MAX_SESSIONS: int = int(os.getenv("ENGINE_MAX_SESSIONS", "500"))
+    ENGINE_MAX_CONCURRENT_TURNS: int = int(os.getenv("ENGINE_MAX_CONCURRENT_TURNS", "64"))
+    ENGINE_SESSION_MAX_PENDING: int = int(os.getenv("ENGINE_SESSION_MAX_PENDING", "2"))
+    ENGINE_SESSION_IDLE_TIMEOUT: float = float(os.getenv("ENGINE_SESSION_IDLE_TIMEOUT", "900"))
+
 
 # ================================================
 # CONFIGURATION DES SCÉNARIOS
@@ -149,8 +263,8 @@ def check_configuration() -> bool:
     if not LLMConfig.validate():
         return False
 
-    # Vérifier que le fichier .env existe
-    if not env_path.exists():
+    # Vérifier que le fichier .env existe (inutile pour le provider hors ligne)
+    if LLMConfig.PROVIDER != "fake" and LLMConfig.CASSETTE_MODE != "replay" and not env_path.exists():
         print("⚠️  Fichier .env non trouvé.")
         print("   Créez-le avec: cp .env.example .env")
         return False
@@ -163,45 +277,254 @@ def check_configuration() -> bool:
 # FONCTION GET_LLM - FACTORY POUR LES MODÈLES
 # ================================================
 
-def get_llm(model: Optional[str] = None, temperature: float = 0.7):
+class LLMClientPool:
+    """
+    Clients réseau partagés entre tous les LLM d'un même provider.
+
+    Chaque agent garde son propre objet LLM (température, tokens max,
+    cache et callbacks propres, appliqués à chacun de ses appels), mais
+    tous réutilisent le même pool de connexions HTTP (OpenAI, via httpx).
+    On évite ainsi une poignée de main TLS et un pool par agent, ce qui
+    compte quand on lance beaucoup de sessions dans le même processus.
+
+    Gemini n'est pas concerné : ChatGoogleGenerativeAI construit toujours
+    son propre client gRPC et n'en accepte pas un déjà construit.
+    """
+
+    _lock = threading.Lock()
+    _clients: Dict[tuple, Any] = {}
+
+    @classmethod
+    def get(cls, key: tuple, factory: Callable[[], Any]) -> Any:
+        """
+        Retourne le client partagé pour key, en le créant au premier appel.
+
+        Args:
+            key: Identifiant du client (provider, type)
+            factory: Fonction qui construit le client
+
+        Returns:
+            Any: Le client partagé
+        """
+        with cls._lock:
+            if key not in cls._clients:
+                cls._clients[key] = factory()
+            return cls._clients[key]
+
+    @classmethod
+    def httpx_limits(cls):
+        """Limites du pool httpx (taille et keep-alive) depuis LLMConfig."""
+        import httpx
+        return httpx.Limits(
+            max_connections=LLMConfig.HTTP_POOL_SIZE,
+            max_keepalive_connections=LLMConfig.HTTP_POOL_SIZE,
+            keepalive_expiry=LLMConfig.HTTP_KEEPALIVE_SECONDS
+        )
+
+    @classmethod
+    def openai_clients(cls) -> tuple:
+        """
+        Clients httpx (synchrone, asynchrone) partagés pour OpenAI.
+
+        Le client asynchrone garde un pool par boucle asyncio : un second
+        asyncio.run dans le processus ne réutilise pas les connexions
+        liées à une boucle fermée (voir utils/http_clients.py).
+        """
+        import httpx
+        from utils.http_clients import LoopLocalAsyncClient
+        sync_client = cls.get(("openai", "sync"), lambda: httpx.Client(
+            limits=cls.httpx_limits(),
+            timeout=LLMConfig.HTTP_TIMEOUT_SECONDS
+        ))
+        async_client = cls.get(("openai", "async"), lambda: LoopLocalAsyncClient(
+            limits=cls.httpx_limits(),
+            timeout=LLMConfig.HTTP_TIMEOUT_SECONDS
+        ))
+        return sync_client, async_client
+
+
+_response_store = None
+_response_store_lock = threading.Lock()
+
+
+def _get_response_store():
+    """Ouvre (une seule fois par processus) le stockage du cache LLM."""
+    global _response_store
+    # Les agents sont construits en parallèle : un seul stockage doit être créé
+    with _response_store_lock:
+        if _response_store is None:
+            from utils.llm_cache import ResponseStore
+            _response_store = ResponseStore(
+                path=LLMConfig.CACHE_PATH,
+                ttl_seconds=LLMConfig.CACHE_TTL_SECONDS,
+                max_bytes=LLMConfig.CACHE_MAX_MB * 1024 * 1024
+            )
+        return _response_store
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """
+    Ouvre (une seule fois par processus) la cassette LLM_CASSETTE.
+
+    Returns:
+        Optional[Cassette]: La cassette, ou None si CASSETTE_MODE est vide
+    """
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None and LLMConfig.CASSETTE_MODE:
+            from utils.cassette import Cassette
+            _cassette = Cassette(
+                LLMConfig.CASSETTE_PATH,
+                mode=LLMConfig.CASSETTE_MODE,
+                header={"provider": LLMConfig.PROVIDER, "model": LLMConfig.DEFAULT_MODEL},
+                replay_latency=LLMConfig.CASSETTE_REPLAY_LATENCY
+            )
+        return _cassette
+
+
+def get_llm_cache_stats() -> Optional[dict]:
+    """
+    Retourne les compteurs du cache LLM (hits, misses, etc.).
+
+    Returns:
+        Optional[dict]: Les statistiques, ou None si le cache n'a pas été utilisé
+    """
+    if _response_store is None:
+        return None
+    return _response_store.stats()
+
+
+def get_llm(
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    cache: bool = False,
+    callbacks: Optional[list] = None,
+    max_tokens: Optional[int] = None
+):
     """
     Factory pour créer le bon LLM selon le provider configuré.
 
     Args:
         model: Nom du modèle (optionnel, utilise DEFAULT_MODEL sinon)
         temperature: Température de génération (0-1)
+        cache: Active le cache disque des réponses pour ce LLM
+               (effectif seulement si LLM_CACHE=True, et ignoré avec une cassette)
+        callbacks: Callbacks LangChain attachés au LLM (ex: instrumentation)
+        max_tokens: Longueur max des réponses (défaut: LLMConfig.MAX_TOKENS)
+
+    Les objets LLM sont légers : avec OpenAI, les connexions réseau
+    sous-jacentes sont partagées (voir LLMClientPool).
+
+    Avec une cassette (LLM_CASSETTE_MODE), le modèle est enveloppé par
+    CassetteLLM : ses appels sont enregistrés, ou rejoués sans modèle réel.
 
     Returns:
-        Un objet LLM compatible LangChain (ChatOpenAI ou ChatGoogleGenerativeAI)
+        Un objet LLM compatible LangChain (ChatOpenAI, ChatGoogleGenerativeAI,
+        FakeTheatreLLM ou CassetteLLM)
 
     Raises:
         ValueError: Si le provider n'est pas supporté
     """
     model_name = model or LLMConfig.DEFAULT_MODEL
     provider = LLMConfig.PROVIDER.lower()
+    max_tokens = max_tokens or LLMConfig.MAX_TOKENS
+
+    cassette = get_cassette()
+    if cassette is not None:
+        # Le cache masquerait des appels à la cassette : elle le remplace
+        from utils.cassette import CassetteLLM
+        namespace = f"{provider}:{model_name}:{temperature}"
+        inner = None
+        if cassette.mode == "record":
+            inner = _create_provider_llm(provider, model_name, temperature, max_tokens)
+        return CassetteLLM(cassette=cassette, namespace=namespace, inner=inner, callbacks=callbacks)
+
+    llm_cache = None
+    if cache and LLMConfig.CACHE_ENABLED:
+        from utils.llm_cache import LLMResponseCache
+        llm_cache = LLMResponseCache(
+            _get_response_store(),
+            namespace=f"{provider}:{model_name}:{temperature}"
+        )
+        callbacks = [*(callbacks or []), llm_cache.error_handler]
+
+    return _create_provider_llm(provider, model_name, temperature, max_tokens, llm_cache, callbacks)
 
+
+def _create_provider_llm(
+    provider: str,
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    llm_cache=None,
+    callbacks: Optional[list] = None
+):
+    """Construit le modèle du provider (voir get_llm)."""
     if provider == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
         return ChatGoogleGenerativeAI(
             model=model_name,
             google_api_key=LLMConfig.GOOGLE_API_KEY,
             temperature=temperature,
-            convert_system_message_to_human=True
+            max_output_tokens=max_tokens,
+            convert_system_message_to_human=True,
+            cache=llm_cache,
+            callbacks=callbacks
         )
 
     elif provider == "openai":
         from langchain_openai import ChatOpenAI
+        http_client, http_async_client = LLMClientPool.openai_clients()
         return ChatOpenAI(
             model=model_name,
             openai_api_key=LLMConfig.OPENAI_API_KEY,
             temperature=temperature,
-            max_tokens=LLMConfig.MAX_TOKENS
+            max_tokens=max_tokens,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            cache=llm_cache,
+            callbacks=callbacks
+        )
+
+    elif provider == "fake":
+        from utils.fake_llm import FakeTheatreLLM
+        return FakeTheatreLLM(
+            model=model_name,
+            temperature=temperature,
+            seed=LLMConfig.FAKE_SEED,
+            latency_ms=LLMConfig.FAKE_LATENCY_MS,
+            latency_distribution=LLMConfig.FAKE_LATENCY_DISTRIBUTION,
+            latency_jitter=LLMConfig.FAKE_LATENCY_JITTER,
+            token_latency_ms=LLMConfig.FAKE_TOKEN_LATENCY_MS,
+            tool_rate=LLMConfig.FAKE_TOOL_RATE,
+            script=FakeTheatreLLM.load_script(LLMConfig.FAKE_SCRIPT) if LLMConfig.FAKE_SCRIPT else {},
+            cache=llm_cache,
+            callbacks=callbacks
         )
 
     else:
-        raise ValueError(f"Provider LLM non supporté: {provider}. Utilisez 'openai' ou 'gemini'.")
+        raise ValueError(f"Provider LLM non supporté: {provider}. Utilisez 'openai', 'gemini' ou 'fake'.")
+
+
+def warm_up_llm() -> float:
+    """
+    Envoie une requête minimale (un token) au provider configuré.
+
+    Le démarrage à froid du provider est payé ici ; avec OpenAI, le client
+    réseau étant partagé par tous les agents (LLMClientPool), la connexion
+    ouverte ici (DNS, TLS) sert aussi au premier vrai tour.
+
+    Returns:
+        float: Durée de la requête en secondes
+    """
+    start = time.perf_counter()
+    get_llm(temperature=0.0, max_tokens=1).invoke("Réponds: ok")
+    return time.perf_counter() - start
 
 llm_config = LLMConfig()
 simulation_config = SimulationConfig()
 scenario_config = ScenarioConfig()
-
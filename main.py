@@ -3,8 +3,16 @@ Point d'entrée principal de la simulation multi-agents.
 """
 
 import argparse
+import asyncio
+import json
+import random
+import sqlite3
 import sys
-from typing import Optional
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 # Rich pour un affichage console amélioré
 try:
@@ -12,17 +20,47 @@ try:
     from rich.panel import Panel
     from rich.text import Text
     from rich.prompt import Prompt
+    from rich.live import Live
     RICH_AVAILABLE = True
 except ImportError:
     RICH_AVAILABLE = False
     print("Installez 'rich' pour un meilleur affichage: pip install rich")
 
 # Imports locaux
-from config import check_configuration, SimulationConfig
-from agents import VictimAgent, DirectorAgent, ModeratorAgent
-from utils.memory import ConversationManager
+from config import (
+    check_configuration,
+    get_cassette,
+    get_llm_cache_stats,
+    warm_up_llm,
+    LLMConfig,
+    SimulationConfig
+)
+from utils.memory import ConversationManager, load_scammer_lines
+from utils.audience_server import AudienceServer
+from utils.session_log import SessionLog, render_transcript, rotate_logs
+from utils.transcript_index import TranscriptIndex
 from prompts.scenarios import get_scenario_description
 
+# Les agents (LangChain et SDK du provider, plusieurs secondes d'import)
+# ne sont chargés qu'au démarrage d'une session, dans initialize() :
+# --help, --list-scenarios, --search, --render-log restent instantanés
+if TYPE_CHECKING:
+    from agents import VictimAgent, DirectorAgent, ModeratorAgent
+
+
+
+# Réglages qui changent les prompts envoyés aux LLM : enregistrés dans la
+# cassette et réappliqués au rejeu
+REPLAY_SETTINGS = [
+    "AUDIENCE_VOTE_FREQUENCY",
+    "DIRECTOR_GATING",
+    "DIRECTOR_REANALYZE_EVERY",
+    "DIRECTOR_DUPLICATE_THRESHOLD",
+    "VICTIM_MEMORY",
+    "VICTIM_MEMORY_TOKEN_BUDGET",
+    "VICTIM_MEMORY_KEEP_EXCHANGES",
+    "VOTE_SEED",
+]
 
 
 class TheatreSimulation:
@@ -31,23 +69,50 @@ class TheatreSimulation:
     def __init__(
         self,
         scenario: str = "tech_support",
-        audience_mode: bool = False
+        audience_mode: bool = False,
+        pipelined: Optional[bool] = None,
+        streaming: Optional[bool] = None,
+        serve_audience: bool = False,
+        session_log: Optional[bool] = None
     ):
         """Initialise la simulation."""
         self.scenario = scenario
-        self.audience_mode = audience_mode
+        self.audience_mode = audience_mode or serve_audience
         self.turn = 0
         self.running = False
 
+        # Mode pipeliné : l'analyse du Directeur tourne en arrière-plan
+        # pendant que Jeanne répond (voir SimulationConfig.PIPELINED_DIRECTOR)
+        self.pipelined = SimulationConfig.PIPELINED_DIRECTOR if pipelined is None else pipelined
+        self._director_executor: Optional[ThreadPoolExecutor] = None
+        self._pending_objective: Optional[Future] = None
+        self._pending_objective_task: Optional[asyncio.Task] = None
+
+        # Streaming des réponses de Jeanne (boucle asynchrone uniquement)
+        self.streaming = SimulationConfig.STREAM_RESPONSES if streaming is None else streaming
+
+        # Serveur HTTP local pour les propositions et votes du public
+        self.serve_audience = serve_audience
+        self.audience_server: Optional[AudienceServer] = None
+
+        # Journal JSONL de la session (voir SimulationConfig.SESSION_LOG)
+        self.session_log = SimulationConfig.SESSION_LOG if session_log is None else session_log
+
         # Console pour l'affichage
         self.console = Console() if RICH_AVAILABLE else None
 
         # Initialisation des composants (après vérification config)
-        self.victim: Optional[VictimAgent] = None
-        self.director: Optional[DirectorAgent] = None
-        self.moderator: Optional[ModeratorAgent] = None
+        self.victim: Optional["VictimAgent"] = None
+        self.director: Optional["DirectorAgent"] = None
+        self.moderator: Optional["ModeratorAgent"] = None
         self.conversation: Optional[ConversationManager] = None
 
+        # Cassette des appels LLM (--record / --replay), voir utils/cassette.py
+        self.cassette = None
+
+        # Préchauffage de la connexion au provider (LLMConfig.WARMUP)
+        self._warmup: Optional[ThreadPoolExecutor] = None
+
     def initialize(self) -> bool:
         """Initialise tous les agents et composants."""
         self._print_header()
@@ -59,12 +124,69 @@ class TheatreSimulation:
         try:
             self._print_status("Initialisation des agents...")
 
-            self.victim = VictimAgent()
-            self.director = DirectorAgent(scenario=self.scenario)
-            self.moderator = ModeratorAgent()
-            self.conversation = ConversationManager(scenario=self.scenario)
+            self.cassette = get_cassette()
+            if self.cassette is not None and self.cassette.mode == "record":
+                # Tirages du Modérateur reproductibles au rejeu
+                if SimulationConfig.VOTE_SEED is None:
+                    SimulationConfig.VOTE_SEED = random.randrange(2 ** 32)
+                self.cassette.set_header({
+                    "scenario": self.scenario,
+                    "audience": self.audience_mode,
+                    "pipelined": self.pipelined,
+                    "settings": {name: getattr(SimulationConfig, name) for name in REPLAY_SETTINGS}
+                })
+
+            from agents import VictimAgent, DirectorAgent, ModeratorAgent
+
+            # Les trois agents sont construits en parallèle ; pendant ce temps,
+            # le thread principal prépare le journal et l'historique
+            start = time.perf_counter()
+            init_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="init")
+            victim = init_pool.submit(VictimAgent)
+            director = init_pool.submit(DirectorAgent, scenario=self.scenario)
+            moderator = init_pool.submit(ModeratorAgent)
+            init_pool.shutdown(wait=False)
+
+            log = None
+            if self.session_log:
+                rotate_logs(SimulationConfig.SESSION_LOG_DIR, keep=SimulationConfig.SESSION_LOG_KEEP)
+                log = SessionLog(
+                    SimulationConfig.SESSION_LOG_DIR,
+                    scenario=self.scenario,
+                    fsync_every=SimulationConfig.SESSION_LOG_FSYNC_EVERY,
+                    fsync_interval=SimulationConfig.SESSION_LOG_FSYNC_INTERVAL
+                )
+                self._print_status(f"Journal de session: {log.path}")
+
+            self.conversation = ConversationManager(
+                scenario=self.scenario,
+                max_messages=SimulationConfig.HISTORY_MEMORY_MESSAGES,
+                spill_dir=SimulationConfig.HISTORY_SPILL_DIR,
+                session_log=log
+            )
+
+            self.victim = victim.result()
+            self.director = director.result()
+            self.moderator = moderator.result()
+            init_ms = (time.perf_counter() - start) * 1000
+
+            # Requête minimale en arrière-plan (DNS, TLS, démarrage à froid du
+            # provider) pendant l'affichage des instructions
+            if LLMConfig.WARMUP and self.cassette is None:
+                self._warmup = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+                self._warmup.submit(self._warm_up_provider)
+                self._warmup.shutdown(wait=False)
+
+            if self.serve_audience:
+                self.audience_server = AudienceServer(
+                    self.moderator,
+                    host=SimulationConfig.AUDIENCE_SERVER_HOST,
+                    port=SimulationConfig.AUDIENCE_SERVER_PORT
+                )
+                self.audience_server.start()
+                self._print_status(f"Serveur d'audience: {self.audience_server.url}")
 
-            self._print_success("Agents initialises avec succes !")
+            self._print_success(f"Agents initialises avec succes ! ({init_ms:.0f} ms)")
             self._print_scenario_info()
 
             return True
@@ -73,6 +195,16 @@ class TheatreSimulation:
             self._print_error(f"Erreur d'initialisation: {e}")
             return False
 
+    def _warm_up_provider(self):
+        """Préchauffe le provider ; un échec est sans conséquence pour la session."""
+        try:
+            elapsed = warm_up_llm()
+            if SimulationConfig.DEBUG:
+                print(f"\n[DEBUG] Provider préchauffé en {elapsed * 1000:.0f} ms")
+        except Exception as e:
+            if SimulationConfig.DEBUG:
+                print(f"\n[DEBUG] Préchauffage du provider impossible: {e}")
+
     def run(self):
         """Lance la boucle principale de simulation."""
         if not self.initialize():
@@ -94,49 +226,346 @@ class TheatreSimulation:
                     self._end_simulation()
                     break
 
-                self.conversation.add_message("scammer", scammer_input)
+                self._play_turn(scammer_input)
 
-                self._print_director_thinking()
+            except KeyboardInterrupt:
+                self._print_status("\n\nInterruption detectee...")
+                self._end_simulation()
+                break
+            except Exception as e:
+                self._print_error(f"Erreur: {e}")
+                continue
 
-                recent_history = self.conversation.get_recent_history(n=4)
-                new_objective = self.director.analyze_and_update(
-                    scammer_message=scammer_input,
-                    recent_history=recent_history
-                )
+    async def arun(self):
+        """
+        Version asynchrone de la boucle principale.
 
-                self.victim.update_objective(new_objective)
+        Les appels LLM passent par les méthodes async des agents (ainvoke) ;
+        la saisie console est déportée dans un thread pour ne pas bloquer
+        la boucle asyncio, qui peut ainsi héberger d'autres tâches.
+        """
+        if not self.initialize():
+            return
 
-                if self.audience_mode and self.turn % SimulationConfig.AUDIENCE_VOTE_FREQUENCY == 0:
-                    self._run_audience_vote()
+        self.running = True
+        self._print_instructions()
 
-                self._print_jeanne_thinking()
+        while self.running:
+            try:
+                self.turn += 1
 
-                response = self.victim.respond(scammer_input)
+                scammer_input = await asyncio.to_thread(self._get_scammer_input)
 
-                effects = self.conversation.extract_sound_effects(response)
-                self.conversation.add_message(
-                    "victim",
-                    response,
-                    metadata={"sound_effects": effects}
-                )
+                if scammer_input is None:
+                    continue
 
-                self._print_victim_response(response)
+                if scammer_input.lower() in ['quit', 'exit', 'q']:
+                    await self._aend_simulation()
+                    break
 
-            except KeyboardInterrupt:
+                await self._aplay_turn(scammer_input)
+
+            except (KeyboardInterrupt, asyncio.CancelledError):
                 self._print_status("\n\nInterruption detectee...")
-                self._end_simulation()
+                await self._aend_simulation()
                 break
             except Exception as e:
                 self._print_error(f"Erreur: {e}")
                 continue
 
+    def run_scripted(self, scammer_lines: List[str], transcript_path: Optional[str] = None) -> Dict:
+        """
+        Joue une conversation scriptée, sans interaction (mode batch).
+
+        Args:
+            scammer_lines: Les messages de l'arnaqueur, un par tour
+            transcript_path: Fichier où sauvegarder la transcription (optionnel)
+
+        Returns:
+            Dict: Les statistiques de la conversation
+
+        Raises:
+            RuntimeError: Si les agents n'ont pas pu être initialisés
+        """
+        if not self.initialize():
+            raise RuntimeError("Initialisation de la simulation impossible")
+
+        self.running = True
+
+        for scammer_input in scammer_lines:
+            self.turn += 1
+            try:
+                self._play_turn(scammer_input)
+            except Exception as e:
+                self._print_error(f"Erreur: {e}")
+
+        self._shutdown_director()
+        self.running = False
+
+        if transcript_path:
+            self.conversation.save_to_file(transcript_path)
+
+        stats = self.conversation.get_statistics()
+        self.conversation.close()
+        return stats
+
+    def _play_turn(self, scammer_input: str):
+        """Joue un tour complet : Directeur, vote éventuel, réponse de Jeanne."""
+        self._record_input(scammer_input)
+        if self.pipelined:
+            # L'analyse du tour précédent (qui peut faire avancer l'étape)
+            # est terminée avant d'enregistrer l'étape de ce message
+            self._apply_pending_objective()
+        self.conversation.add_message(
+            "scammer",
+            scammer_input,
+            metadata={"stage": self.director.current_stage + 1}
+        )
+
+        recent_history = self.conversation.get_recent_history(n=4)
+
+        if self.pipelined:
+            # Le Directeur analyse ce message pendant que Jeanne répond
+            self._submit_director_analysis(scammer_input, recent_history)
+        else:
+            self._print_director_thinking()
+
+            new_objective = self.director.analyze_and_update(
+                scammer_message=scammer_input,
+                recent_history=recent_history
+            )
+
+            self.victim.update_objective(new_objective)
+
+        if self.audience_server:
+            self._collect_live_vote()
+
+        if self.audience_mode and self.turn % SimulationConfig.AUDIENCE_VOTE_FREQUENCY == 0:
+            self._run_audience_vote()
+
+        self._print_jeanne_thinking()
+
+        response = self.victim.respond(scammer_input)
+
+        self._record_victim_response(response)
+
+    async def _aplay_turn(self, scammer_input: str):
+        """Version asynchrone de _play_turn."""
+        self._record_input(scammer_input)
+        if self.pipelined:
+            await self._aapply_pending_objective()
+        self.conversation.add_message(
+            "scammer",
+            scammer_input,
+            metadata={"stage": self.director.current_stage + 1}
+        )
+
+        recent_history = self.conversation.get_recent_history(n=4)
+
+        if self.pipelined:
+            self._pending_objective_task = asyncio.create_task(
+                self.director.aanalyze_and_update(
+                    scammer_message=scammer_input,
+                    recent_history=recent_history
+                )
+            )
+        else:
+            self._print_director_thinking()
+
+            new_objective = await self.director.aanalyze_and_update(
+                scammer_message=scammer_input,
+                recent_history=recent_history
+            )
+
+            self.victim.update_objective(new_objective)
+
+        if self.audience_server:
+            self._collect_live_vote()
+
+        if self.audience_mode and self.turn % SimulationConfig.AUDIENCE_VOTE_FREQUENCY == 0:
+            await self._arun_audience_vote()
+
+        if self.streaming:
+            response = await self._astream_victim_response(scammer_input)
+            self._record_victim_response(response, display=False)
+            return
+
+        self._print_jeanne_thinking()
+
+        response = await self.victim.arespond(scammer_input)
+
+        self._record_victim_response(response)
+
+    def _record_input(self, scammer_input: str):
+        """Enregistre la réplique de l'arnaqueur dans la cassette (--record)."""
+        if self.cassette is not None and self.cassette.mode == "record":
+            self.cassette.record_event("input", scammer_input)
+
+    def _record_victim_response(self, response: str, display: bool = True):
+        """
+        Enregistre la réponse de Jeanne dans l'historique et l'affiche.
+
+        Les effets sonores sont ceux joués par les outils pendant la
+        réponse (victim.last_effects), attachés une seule fois au message.
+        """
+        effects = self.victim.last_effects
+
+        self.conversation.add_message(
+            "victim",
+            response,
+            metadata={"sound_effects": [event.effect for event in effects]}
+        )
+
+        if display:
+            self._print_victim_response(response, effects)
+
+    async def _astream_victim_response(self, scammer_input: str):
+        """
+        Affiche la réponse de Jeanne au fil des tokens.
+
+        Avec Rich, les tokens s'ajoutent dans un panneau live dont le
+        sous-titre liste les effets sonores dès que leur outil se termine.
+
+        Returns:
+            str: La réponse finale
+        """
+        print()
+
+        if not RICH_AVAILABLE:
+            from tools.audio_tools import AudioSimulator
+
+            print("JEANNE: ", end="", flush=True)
+            response = await self.victim.astream_respond(
+                scammer_input,
+                on_token=lambda token: print(token, end="", flush=True),
+                on_effect=lambda event: print(AudioSimulator.render_effect(event), end="", flush=True)
+            )
+            print("\n")
+            return response
+
+        text = Text()
+        panel = Panel(text, title="JEANNE DUBOIS", border_style="green")
+        effects: List[str] = []
+
+        def on_effect(event):
+            effects.append(event.effect)
+            panel.subtitle = "🔊 " + ", ".join(effects)
+
+        with Live(panel, console=self.console, refresh_per_second=20):
+            response = await self.victim.astream_respond(
+                scammer_input,
+                on_token=text.append,
+                on_effect=on_effect
+            )
+            # Le texte final fait foi (les tokens d'avant un appel d'outil en sont exclus)
+            text.plain = response
+
+        print()
+        return response
+
+    def _submit_director_analysis(self, scammer_message: str, recent_history: str):
+        """Lance l'analyse du Directeur en arrière-plan (mode pipeliné)."""
+        if self._director_executor is None:
+            self._director_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="director"
+            )
+
+        self._pending_objective = self._director_executor.submit(
+            self.director.analyze_and_update,
+            scammer_message=scammer_message,
+            recent_history=recent_history
+        )
+
+    def _apply_pending_objective(self):
+        """Attend l'analyse en cours du Directeur et applique son objectif."""
+        if self._pending_objective is None:
+            return
+
+        future, self._pending_objective = self._pending_objective, None
+        try:
+            self.victim.update_objective(future.result())
+        except Exception as e:
+            self._print_error(f"Erreur Directeur: {e}")
+
+    async def _aapply_pending_objective(self):
+        """Version asynchrone de _apply_pending_objective."""
+        if self._pending_objective_task is None:
+            return
+
+        task, self._pending_objective_task = self._pending_objective_task, None
+        try:
+            self.victim.update_objective(await task)
+        except Exception as e:
+            self._print_error(f"Erreur Directeur: {e}")
+
+    def _shutdown_director(self):
+        """Termine l'analyse en cours et arrête le thread du Directeur."""
+        self._apply_pending_objective()
+        if self._director_executor is not None:
+            self._director_executor.shutdown(wait=True)
+            self._director_executor = None
+
     def _run_audience_vote(self):
         """Execute un cycle de vote de l'audience."""
         self._print_status("\nTEMPS DE VOTE DE L'AUDIENCE !")
 
         context = self.conversation.get_recent_history(n=2)
         choices = self.moderator.generate_choices(context)
-        result = self.moderator.run_vote(choices, simulate=True)
+
+        if self.audience_server:
+            # La partie continue pendant le vote : le résultat est appliqué
+            # par _collect_live_vote au premier tour après sa clôture
+            self._collect_live_vote(force=True)
+            self._open_live_vote(choices)
+            return
+        self._apply_vote(choices)
+
+    async def _arun_audience_vote(self):
+        """Version asynchrone de _run_audience_vote."""
+        self._print_status("\nTEMPS DE VOTE DE L'AUDIENCE !")
+
+        context = self.conversation.get_recent_history(n=2)
+        choices = await self.moderator.agenerate_choices(context)
+
+        if self.audience_server:
+            self._collect_live_vote(force=True)
+            self._open_live_vote(choices)
+            return
+        self._apply_vote(choices)
+
+    def _collect_live_vote(self, force: bool = False):
+        """
+        Applique le résultat du vote en direct une fois sa durée écoulée.
+
+        Args:
+            force: Clôt le vote même s'il n'est pas encore terminé
+        """
+        vote = self.moderator.live_vote
+        if vote is None or (vote.remaining() > 0 and not force):
+            return
+        self._apply_vote(vote.choices, self.moderator.close_vote())
+
+    def _open_live_vote(self, choices: List[str]):
+        """Ouvre le vote sur le serveur d'audience et affiche les choix."""
+        self.moderator.open_vote(choices, duration=SimulationConfig.AUDIENCE_VOTE_SECONDS)
+        print(f"\n👥 VOTE EN DIRECT ({SimulationConfig.AUDIENCE_VOTE_SECONDS:.0f}s) sur {self.audience_server.url}/votes")
+        for i, choice in enumerate(choices):
+            print(f"   {i+1}. {choice}")
+
+    def _apply_vote(self, choices: List[str], result: Optional[Dict] = None):
+        """
+        Applique la contrainte gagnante du vote.
+
+        Sans résultat (pas de serveur ou aucun vote reçu), le vote est simulé.
+        """
+        if self.cassette is not None and self.cassette.mode == "replay":
+            # Même décompte que la session enregistrée
+            result = self.moderator.run_vote(choices, votes=self.cassette.next_event("vote"))
+        elif result is None:
+            result = self.moderator.run_vote(choices, simulate=True)
+        if self.cassette is not None and self.cassette.mode == "record":
+            self.cassette.record_event("vote", result["votes"])
         formatted = self.moderator.format_vote_result(result)
         print(formatted)
         self.victim.set_audience_constraint(result["winner"])
@@ -163,6 +592,12 @@ class TheatreSimulation:
         elif user_input.lower() == '/stage':
             self._print_current_stage()
             return None
+        elif user_input.lower() == '/perf':
+            self._print_perf()
+            return None
+        elif user_input.lower().startswith('/propose '):
+            self.moderator.add_proposal(user_input[len('/propose '):])
+            return None
 
         return user_input
 
@@ -202,6 +637,8 @@ class TheatreSimulation:
 |    /stats - Voir les statistiques                            |
 |    /save  - Sauvegarder la transcription                     |
 |    /stage - Voir l'etape actuelle du script                  |
+|    /perf  - Voir les performances des agents                 |
+|    /propose <texte> - Proposer un evenement a l'audience     |
 |    quit   - Terminer la simulation                           |
 |                                                               |
 +---------------------------------------------------------------+
@@ -221,16 +658,21 @@ JEANNE: Allo ? Qui est a l'appareil ?
         """Affiche que Jeanne reflechit."""
         print("\n[Jeanne reflechit...]")
 
-    def _print_victim_response(self, response: str):
-        """Affiche la reponse de la Victime avec formatage."""
+    def _print_victim_response(self, response: str, effects: Optional[List] = None):
+        """Affiche la reponse de la Victime avec formatage et ses effets sonores."""
         print()
         if RICH_AVAILABLE:
             self.console.print(Panel(
                 response,
                 title="JEANNE DUBOIS",
+                subtitle="🔊 " + ", ".join(event.effect for event in effects) if effects else None,
                 border_style="green"
             ))
         else:
+            from tools.audio_tools import AudioSimulator
+
+            for event in effects or []:
+                print(AudioSimulator.render_effect(event), end="")
             print(f"JEANNE: {response}")
         print()
 
@@ -267,6 +709,8 @@ JEANNE: Allo ? Qui est a l'appareil ?
 |  /stats - Statistiques de la session     |
 |  /save  - Sauvegarder la conversation    |
 |  /stage - Etape actuelle du scenario     |
+|  /perf  - Performances des agents        |
+|  /propose <texte> - Proposer un evenement|
 |  quit   - Quitter                        |
 |                                          |
 +==========================================+
@@ -289,6 +733,64 @@ JEANNE: Allo ? Qui est a l'appareil ?
 ╚══════════════════════════════════════════╝
 """)
 
+        if stats['sound_effects_by_type']:
+            effects = ", ".join(f"{effect} ×{count}" for effect, count in stats['sound_effects_by_type'].items())
+            print(f"🔊 Effets: {effects}")
+
+        latency = stats['turn_latency_ms']
+        if latency['count']:
+            print(
+                f"⏱️ Tours: moyenne {latency['mean']:.0f}ms, "
+                f"min {latency['min']:.0f}ms, max {latency['max']:.0f}ms"
+            )
+
+        if self.director.gating:
+            print(
+                f"🎬 Directeur: {self.director.analysis_count} analyses LLM, "
+                f"{self.director.gated_count} objectifs réutilisés"
+            )
+
+        if self.audience_mode:
+            intake = self.moderator.intake.stats
+            print(
+                f"👥 Propositions: {intake['accepted']} acceptées, {intake['filtered']} filtrées, "
+                f"{intake['rate_limited']} limitées"
+            )
+
+        if self.cassette is not None:
+            cassette = self.cassette.stats()
+            action = "enregistré(s)" if cassette["mode"] == "record" else "rejoué(s)"
+            print(f"📼 Cassette {cassette['path']}: {cassette['calls']} appel(s) LLM {action}, {cassette['misses']} absent(s)")
+
+        cache_stats = get_llm_cache_stats()
+        if cache_stats:
+            print(
+                f"💾 Cache LLM: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['coalesced']} coalescés ({cache_stats['hit_rate']:.0%}), "
+                f"{cache_stats['entries']} entrées"
+            )
+
+    def _print_perf(self):
+        """Affiche les performances glissantes de chaque agent."""
+        print("""
+╔══════════════════════════════════════════╗
+║         ⏱️  PERFORMANCES DES AGENTS       ║
+╚══════════════════════════════════════════╝""")
+
+        for agent in [self.director, self.victim, self.moderator]:
+            perf = agent.perf.summary()
+            wall = perf["wall_ms"]
+            ttft = f"{perf['ttft_ms']['p50']:.0f}ms" if perf["ttft_ms"] else "n/a"
+            tools = f"{perf['tool_calls_per_run']:.1f}" if perf["tool_calls_per_run"] is not None else "n/a"
+
+            print(f"  {perf['agent'].upper()} ({perf['calls']} appels, {perf['errors']} erreurs)")
+            print(f"    Durée  p50 {wall['p50']:.0f}ms | p95 {wall['p95']:.0f}ms | p99 {wall['p99']:.0f}ms")
+            print(f"    1er token p50: {ttft} | Outils/tour: {tools}")
+            print(f"    Tokens moyens: {perf['prompt_tokens']:.0f} prompt / {perf['completion_tokens']:.0f} réponse")
+            if perf["last_error"]:
+                print(f"    Dernière erreur: {perf['last_error'][:80]}")
+        print()
+
     def _print_current_stage(self):
         """Affiche l'étape actuelle du scénario."""
         stage_info = self.director.get_current_stage_info()
@@ -305,14 +807,35 @@ JEANNE: Allo ? Qui est a l'appareil ?
 ╚══════════════════════════════════════════╝
 """)
 
-    def _save_transcript(self):
-        """Sauvegarde la transcription."""
+    def _save_transcript(self) -> str:
+        """Sauvegarde la transcription et retourne son chemin."""
         from datetime import datetime
         filename = f"transcript_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         self.conversation.save_to_file(filename)
+        return filename
+
+    def _index_session(self, path: Optional[str]):
+        """Ajoute la session (journal, sinon transcription) à l'index de recherche."""
+        if not SimulationConfig.TRANSCRIPT_INDEX or not path:
+            return
+        try:
+            index = TranscriptIndex(SimulationConfig.TRANSCRIPT_INDEX_PATH)
+            index.update([path])
+            index.close()
+        except sqlite3.Error as e:
+            self._print_error(f"Indexation de la session impossible: {e}")
+
+    async def _aend_simulation(self):
+        """Version asynchrone de _end_simulation."""
+        await self._aapply_pending_objective()
+        await asyncio.to_thread(self._end_simulation)
 
     def _end_simulation(self):
         """Termine proprement la simulation."""
+        self._shutdown_director()
+        if self.audience_server:
+            self.audience_server.stop()
+
         print("\n" + "=" * 60)
         print("🎭 FIN DE LA SIMULATION 🎭")
         print("=" * 60)
@@ -322,13 +845,232 @@ JEANNE: Allo ? Qui est a l'appareil ?
 
         # Demander si on veut sauvegarder
         save = input("\n💾 Sauvegarder la transcription ? (o/n): ")
+        transcript = None
         if save.lower() in ['o', 'oui', 'y', 'yes']:
-            self._save_transcript()
+            transcript = self._save_transcript()
+
+        # Le journal contient les mêmes répliques que la transcription (et
+        # les étapes du script) : une seule des deux est indexée
+        log = self.conversation.session_log
+        self.conversation.close()
+        self._index_session(str(log.path) if log is not None else transcript)
 
         print("\nMerci d'avoir joué au Théâtre de l'Arnaque !")
         print("N'oubliez pas: dans la vraie vie, ne donnez JAMAIS vos informations par téléphone !\n")
 
 
+# ============================================
+# MODE BATCH
+# ============================================
+
+def _run_batch_job(job: Dict) -> Dict:
+    """
+    Exécute une conversation scriptée dans un processus du pool.
+
+    La sortie console de la simulation est redirigée vers un fichier
+    .log à côté de la transcription.
+
+    Args:
+        job: Script, scénario, mode audience et chemins de sortie
+
+    Returns:
+        Dict: Enregistrement de statistiques du run
+    """
+    record = {
+        "script": job["script"],
+        "scenario": job["scenario"],
+        "transcript": job["transcript"],
+        "log": job["log"],
+        "error": None
+    }
+
+    with open(job["log"], 'w', encoding='utf-8') as log, redirect_stdout(log):
+        # La transcription du batch est écrite par run_scripted : pas de journal
+        simulation = TheatreSimulation(
+            scenario=job["scenario"],
+            audience_mode=job["audience"],
+            session_log=False
+        )
+        try:
+            record.update(simulation.run_scripted(job["lines"], job["transcript"]))
+        except Exception as e:
+            record["error"] = str(e)
+
+    return record
+
+
+def run_batch(
+    script_paths: List[str],
+    scenario: str = "tech_support",
+    audience_mode: bool = False,
+    workers: Optional[int] = None,
+    output_dir: Optional[str] = None
+) -> List[Dict]:
+    """
+    Rejoue des conversations scriptées en parallèle (un processus par run).
+
+    Chaque fichier (ou chaque .txt d'un dossier) est une conversation
+    indépendante. On produit une transcription et un log par run, et
+    une ligne de statistiques par run dans batch_results.jsonl.
+
+    Args:
+        script_paths: Fichiers de répliques ou dossiers qui en contiennent
+        scenario: Le scénario joué par tous les runs
+        audience_mode: Active les votes (simulés) de l'audience
+        workers: Nombre de processus (défaut: SimulationConfig.BATCH_WORKERS)
+        output_dir: Dossier de sortie (défaut: SimulationConfig.BATCH_OUTPUT_DIR)
+
+    Returns:
+        List[Dict]: Les statistiques de chaque run, dans l'ordre des scripts
+    """
+    workers = workers or SimulationConfig.BATCH_WORKERS
+    out = Path(output_dir or SimulationConfig.BATCH_OUTPUT_DIR)
+    out.mkdir(parents=True, exist_ok=True)
+
+    scripts: List[Path] = []
+    for path in map(Path, script_paths):
+        scripts.extend(sorted(path.glob("*.txt")) if path.is_dir() else [path])
+
+    jobs = []
+    for index, script in enumerate(scripts):
+        name = f"{index:04d}_{script.stem}"
+        jobs.append({
+            "script": str(script),
+            "lines": load_scammer_lines(str(script)),
+            "scenario": scenario,
+            "audience": audience_mode,
+            "transcript": str(out / f"{name}.txt"),
+            "log": str(out / f"{name}.log")
+        })
+
+    print(f"📦 Mode batch: {len(jobs)} conversation(s), {workers} processus, scénario {scenario}")
+
+    records: List[Optional[Dict]] = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_batch_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                records[i] = future.result()
+            except Exception as e:
+                records[i] = {
+                    "script": jobs[i]["script"],
+                    "scenario": scenario,
+                    "transcript": jobs[i]["transcript"],
+                    "log": jobs[i]["log"],
+                    "error": str(e)
+                }
+            status = "ERREUR" if records[i]["error"] else "OK"
+            print(f"  [{status}] {jobs[i]['script']} → {jobs[i]['transcript']}")
+
+    results_path = out / "batch_results.jsonl"
+    with open(results_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    failed = sum(1 for r in records if r["error"])
+    print(f"✅ {len(records) - failed}/{len(records)} run(s) réussi(s). Statistiques: {results_path}")
+
+    if SimulationConfig.TRANSCRIPT_INDEX:
+        index = TranscriptIndex(SimulationConfig.TRANSCRIPT_INDEX_PATH)
+        index.update(r["transcript"] for r in records if not r["error"])
+        index.close()
+
+    return records
+
+
+# ============================================
+# REJEU D'UNE CASSETTE
+# ============================================
+
+def run_replay(transcript_path: Optional[str] = None) -> Dict:
+    """
+    Rejoue une session enregistrée (--record) sans réseau.
+
+    Les répliques de l'arnaqueur, les réponses des LLM et les votes
+    viennent de la cassette LLMConfig.CASSETTE_PATH ; seule notre
+    orchestration s'exécute réellement, d'où des mesures reproductibles.
+
+    Args:
+        transcript_path: Fichier où sauvegarder la transcription rejouée (optionnel)
+
+    Returns:
+        Dict: Les statistiques de la conversation rejouée
+    """
+    cassette = get_cassette()
+    header = cassette.header
+    for name, value in header.get("settings", {}).items():
+        setattr(SimulationConfig, name, value)
+
+    simulation = TheatreSimulation(
+        scenario=header.get("scenario", "tech_support"),
+        audience_mode=header.get("audience", False),
+        pipelined=header.get("pipelined"),
+        session_log=False
+    )
+    lines = cassette.events("input")
+    print(f"📼 Rejeu de {cassette.path}: {len(lines)} réplique(s), scénario {simulation.scenario}")
+
+    start = time.perf_counter()
+    stats = simulation.run_scripted(lines, transcript_path)
+    elapsed = time.perf_counter() - start
+
+    simulation._print_stats()
+    print(f"⏱️ Rejeu en {elapsed * 1000:.0f} ms")
+    return stats
+
+
+# ============================================
+# RECHERCHE DANS LES TRANSCRIPTIONS
+# ============================================
+
+def run_index(paths: Optional[List[str]], query: Optional[str], limit: int = 20) -> List[Dict]:
+    """
+    Met à jour l'index des transcriptions puis, si demandé, y cherche des répliques.
+
+    Args:
+        paths: Fichiers ou dossiers à indexer (optionnel)
+        query: Requête (mots, "expression", role:, effect:, scenario:, stage:)
+        limit: Nombre maximal de résultats
+
+    Returns:
+        List[Dict]: Les répliques trouvées
+    """
+    index = None
+    results: List[Dict] = []
+
+    try:
+        index = TranscriptIndex(SimulationConfig.TRANSCRIPT_INDEX_PATH)
+        if paths:
+            start = time.perf_counter()
+            counts = index.update(paths)
+            print(
+                f"🗂️ Index {index.path}: {counts['indexed']} fichier(s) indexé(s), "
+                f"{counts['unchanged']} inchangé(s), {counts['removed']} retiré(s) "
+                f"({(time.perf_counter() - start) * 1000:.0f} ms)"
+            )
+
+        if query:
+            start = time.perf_counter()
+            results = index.search(query, limit=limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for hit in results:
+                role = "ARNAQUEUR" if hit["role"] == "scammer" else "JEANNE"
+                stage = f" étape {hit['stage']}" if hit["stage"] is not None else ""
+                effects = f" 🔊 {', '.join(hit['effects'])}" if hit["effects"] else ""
+                content = " ".join(hit["content"].split())
+                print(f"\n{hit['path']} [{hit['scenario']}{stage}] tour {hit['turn']} - {role}{effects}")
+                print(f"  {content[:200]}{'…' if len(content) > 200 else ''}")
+            print(f"\n🔎 {len(results)} réplique(s) trouvée(s) en {elapsed:.1f} ms")
+    except sqlite3.Error as e:
+        print(f"⚠️ Index {SimulationConfig.TRANSCRIPT_INDEX_PATH} inutilisable: {e}")
+    finally:
+        if index is not None:
+            index.close()
+
+    return results
+
+
 # ============================================
 # POINT D'ENTRÉE
 # ============================================
@@ -348,7 +1090,17 @@ Exemples:
   python main.py                        # Scénario par défaut (support technique)
   python main.py --scenario bank_fraud  # Scénario de fraude bancaire
   python main.py --audience             # Active les votes du public
+  python main.py --serve-audience       # Votes et propositions du public via HTTP
+  python main.py --strict-director      # Attend le Directeur avant chaque réponse
+  python main.py --async                # Boucle asyncio (appels LLM via ainvoke)
+  python main.py --stream               # Réponses de Jeanne affichées token par token
   python main.py --list-scenarios       # Liste les scénarios disponibles
+  python main.py --batch scripts/ -w 8  # Rejoue des conversations scriptées
+  python main.py --render-log sessions/session_xxx.jsonl  # Transcription d'un journal
+  python main.py --index . sessions/    # Indexe transcriptions et journaux
+  python main.py --record run.cassette.jsonl  # Enregistre tous les appels LLM
+  python main.py --replay run.cassette.jsonl  # Rejoue la session sans réseau
+  python main.py --search "anydesk role:scammer"  # Cherche dans l'index
         """
     )
 
@@ -366,6 +1118,90 @@ Exemples:
         help='Active le mode audience avec votes'
     )
 
+    parser.add_argument(
+        '--serve-audience',
+        action='store_true',
+        help='Démarre le serveur HTTP local des propositions et votes (implique --audience)'
+    )
+
+    parser.add_argument(
+        '--strict-director',
+        action='store_true',
+        help='Désactive le Directeur pipeliné (analyse puis réponse, dans l\'ordre)'
+    )
+
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Lance la boucle de simulation asynchrone (asyncio)'
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Affiche les réponses de Jeanne en streaming (implique --async)'
+    )
+
+    parser.add_argument(
+        '--batch', '-b',
+        nargs='+',
+        metavar='SCRIPT',
+        help='Rejoue sans interaction des fichiers de répliques (ou dossiers de .txt)'
+    )
+
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help='Nombre de processus en mode batch (défaut: BATCH_WORKERS)'
+    )
+
+    parser.add_argument(
+        '--output-dir', '-o',
+        type=str,
+        default=None,
+        help='Dossier des transcriptions et statistiques du mode batch'
+    )
+
+    parser.add_argument(
+        '--render-log',
+        metavar='JOURNAL',
+        help='Reconstruit la transcription .txt d\'un journal de session (.jsonl ou .jsonl.gz) et quitte'
+    )
+
+    parser.add_argument(
+        '--record',
+        metavar='CASSETTE',
+        help='Enregistre tous les appels LLM, répliques et votes de la session dans une cassette'
+    )
+
+    parser.add_argument(
+        '--replay',
+        metavar='CASSETTE',
+        help='Rejoue une cassette sans réseau (réponses identiques) et quitte'
+    )
+
+    parser.add_argument(
+        '--index',
+        nargs='+',
+        metavar='CHEMIN',
+        help='Indexe des transcriptions .txt et journaux de session (fichiers ou dossiers) et quitte'
+    )
+
+    parser.add_argument(
+        '--search',
+        metavar='REQUÊTE',
+        help='Cherche des répliques dans l\'index (filtres role:, effect:, scenario:, stage:) et quitte'
+    )
+
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='Nombre maximal de résultats de --search'
+    )
+
     parser.add_argument(
         '--list-scenarios', '-l',
         action='store_true',
@@ -382,13 +1218,51 @@ Exemples:
         print()
         sys.exit(0)
 
+    if args.render_log:
+        output = Path(args.render_log.removesuffix(".gz").removesuffix(".jsonl") + ".txt")
+        output.write_text(render_transcript(args.render_log), encoding='utf-8')
+        print(f"Transcription reconstruite: {output}")
+        sys.exit(0)
+
+    if args.record and args.batch:
+        parser.error("--record enregistre une seule session : incompatible avec --batch")
+
+    if args.record or args.replay:
+        LLMConfig.CASSETTE_MODE = "record" if args.record else "replay"
+        LLMConfig.CASSETTE_PATH = args.record or args.replay
+
+    if args.replay:
+        run_replay()
+        sys.exit(0)
+
+    if args.index or args.search:
+        run_index(args.index, args.search, args.limit)
+        sys.exit(0)
+
+    if args.batch:
+        run_batch(
+            args.batch,
+            scenario=args.scenario,
+            audience_mode=args.audience,
+            workers=args.workers,
+            output_dir=args.output_dir
+        )
+        sys.exit(0)
+
     # Lancer la simulation
     simulation = TheatreSimulation(
         scenario=args.scenario,
-        audience_mode=args.audience
+        audience_mode=args.audience,
+        pipelined=False if args.strict_director else None,
+        streaming=True if args.stream else None,
+        serve_audience=args.serve_audience
     )
 
-    simulation.run()
+    # Le streaming repose sur astream_events : il passe par la boucle asyncio
+    if args.use_async or simulation.streaming:
+        asyncio.run(simulation.arun())
+    else:
+        simulation.run()
 
 
 if __name__ == "__main__":
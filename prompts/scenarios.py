@@ -1,4 +1,7 @@
-from typing import Dict, List
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Set
 
 TECH_SUPPORT_SCRIPT = [
     {
@@ -211,6 +214,105 @@ SCENARIOS: Dict[str, List[Dict]] = {
 }
 
 
+def fold_accents(text: str) -> str:
+    """
+    Met un texte en minuscules et retire les accents ("Accès" → "acces").
+
+    Les apostrophes typographiques sont ramenées à l'apostrophe simple,
+    pour que "aujourd’hui" et "aujourd'hui" se comparent à l'identique.
+
+    Args:
+        text: Le texte à normaliser
+
+    Returns:
+        str: Le texte replié
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower().replace("’", "'"))
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class StageTriggerMatcher:
+    """
+    Détecteur de mots-clés compilé pour tous les scripts.
+
+    Tous les déclencheurs de tous les scénarios sont repliés (minuscules,
+    sans accents) puis compilés en UNE expression régulière : un seul
+    passage sur le message suffit pour noter toutes les étapes, quel que
+    soit le nombre de scénarios et de déclencheurs.
+
+    Un déclencheur doit commencer un mot ("code" trouve "codes" mais
+    "pin" ne trouve plus "lapin"). Quand un déclencheur en contient un
+    autre ("compte sécurisé" contient "compte"), il compte aussi pour
+    les étapes du plus court, l'expression ne gardant que le plus long.
+
+    Attributes:
+        pattern: L'expression compilée (None avant le premier score())
+        stages_by_trigger: Déclencheur replié → {scénario: étapes}
+    """
+
+    def __init__(self, scenarios: Dict[str, List[Dict]]):
+        """
+        Prépare le détecteur ; la compilation est faite au premier score()
+        (elle coûte plusieurs ms et n'est utile qu'en session).
+
+        Args:
+            scenarios: Les scripts par nom de scénario
+        """
+        self.scenarios = scenarios
+        self.stages_by_trigger: Dict[str, Dict[str, Set[int]]] = {}
+        self.pattern: Optional[re.Pattern] = None
+        self._lock = threading.Lock()
+
+    def _compile(self):
+        """Compile les déclencheurs des scénarios."""
+        stages_by_trigger: Dict[str, Dict[str, Set[int]]] = {}
+        for scenario, script in self.scenarios.items():
+            for index, stage in enumerate(script):
+                for trigger in stage.get("triggers", []):
+                    folded = fold_accents(trigger).strip()
+                    if folded:
+                        entry = stages_by_trigger.setdefault(folded, {})
+                        entry.setdefault(scenario, set()).add(index)
+
+        # Un déclencheur long hérite des étapes des déclencheurs qu'il contient
+        for trigger, entry in stages_by_trigger.items():
+            for other, other_entry in stages_by_trigger.items():
+                if other != trigger and re.search(r"(?<!\w)" + re.escape(other), trigger):
+                    for scenario, stages in other_entry.items():
+                        entry.setdefault(scenario, set()).update(stages)
+
+        # Les plus longs d'abord : l'alternance garde la correspondance la plus longue
+        ordered = sorted(stages_by_trigger, key=len, reverse=True)
+        self.stages_by_trigger = stages_by_trigger
+        self.pattern = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(t) for t in ordered) + ")")
+
+    def score(self, scenario: str, message: str) -> Dict[int, int]:
+        """
+        Compte les déclencheurs trouvés par étape du scénario.
+
+        Args:
+            scenario: Le scénario en cours
+            message: Le message de l'arnaqueur
+
+        Returns:
+            Dict[int, int]: Index d'étape → nombre de déclencheurs trouvés
+        """
+        if self.pattern is None:
+            with self._lock:
+                if self.pattern is None:
+                    self._compile()
+
+        scores: Dict[int, int] = {}
+        for match in self.pattern.finditer(fold_accents(message)):
+            for stage in self.stages_by_trigger[match.group()].get(scenario, ()):
+                scores[stage] = scores.get(stage, 0) + 1
+        return scores
+
+
+# Partagé par tous les Directeurs ; l'expression est compilée au premier score()
+TRIGGER_MATCHER = StageTriggerMatcher(SCENARIOS)
+
+
 def get_scenario_script(scenario_name: str) -> List[Dict]:
     """
     Récupère le script d'un scénario par son nom.
@@ -5,6 +5,8 @@ Ce module expose les outils disponibles pour les agents LLM.
 """
 
 from tools.audio_tools import (
+    SoundEffectEvent,
+    effect_events,
     get_audio_tools,
     play_dog_bark,
     play_doorbell,
@@ -15,6 +17,8 @@ from tools.audio_tools import (
 )
 
 __all__ = [
+    "SoundEffectEvent",
+    "effect_events",
     "get_audio_tools",
     "play_dog_bark",
     "play_doorbell",
@@ -1,7 +1,49 @@
-from typing import List
+from typing import Any, List, Sequence, Tuple
 from langchain.tools import tool, StructuredTool
 from langchain_core.tools import BaseTool
 
+
+class SoundEffectEvent(str):
+    """
+    Effet sonore typé renvoyé par un outil audio.
+
+    C'est une chaîne : le LLM reçoit le marqueur habituel
+    ("[🔊 SOUND_EFFECT: DOG_BARKING - Poupoune aboie fort]"). Mais
+    l'AgentExecutor remonte l'objet tel quel dans ses intermediate_steps
+    et dans les événements on_tool_end : les statistiques, l'affichage et
+    l'audio lisent effect et description sans jamais rescanner le texte.
+
+    Attributes:
+        effect: Nom de l'effet (ex: "DOG_BARKING")
+        description: Description lisible de l'effet
+    """
+
+    def __new__(cls, effect: str, description: str):
+        event = super().__new__(cls, f"[🔊 SOUND_EFFECT: {effect} - {description}]")
+        event.effect = effect
+        event.description = description
+        return event
+
+    def __reduce__(self):
+        return (SoundEffectEvent, (self.effect, self.description))
+
+
+def effect_events(intermediate_steps: Sequence[Tuple[Any, Any]]) -> List[SoundEffectEvent]:
+    """
+    Extrait les effets sonores des étapes intermédiaires d'un AgentExecutor.
+
+    Args:
+        intermediate_steps: Couples (action, observation) de l'AgentExecutor
+
+    Returns:
+        List[SoundEffectEvent]: Les effets joués, dans l'ordre des appels
+    """
+    return [
+        observation for _, observation in intermediate_steps
+        if isinstance(observation, SoundEffectEvent)
+    ]
+
+
 @tool
 def play_dog_bark() -> str:
     """
@@ -18,7 +60,7 @@ def play_dog_bark() -> str:
     Returns:
         str: Indicateur d'effet sonore à afficher
     """
-    return "[🔊 SOUND_EFFECT: DOG_BARKING - Poupoune aboie fort]"
+    return SoundEffectEvent("DOG_BARKING", "Poupoune aboie fort")
 
 
 @tool
@@ -36,7 +78,7 @@ def play_doorbell() -> str:
     Returns:
         str: Indicateur d'effet sonore à afficher
     """
-    return "[🔊 SOUND_EFFECT: DOORBELL - Ding dong ! La sonnette retentit]"
+    return SoundEffectEvent("DOORBELL", "Ding dong ! La sonnette retentit")
 
 
 @tool
@@ -54,7 +96,7 @@ def play_coughing_fit() -> str:
     Returns:
         str: Indicateur d'effet sonore à afficher
     """
-    return "[🔊 SOUND_EFFECT: COUGHING - Jeanne tousse pendant 10 secondes]"
+    return SoundEffectEvent("COUGHING", "Jeanne tousse pendant 10 secondes")
 
 
 @tool
@@ -72,7 +114,7 @@ def play_tv_background() -> str:
     Returns:
         str: Indicateur d'effet sonore à afficher
     """
-    return "[🔊 SOUND_EFFECT: TV_BACKGROUND - Les Feux de l'Amour en fond sonore]"
+    return SoundEffectEvent("TV_BACKGROUND", "Les Feux de l'Amour en fond sonore")
 
 
 @tool
@@ -90,7 +132,7 @@ def play_phone_static() -> str:
     Returns:
         str: Indicateur d'effet sonore à afficher
     """
-    return "[🔊 SOUND_EFFECT: PHONE_STATIC - Grésillement sur la ligne]"
+    return SoundEffectEvent("PHONE_STATIC", "Grésillement sur la ligne")
 
 
 @tool
@@ -108,7 +150,7 @@ def play_kettle_whistle() -> str:
     Returns:
         str: Indicateur d'effet sonore à afficher
     """
-    return "[🔊 SOUND_EFFECT: KETTLE_WHISTLE - La bouilloire siffle !]"
+    return SoundEffectEvent("KETTLE_WHISTLE", "La bouilloire siffle !")
 
 
 # ============================================
@@ -165,37 +207,17 @@ class AudioSimulator:
     }
 
     @classmethod
-    def render_effect(cls, effect_marker: str) -> str:
+    def render_effect(cls, event: SoundEffectEvent) -> str:
         """
-        Transforme un marqueur d'effet en texte formaté.
+        Transforme un effet en texte formaté.
 
         Args:
-            effect_marker: Le marqueur retourné par un outil
+            event: L'effet renvoyé par un outil
 
         Returns:
             str: Texte formaté avec émoji et description
         """
-        for key, value in cls.EFFECTS.items():
-            if key in effect_marker:
-                return f"\n{value}\n"
-        return effect_marker
-
-    @classmethod
-    def extract_effects(cls, response: str) -> List[str]:
-        """
-        Extrait tous les effets sonores d'une réponse.
-
-        Args:
-            response: La réponse complète de l'agent
-
-        Returns:
-            List[str]: Liste des effets trouvés
-        """
-        effects = []
-        for key in cls.EFFECTS.keys():
-            if key in response:
-                effects.append(key)
-        return effects
+        return f"\n{cls.EFFECTS.get(event.effect, event.description)}\n"
 
 
 # ============================================
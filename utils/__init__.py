@@ -2,7 +2,15 @@
 Module utilitaires.
 """
 
-from utils.memory import ConversationManager
+from utils.memory import (
+    ConversationManager,
+    load_scammer_lines
+)
+from utils.proposal_intake import ProposalIntake
 
-__all__ = ["ConversationManager"]
+__all__ = [
+    "ConversationManager",
+    "load_scammer_lines",
+    "ProposalIntake"
+]
 
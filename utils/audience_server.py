@@ -0,0 +1,251 @@
+"""
+Serveur d'audience
+==================
+
+Petit serveur HTTP local (bibliothèque standard uniquement) qui reçoit
+les propositions et les votes du public en JSON pendant le spectacle.
+
+ENDPOINTS :
+- GET  /token      Jeton du spectateur (JSON et cookie audience_token)
+- POST /proposals  {"token": "...", "text": "..."}
+- POST /votes      {"token": "...", "choice": 1}
+- GET  /vote       Choix et votes du vote en cours
+- GET  /stats      Compteurs de la collecte et du serveur
+
+Chaque requête ne fait que déposer la proposition dans la collecte du
+Modérateur (liste courte de taille fixe, jamais bloquante) ou incrémenter un compteur :
+la boucle de conversation n'attend jamais le serveur, qui tourne dans
+ses propres threads. Les connexions restent ouvertes (HTTP/1.1
+keep-alive) pour tenir plusieurs milliers de requêtes par seconde.
+
+Le spectateur est identifié par un jeton délivré par le serveur (dans le
+corps JSON ou le cookie) : signé avec un secret du serveur, il ne peut
+pas être inventé pour contourner la limite de débit ou le "un vote par
+spectateur". L'adresse IP ne sert pas : derrière un proxy local ou le
+NAT d'une salle, tout le public aurait la même.
+
+Codes de réponse : 202 accepté, 409 vote en double ou clos, 422 refusé par le filtre,
+429 trop de requêtes, 400 requête invalide, 401 jeton absent ou invalide.
+"""
+
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+from http.cookies import CookieError, SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from utils.proposal_intake import ACCEPTED, FILTERED, RATE_LIMITED
+
+
+STATUS_CODES = {
+    ACCEPTED: 202,
+    FILTERED: 422,
+    RATE_LIMITED: 429,
+    "duplicate": 409,
+    "invalid": 400,
+    "closed": 409,
+}
+
+TOKEN_COOKIE = "audience_token"
+
+
+class _AudienceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class AudienceServer:
+    """
+    Serveur HTTP des propositions et votes de l'audience.
+
+    Attributes:
+        moderator: Le Modérateur qui reçoit propositions et votes
+        host: Adresse d'écoute
+        port: Port d'écoute (0 = port libre choisi par le système)
+        stats: Compteurs de requêtes
+    """
+
+    def __init__(self, moderator, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Prépare le serveur (sans le démarrer).
+
+        Args:
+            moderator: Le ModeratorAgent de la simulation
+            host: Adresse d'écoute (localhost par défaut)
+            port: Port d'écoute
+        """
+        self.moderator = moderator
+        self.host = host
+        self.port = port
+        self.stats: Dict[str, int] = {"requests": 0, "errors": 0}
+
+        self._secret = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._httpd: Optional[_AudienceHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Démarre le serveur dans un thread d'arrière-plan."""
+        handler = type("AudienceHandler", (_AudienceHandler,), {"server_app": self})
+        self._httpd = _AudienceHTTPServer((self.host, self.port), handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="audience-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le serveur et ferme le port d'écoute."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def issue_token(self) -> str:
+        """
+        Délivre un jeton de spectateur (identifiant aléatoire signé).
+
+        Returns:
+            str: Le jeton, valable tant que le serveur tourne
+        """
+        client_id = secrets.token_urlsafe(12)
+        return f"{client_id}.{self._sign(client_id)}"
+
+    def check_token(self, token: Optional[str]) -> Optional[str]:
+        """
+        Vérifie un jeton délivré par issue_token.
+
+        Args:
+            token: Le jeton reçu
+
+        Returns:
+            Optional[str]: Identifiant du spectateur, ou None si le jeton est invalide
+        """
+        if not isinstance(token, str):
+            return None
+        client_id, _, signature = token.partition(".")
+        if client_id and hmac.compare_digest(signature, self._sign(client_id)):
+            return client_id
+        return None
+
+    def submit_proposal(self, client_id: str, text: str) -> str:
+        """
+        Dépose une proposition dans la collecte du Modérateur.
+
+        Une même proposition répétée ne fait qu'augmenter son compteur
+        dans la liste courte, dans la limite de débit du spectateur.
+
+        Args:
+            client_id: Identifiant du spectateur
+            text: La proposition
+
+        Returns:
+            str: Résultat de la collecte
+        """
+        return self.moderator.intake.submit(text, source=client_id)
+
+    def snapshot(self) -> Dict:
+        """Compteurs du serveur et de la collecte."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["intake"] = dict(self.moderator.intake.stats)
+        stats["pending_proposals"] = len(self.moderator.intake)
+        return stats
+
+    def _sign(self, client_id: str) -> str:
+        return hmac.new(self._secret, client_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+class _AudienceHandler(BaseHTTPRequestHandler):
+    """Traitement des requêtes (un thread par connexion)."""
+
+    protocol_version = "HTTP/1.1"
+    server_app: AudienceServer = None
+
+    def do_GET(self):
+        app = self.server_app
+        app._count("requests")
+
+        if self.path == "/token":
+            token = app.issue_token()
+            self._reply(200, {"token": token}, cookie=token)
+        elif self.path == "/vote":
+            vote = app.moderator.get_live_vote()
+            self._reply(200, vote or {"choices": [], "votes": [], "closed": True})
+        elif self.path == "/stats":
+            self._reply(200, app.snapshot())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        app = self.server_app
+        app._count("requests")
+
+        payload = self._read_json()
+        if payload is None:
+            app._count("errors")
+            self._reply(400, {"error": "invalid json"})
+            return
+
+        client_id = app.check_token(payload.get("token") or self._cookie_token())
+        if client_id is None:
+            app._count("errors")
+            self._reply(401, {"error": "missing or invalid token"})
+            return
+
+        if self.path == "/proposals":
+            text = payload.get("text")
+            if not isinstance(text, str):
+                self._reply(400, {"error": "missing text"})
+                return
+            status = app.submit_proposal(client_id, text)
+        elif self.path == "/votes":
+            try:
+                choice = int(payload.get("choice")) - 1
+            except (TypeError, ValueError):
+                self._reply(400, {"error": "missing choice"})
+                return
+            status = app.moderator.cast_vote(client_id, choice)
+        else:
+            self._reply(404, {"error": "not found"})
+            return
+
+        self._reply(STATUS_CODES.get(status, 200), {"status": status})
+
+    def _read_json(self) -> Optional[Dict]:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    def _cookie_token(self) -> Optional[str]:
+        try:
+            morsel = SimpleCookie(self.headers.get("Cookie", "")).get(TOKEN_COOKIE)
+        except CookieError:
+            return None
+        return morsel.value if morsel else None
+
+    def _reply(self, code: int, body: Dict, cookie: Optional[str] = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if cookie:
+            self.send_header("Set-Cookie", f"{TOKEN_COOKIE}={cookie}; Path=/; HttpOnly; SameSite=Strict")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Pas de ligne par requête dans la console du spectacle
+        pass
@@ -0,0 +1,397 @@
+"""
+Cassettes d'enregistrement / rejeu des appels LLM
+=================================================
+
+--record : chaque appel LLM (chaîne du Directeur, étapes de l'AgentExecutor
+de Jeanne avec ses appels d'outils, chaîne du Modérateur, résumés de
+mémoire) est écrit dans un fichier cassette JSONL, avec la requête, la
+réponse exacte et sa latence. Les répliques de l'arnaqueur et les
+résultats des votes de la session y sont aussi enregistrés.
+
+--replay : la même session est rejouée sans réseau ni clé API. Chaque
+appel est retrouvé par l'empreinte de sa requête (messages + paramètres :
+outils, stop) ; les réponses reviennent à l'identique. On peut ainsi
+profiler et optimiser l'orchestration (main.py, agents) sur de vraies
+conversations, avec des mesures reproductibles.
+
+CLÉ D'UN APPEL :
+L'empreinte ignore les identifiants générés à chaque exécution (id des
+messages, métadonnées de réponse) : seuls comptent le type, le contenu,
+les appels d'outils et leurs résultats. Deux requêtes identiques
+reçoivent leurs réponses enregistrées dans l'ordre.
+
+Le modèle enregistreur (CassetteLLM) se branche dans config.get_llm
+autour du modèle du provider ; en rejeu, il n'y a pas de modèle réel.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import warnings
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Appel absent de la cassette (la session rejouée a divergé)."""
+
+
+class Cassette:
+    """
+    Fichier cassette, en enregistrement ou en rejeu.
+
+    Attributes:
+        path: Chemin de la cassette (JSONL)
+        mode: "record" ou "replay"
+        header: Paramètres de la session enregistrée (scénario, modes...)
+        replay_latency: En rejeu, attend la latence enregistrée de chaque appel
+        calls: Appels enregistrés ou rejoués
+        misses: Appels introuvables en rejeu
+    """
+
+    def __init__(self, path: str, mode: str, header: Optional[Dict] = None, replay_latency: bool = False):
+        """
+        Ouvre une cassette.
+
+        Args:
+            path: Chemin de la cassette
+            mode: "record" (fichier écrasé) ou "replay" (fichier lu)
+            header: Paramètres de la session (enregistrement uniquement)
+            replay_latency: En rejeu, reproduit la latence enregistrée
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Mode de cassette inconnu: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.header: Dict = {}
+        self.calls = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._responses: Dict[str, Deque[Dict]] = defaultdict(deque)
+        self._events: Dict[str, Deque[Any]] = defaultdict(deque)
+
+        if mode == "record":
+            self._file = open(path, "w", encoding="utf-8")
+            self.set_header(header or {})
+        else:
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Écriture / lecture du fichier
+    # ------------------------------------------------------------------
+
+    def set_header(self, header: Dict):
+        """
+        Enregistre (ou complète) les paramètres de la session.
+
+        Args:
+            header: Paramètres à ajouter
+        """
+        self.header.update(header)
+        self._write({"type": "header", "version": CASSETTE_VERSION, **header})
+
+    def _write(self, entry: Dict):
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                self._file.flush()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                kind = entry.get("type")
+                if kind == "header":
+                    entry.pop("type")
+                    self.header.update(entry)
+                elif kind == "llm":
+                    self._responses[entry["key"]].append(entry)
+                elif kind == "event":
+                    self._events[entry["name"]].append(entry["value"])
+
+    def close(self):
+        """Ferme la cassette (enregistrement)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------------
+    # Appels LLM
+    # ------------------------------------------------------------------
+
+    def record_call(self, key: str, namespace: str, messages: List[BaseMessage], message: BaseMessage, latency: float):
+        """
+        Enregistre un appel LLM.
+
+        Args:
+            key: Empreinte de la requête (voir request_key)
+            namespace: Modèle et température du LLM appelant
+            messages: La requête
+            message: La réponse
+            latency: Durée de l'appel en secondes
+        """
+        with self._lock:
+            self.calls += 1
+        self._write({
+            "type": "llm",
+            "key": key,
+            "namespace": namespace,
+            "latency_ms": round(latency * 1000, 3),
+            "request": [{"type": m.type, "content": m.content} for m in messages],
+            "response": dumps(message)
+        })
+
+    def replay_call(self, key: str) -> tuple:
+        """
+        Retrouve la réponse enregistrée d'un appel.
+
+        Args:
+            key: Empreinte de la requête
+
+        Returns:
+            tuple: (message de réponse, latence enregistrée en secondes)
+
+        Raises:
+            CassetteMiss: Si l'appel n'est pas dans la cassette
+        """
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                self.misses += 1
+                raise CassetteMiss(f"Appel LLM absent de la cassette {self.path} (clé {key[:12]})")
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+            self.calls += 1
+
+        # loads est marqué "beta" par LangChain : on masque ses avertissements
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            message = loads(entry["response"])
+        return message, entry["latency_ms"] / 1000
+
+    # ------------------------------------------------------------------
+    # Événements de la session (répliques, votes)
+    # ------------------------------------------------------------------
+
+    def record_event(self, name: str, value: Any):
+        """
+        Enregistre un événement non-LLM de la session.
+
+        Args:
+            name: Type d'événement ("input", "vote"...)
+            value: Valeur (sérialisable en JSON)
+        """
+        self._write({"type": "event", "name": name, "value": value})
+
+    def next_event(self, name: str) -> Any:
+        """
+        Événement suivant d'un type donné, dans l'ordre d'enregistrement.
+
+        Args:
+            name: Type d'événement
+
+        Returns:
+            Any: La valeur enregistrée
+
+        Raises:
+            CassetteMiss: S'il n'y a plus d'événement de ce type
+        """
+        with self._lock:
+            queue = self._events.get(name)
+            if not queue:
+                raise CassetteMiss(f"Plus d'événement '{name}' dans la cassette {self.path}")
+            return queue.popleft()
+
+    def events(self, name: str) -> List[Any]:
+        """Tous les événements d'un type (sans les consommer)."""
+        return list(self._events.get(name, ()))
+
+    def stats(self) -> Dict:
+        """Compteurs de la cassette (mode, appels, ratés)."""
+        return {"path": self.path, "mode": self.mode, "calls": self.calls, "misses": self.misses}
+
+
+def request_key(messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict) -> str:
+    """
+    Empreinte d'une requête, indépendante des identifiants d'exécution.
+
+    Args:
+        messages: Les messages envoyés au modèle
+        stop: Séquences d'arrêt
+        kwargs: Paramètres de l'appel (outils liés, etc.)
+
+    Returns:
+        str: Empreinte SHA-256
+    """
+    normalized = []
+    for m in messages:
+        item = {"type": m.type, "content": m.content}
+        if isinstance(m, AIMessage) and m.tool_calls:
+            item["tool_calls"] = [(c["name"], c["args"], c.get("id")) for c in m.tool_calls]
+        if getattr(m, "tool_call_id", None):
+            item["tool_call_id"] = m.tool_call_id
+        normalized.append(item)
+
+    payload = json.dumps(
+        {"messages": normalized, "stop": stop, "kwargs": kwargs},
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _message_chunks(message: AIMessage) -> Iterator[AIMessageChunk]:
+    """Redécoupe une réponse rejouée en chunks de streaming (un par mot)."""
+    if message.tool_calls:
+        yield AIMessageChunk(
+            content=message.content,
+            tool_call_chunks=[{
+                "name": call["name"],
+                "args": json.dumps(call["args"]),
+                "id": call["id"],
+                "index": i
+            } for i, call in enumerate(message.tool_calls)],
+            usage_metadata=message.usage_metadata
+        )
+        return
+
+    words = str(message.content).split(" ")
+    for i, word in enumerate(words):
+        last = i == len(words) - 1
+        yield AIMessageChunk(
+            content=word if last else word + " ",
+            usage_metadata=message.usage_metadata if last else None
+        )
+
+
+class CassetteLLM(BaseChatModel):
+    """
+    Modèle de chat qui enregistre (ou rejoue) les appels d'un autre modèle.
+
+    Attributes:
+        cassette: La cassette partagée par tous les LLM du processus
+        namespace: Modèle et température (informatif, dans la cassette)
+        inner: Le modèle réel (None en rejeu)
+    """
+
+    cassette: Any
+    namespace: str = ""
+    inner: Optional[BaseChatModel] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"namespace": self.namespace, "mode": self.cassette.mode}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = request_key(messages, stop, kwargs)
+        if self.cassette.mode == "replay":
+            message, latency = self.cassette.replay_call(key)
+            if self.cassette.replay_latency:
+                time.sleep(latency)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        start = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, **kwargs)
+        self.cassette.record_call(key, self.namespace, messages, result.generations[0].message, time.perf_counter() - start)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = request_key(messages, stop, kwargs)
+        if self.cassette.mode == "replay":
+            message, latency = self.cassette.replay_call(key)
+            if self.cassette.replay_latency:
+                await asyncio.sleep(latency)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        start = time.perf_counter()
+        result = await self.inner._agenerate(messages, stop=stop, **kwargs)
+        self.cassette.record_call(key, self.namespace, messages, result.generations[0].message, time.perf_counter() - start)
+        return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        key = request_key(messages, stop, kwargs)
+        if self.cassette.mode == "replay":
+            message, latency = self.cassette.replay_call(key)
+            if self.cassette.replay_latency:
+                time.sleep(latency)
+            for chunk in _message_chunks(message):
+                if run_manager and chunk.content:
+                    run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+                yield ChatGenerationChunk(message=chunk)
+            return
+
+        start = time.perf_counter()
+        final = None
+        for generation in self.inner._stream(messages, stop=stop, **kwargs):
+            final = generation if final is None else final + generation
+            if run_manager and generation.message.content:
+                run_manager.on_llm_new_token(generation.message.content, chunk=generation)
+            yield generation
+        if final is not None:
+            self.cassette.record_call(key, self.namespace, messages, message_chunk_to_message(final.message), time.perf_counter() - start)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        key = request_key(messages, stop, kwargs)
+        if self.cassette.mode == "replay":
+            message, latency = self.cassette.replay_call(key)
+            if self.cassette.replay_latency:
+                await asyncio.sleep(latency)
+            for chunk in _message_chunks(message):
+                if run_manager and chunk.content:
+                    await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+                yield ChatGenerationChunk(message=chunk)
+            return
+
+        start = time.perf_counter()
+        final = None
+        async for generation in self.inner._astream(messages, stop=stop, **kwargs):
+            final = generation if final is None else final + generation
+            if run_manager and generation.message.content:
+                await run_manager.on_llm_new_token(generation.message.content, chunk=generation)
+            yield generation
+        if final is not None:
+            self.cassette.record_call(key, self.namespace, messages, message_chunk_to_message(final.message), time.perf_counter() - start)
@@ -0,0 +1,344 @@
+"""
+Provider LLM factice (LLM_PROVIDER=fake)
+========================================
+
+Un modèle de chat local, déterministe et sans réseau, qui imite le
+format attendu par chaque agent :
+- Directeur : "Objectif: ..." (tiré de la stratégie de l'étape en cours)
+- Modérateur : 3 propositions numérotées (tirées des propositions reçues)
+- Victime : réplique de Jeanne, avec parfois un appel d'outil audio
+- Résumé de mémoire : début du texte à résumer (taille bornée)
+
+Il sert à faire tourner la simulation hors ligne et à mesurer le coût de
+notre orchestration (LangChain compris) indépendamment du provider.
+
+LATENCE ARTIFICIELLE :
+Chaque appel attend une latence tirée d'une distribution configurable
+("constant", "uniform" ou "lognormal", autour de latency_ms), puis
+token_latency_ms entre deux tokens en streaming.
+
+DÉTERMINISME :
+Le générateur aléatoire de chaque appel est dérivé de la graine et du
+prompt rendu : un même prompt donne toujours la même réponse, quel que
+soit l'ordre des appels ou le thread qui les fait (hors réponses
+scriptées, jouées dans l'ordre).
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from itertools import count
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from prompts.scenarios import SCENARIOS
+
+
+VICTIM_OPENINGS = [
+    "Oh... Attendez, attendez jeune homme...",
+    "Pardon ? Vous pouvez parler plus fort ? J'ai pas mon appareil...",
+    "Ah bon ? Mon Dieu, c'est compliqué tout ça...",
+    "Excusez-moi, je cherchais mes lunettes...",
+    "Oui, oui, je vous écoute... enfin j'essaie...",
+]
+
+VICTIM_BODIES = [
+    "Raymond, mon défunt mari, il s'occupait de tout ça avant.",
+    "Mon petit-fils Kévin m'a dit de jamais rien donner au téléphone.",
+    "Vous avez dit quoi déjà, votre nom ? Je le note sur mon carnet.",
+    "C'est le bouton vert ou le bouton rouge ? J'ai plus de bouton du tout.",
+    "Je comprends rien à vos histoires d'ordinateur, moi.",
+    "Attendez, Poupoune me regarde bizarrement...",
+]
+
+VICTIM_ENDINGS = [
+    "Vous pouvez répéter ?",
+    "Vous êtes bien sûr de ce que vous dites ?",
+    "Je vais demander à mon neveu, il est gendarme.",
+    "Rappelez plus tard, c'est l'heure des Feux de l'Amour.",
+]
+
+DEFAULT_OBJECTIVES = [
+    "Demander plusieurs fois son nom et le noter",
+    "Rester calme et changer de sujet (parler de Poupoune)",
+    "Feindre de ne pas comprendre ce qu'on lui demande",
+    "Inventer des codes faux et se tromper plusieurs fois",
+]
+
+DEFAULT_PROPOSALS = [
+    "Quelqu'un sonne à la porte",
+    "Poupoune commence à aboyer fort",
+    "La bouilloire siffle",
+]
+
+# Nom d'étape -> stratégie de Jeanne, tous scénarios confondus
+_STAGE_STRATEGIES = {
+    stage["name"]: stage["victim_strategy"]
+    for script in SCENARIOS.values()
+    for stage in script
+}
+
+_call_ids = count()
+
+
+class FakeTheatreLLM(BaseChatModel):
+    """
+    Modèle de chat factice qui répond au format de chaque agent.
+
+    Attributes:
+        model: Nom affiché du modèle
+        temperature: Conservée pour la clé de cache (sans effet)
+        seed: Graine des tirages aléatoires
+        latency_ms: Latence médiane d'un appel
+        latency_distribution: "constant", "uniform" ou "lognormal"
+        latency_jitter: Dispersion (fraction de latency_ms ou sigma lognormal)
+        token_latency_ms: Délai entre deux tokens en streaming
+        tool_rate: Probabilité que Jeanne utilise un outil audio
+        script: Réponses scriptées par rôle, jouées dans l'ordre puis en boucle
+                (prioritaires sur les templates)
+    """
+
+    model: str = "fake-theatre"
+    temperature: float = 0.7
+    seed: int = 42
+    latency_ms: float = 0.0
+    latency_distribution: str = "lognormal"
+    latency_jitter: float = 0.3
+    token_latency_ms: float = 0.0
+    tool_rate: float = 0.3
+    script: Dict[str, List[str]] = {}
+
+    # Position dans les réponses scriptées, par rôle
+    _script_positions: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-theatre"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature, "seed": self.seed}
+
+    @classmethod
+    def load_script(cls, path: str) -> Dict[str, List[str]]:
+        """
+        Charge un fichier JSON de réponses scriptées.
+
+        Format: {"director": [...], "moderator": [...], "victim": [...]}
+
+        Args:
+            path: Chemin du fichier JSON
+
+        Returns:
+            Dict[str, List[str]]: Les réponses par rôle
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # ------------------------------------------------------------------
+    # Génération
+    # ------------------------------------------------------------------
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        rng = self._rng(messages)
+        time.sleep(self._draw_latency(rng))
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, rng, kwargs))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        rng = self._rng(messages)
+        await asyncio.sleep(self._draw_latency(rng))
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, rng, kwargs))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        rng = self._rng(messages)
+        time.sleep(self._draw_latency(rng))
+        for i, chunk in enumerate(self._chunks(self._respond(messages, rng, kwargs))):
+            if i and self.token_latency_ms:
+                time.sleep(self.token_latency_ms / 1000)
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        rng = self._rng(messages)
+        await asyncio.sleep(self._draw_latency(rng))
+        for i, chunk in enumerate(self._chunks(self._respond(messages, rng, kwargs))):
+            if i and self.token_latency_ms:
+                await asyncio.sleep(self.token_latency_ms / 1000)
+            if run_manager and chunk.content:
+                await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    def _rng(self, messages: List[BaseMessage]) -> random.Random:
+        """Générateur dérivé de la graine et du prompt rendu."""
+        digest = hashlib.sha256(
+            "\x00".join(str(m.content) for m in messages).encode("utf-8")
+        ).digest()
+        return random.Random(self.seed ^ int.from_bytes(digest[:8], "big"))
+
+    def _draw_latency(self, rng: random.Random) -> float:
+        """Tire la latence d'un appel (en secondes)."""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency_distribution == "constant":
+            ms = self.latency_ms
+        elif self.latency_distribution == "uniform":
+            spread = self.latency_ms * self.latency_jitter
+            ms = rng.uniform(self.latency_ms - spread, self.latency_ms + spread)
+        else:
+            ms = rng.lognormvariate(0.0, self.latency_jitter) * self.latency_ms
+        return max(ms, 0.0) / 1000
+
+    def _chunks(self, message: AIMessage) -> Iterator[AIMessageChunk]:
+        """Découpe une réponse en chunks de streaming (un par mot)."""
+        if message.tool_calls:
+            yield AIMessageChunk(
+                content="",
+                tool_call_chunks=[{
+                    "name": call["name"],
+                    "args": json.dumps(call["args"]),
+                    "id": call["id"],
+                    "index": i
+                } for i, call in enumerate(message.tool_calls)],
+                usage_metadata=message.usage_metadata
+            )
+            return
+
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            yield AIMessageChunk(
+                content=word if last else word + " ",
+                usage_metadata=message.usage_metadata if last else None
+            )
+
+    # ------------------------------------------------------------------
+    # Réponses par agent
+    # ------------------------------------------------------------------
+
+    def _respond(self, messages: List[BaseMessage], rng: random.Random, kwargs: Dict) -> AIMessage:
+        """Choisit le format de réponse selon l'agent appelant."""
+        system = " ".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+        human = next(
+            (str(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)),
+            ""
+        )
+
+        if "Directeur de Scénario" in system:
+            role, content = "director", self._director_reply(human, rng)
+        elif "Modérateur d'Audience" in system:
+            role, content = "moderator", self._moderator_reply(human, rng)
+        elif "Résumeur de conversation" in system:
+            role, content = "summary", self._summary_reply(human)
+        else:
+            role = "victim"
+            tool_call = self._victim_tool_call(messages, rng, kwargs.get("tools") or [])
+            if tool_call:
+                return self._with_usage(AIMessage(content="", tool_calls=[tool_call]), messages)
+            content = self._victim_reply(messages, rng)
+
+        scripted = self.script.get(role)
+        if scripted:
+            position = self._script_positions.get(role, 0)
+            self._script_positions[role] = position + 1
+            content = scripted[position % len(scripted)]
+
+        return self._with_usage(AIMessage(content=content), messages)
+
+    def _director_reply(self, human: str, rng: random.Random) -> str:
+        """Objectif tiré de la stratégie de l'étape courante du script."""
+        stage = ""
+        for line in human.splitlines():
+            if line.startswith("ÉTAPE ACTUELLE:"):
+                stage = line.split(":", 1)[1].strip()
+                break
+
+        strategy = _STAGE_STRATEGIES.get(stage)
+        objective = strategy if strategy and rng.random() < 0.7 else rng.choice(DEFAULT_OBJECTIVES)
+        return f"Objectif: {objective}"
+
+    def _moderator_reply(self, human: str, rng: random.Random) -> str:
+        """Trois propositions numérotées parmi celles reçues."""
+        proposals = [line[2:].strip() for line in human.splitlines() if line.startswith("- ")]
+        if len(proposals) < 3:
+            proposals += DEFAULT_PROPOSALS
+        chosen = rng.sample(proposals, 3)
+        return "\n".join(f"{i}. {p}" for i, p in enumerate(chosen, start=1))
+
+    def _summary_reply(self, human: str) -> str:
+        """Résumé court : début du résumé précédent et des nouveaux échanges."""
+        previous = human.split("RÉSUMÉ ACTUEL:")[-1].split("NOUVEAUX ÉCHANGES:")[0].strip()
+        previous = "" if previous == "(aucun)" else previous.removeprefix("Résumé :")
+        new_lines = human.split("NOUVEAUX ÉCHANGES:")[-1].split("Nouveau résumé:")[0]
+        return "Résumé : " + " ".join(previous.split()[:30] + new_lines.split()[:30])
+
+    def _victim_tool_call(
+        self,
+        messages: List[BaseMessage],
+        rng: random.Random,
+        tools: List[Dict]
+    ) -> Optional[Dict]:
+        """Décide si Jeanne utilise un outil audio avant de répondre."""
+        if not tools or isinstance(messages[-1], ToolMessage) or rng.random() >= self.tool_rate:
+            return None
+
+        tool = rng.choice(tools)
+        name = tool.get("function", tool).get("name") if isinstance(tool, dict) else tool.name
+        return {"name": name, "args": {}, "id": f"call_fake_{next(_call_ids)}"}
+
+    def _victim_reply(self, messages: List[BaseMessage], rng: random.Random) -> str:
+        """Réplique de Jeanne, intégrant le résultat d'un outil s'il y en a un."""
+        parts = [rng.choice(VICTIM_OPENINGS)]
+        if isinstance(messages[-1], ToolMessage):
+            parts.append(str(messages[-1].content))
+        parts.append(rng.choice(VICTIM_BODIES))
+        parts.append(rng.choice(VICTIM_ENDINGS))
+        return " ".join(parts)
+
+    def _with_usage(self, message: AIMessage, messages: List[BaseMessage]) -> AIMessage:
+        """Ajoute une estimation du nombre de tokens (≈ mots)."""
+        input_tokens = sum(len(str(m.content).split()) for m in messages)
+        output_tokens = len(str(message.content).split()) + len(message.tool_calls)
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+        return message
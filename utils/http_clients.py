@@ -0,0 +1,57 @@
+"""
+Client HTTP asynchrone partagé entre boucles asyncio
+====================================================
+
+Un httpx.AsyncClient se lie à la boucle asyncio qui l'utilise la première
+fois : ses connexions ne servent plus après un second asyncio.run dans le
+même processus (--async puis le moteur multi-sessions, benchmarks...).
+
+LoopLocalAsyncClient est l'objet unique donné à tous les LLM (voir
+config.LLMClientPool) ; il transmet chaque requête à un vrai client propre
+à la boucle en cours, créé au premier appel depuis cette boucle.
+"""
+
+import asyncio
+import threading
+import weakref
+
+import httpx
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    """
+    httpx.AsyncClient avec un pool de connexions par boucle asyncio.
+
+    Les requêtes sont construites par ce client (configuration commune)
+    et envoyées par le client de la boucle courante.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Args:
+            **kwargs: Paramètres de httpx.AsyncClient (limites, timeout...),
+                      appliqués à chaque client par boucle
+        """
+        super().__init__(**kwargs)
+        self._client_kwargs = kwargs
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._loop_lock = threading.Lock()
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        """Client de la boucle en cours (créé au premier appel)."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.get(loop)
+            if client is None:
+                client = self._loop_clients[loop] = httpx.AsyncClient(**self._client_kwargs)
+            return client
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._loop_client().send(request, **kwargs)
+
+    async def aclose(self):
+        """Ferme le client de la boucle en cours."""
+        with self._loop_lock:
+            client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
@@ -0,0 +1,329 @@
+"""
+Cache persistant des réponses LLM
+=================================
+
+Le Directeur (température 0.3) et le Modérateur (propositions par défaut)
+reçoivent souvent exactement les mêmes prompts d'une session à l'autre.
+Ce cache SQLite évite de repayer ces appels (latence et coût API),
+en particulier lors des runs batch répétés.
+
+FONCTIONNEMENT :
+- Clé = hash(provider, modèle, température, paramètres du LLM, prompt rendu)
+- Éviction : TTL (entrées trop vieilles), puis LRU au-delà de la taille max
+- Coalescence : si une requête identique est déjà en vol, on attend
+  sa réponse au lieu d'envoyer un second appel ; si cet appel échoue,
+  la clé est libérée tout de suite (callback on_llm_error)
+- Compteurs hits / misses / coalesced / evictions exposés par stats()
+
+Le cache se branche sur le LLM via l'interface BaseCache de LangChain
+(paramètre cache= du modèle), voir config.get_llm.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import warnings
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.load import dumps, loads
+from langchain_core.runnables.config import run_in_executor
+
+
+# Clés réservées par les lookups manqués de l'appel au LLM en cours : la
+# liste est créée au début de l'appel (ReleaseOnError, dans le contexte de
+# l'appelant) et partagée avec les tâches filles où LangChain fait le lookup
+_reserved: ContextVar[Optional[List[Tuple[str, threading.Event]]]] = ContextVar("llm_cache_reserved", default=None)
+
+
+class ResponseStore:
+    """
+    Stockage SQLite partagé entre toutes les vues de cache d'un processus.
+
+    Plusieurs processus (mode batch) peuvent partager le même fichier :
+    la base est ouverte en mode WAL avec un délai d'attente sur les verrous.
+
+    Attributes:
+        path: Chemin du fichier SQLite
+        ttl_seconds: Durée de vie d'une entrée
+        max_bytes: Taille maximale des réponses stockées
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_bytes: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._current_size()
+
+        # Requêtes en vol : clé -> (événement, heure de départ)
+        self._inflight: Dict[str, tuple] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: str, wait_timeout: float) -> Tuple[Optional[str], Optional[threading.Event]]:
+        """
+        Cherche une réponse ; en cas d'absence, réserve la clé.
+
+        Si la même clé est déjà en vol, attend (au plus wait_timeout)
+        que l'appel en cours publie sa réponse ou libère la clé.
+
+        Args:
+            key: La clé de cache
+            wait_timeout: Attente maximale d'une requête identique en vol
+
+        Returns:
+            Tuple: (réponse sérialisée, None) si trouvée ; sinon (None, réservation) :
+                   l'appelant doit appeler le LLM, puis put() ou release()
+        """
+        value = self._read(key)
+        if value is not None:
+            return value, None
+
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is None or time.monotonic() - inflight[1] > wait_timeout:
+                # Personne ne calcule cette clé (ou l'appel est bloqué) : on la prend
+                return None, self._reserve(key)
+            event = inflight[0]
+
+        if event.wait(wait_timeout):
+            value = self._read(key, count_hit=False)
+            if value is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return value, None
+
+        # L'appel en vol a échoué ou n'a pas répondu à temps : on reprend la clé
+        with self._lock:
+            return None, self._reserve(key)
+
+    def release(self, key: str, reservation: threading.Event):
+        """
+        Libère une clé réservée sans réponse (l'appel au LLM a échoué).
+
+        Les requêtes identiques en attente sont réveillées et appellent le
+        LLM elles-mêmes au lieu d'attendre la fin du délai.
+
+        Args:
+            key: La clé de cache
+            reservation: La réservation rendue par get()
+        """
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is None or inflight[0] is not reservation:
+                return
+            del self._inflight[key]
+        reservation.set()
+
+    def _reserve(self, key: str) -> threading.Event:
+        """Réserve une clé pour l'appelant (verrou tenu)."""
+        event = threading.Event()
+        self._inflight[key] = (event, time.monotonic())
+        self.misses += 1
+        return event
+
+    def put(self, key: str, value: str):
+        """
+        Enregistre une réponse et réveille les requêtes identiques en attente.
+
+        Args:
+            key: La clé de cache
+            value: La réponse sérialisée
+        """
+        now = time.time()
+        size = len(value.encode("utf-8"))
+
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._conn.commit()
+            self._total_bytes += size - (previous[0] if previous else 0)
+
+            inflight = self._inflight.pop(key, None)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+        if inflight is not None:
+            inflight[0].set()
+
+    def _read(self, key: str, count_hit: bool = True) -> Optional[str]:
+        """Lit une entrée valide (non expirée) et met à jour son dernier accès."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= row[2]
+                self.evictions += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            if count_hit:
+                self.hits += 1
+            return row[0]
+
+    def _evict(self):
+        """Supprime les entrées expirées puis les moins récemment utilisées (verrou tenu)."""
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,)
+        )
+        self.evictions += cursor.rowcount
+        self._total_bytes = self._current_size()
+
+        # On redescend à 90% de la limite pour ne pas évincer à chaque écriture
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            cursor = self._conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_access LIMIT 32
+                )
+            """)
+            if cursor.rowcount == 0:
+                break
+            self.evictions += cursor.rowcount
+            self._total_bytes = self._current_size()
+
+        self._conn.commit()
+
+    def _current_size(self) -> int:
+        """Taille totale des réponses stockées."""
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """
+        Retourne les compteurs du cache.
+
+        Returns:
+            Dict: hits, misses, coalesced, evictions, hit_rate, entries, size_bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.coalesced + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": entries,
+                "size_bytes": self._total_bytes
+            }
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Vue du cache pour un LLM donné (provider, modèle, température).
+
+    Attributes:
+        store: Le stockage SQLite partagé
+        namespace: Identifiant "provider:modèle:température"
+        wait_timeout: Attente maximale d'une requête identique en vol
+    """
+
+    def __init__(self, store: ResponseStore, namespace: str, wait_timeout: float = 60.0):
+        self.store = store
+        self.namespace = namespace
+        self.wait_timeout = wait_timeout
+        # À ajouter aux callbacks du LLM (voir config.get_llm)
+        self.error_handler = ReleaseOnError(store)
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        """Hash du namespace, des paramètres du LLM et du prompt rendu."""
+        raw = "\x00".join([self.namespace, llm_string, prompt])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        return self._decode(key, *self.store.get(key, self.wait_timeout))
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        # get() peut attendre une requête en vol : hors de la boucle asyncio,
+        # mais la réservation est notée dans le contexte de la tâche appelante
+        key = self._key(prompt, llm_string)
+        return self._decode(key, *await run_in_executor(None, self.store.get, key, self.wait_timeout))
+
+    def _decode(self, key: str, value: Optional[str], reservation: Optional[threading.Event]) -> Optional[RETURN_VAL_TYPE]:
+        if value is None:
+            reserved = _reserved.get()
+            if reserved is not None:
+                reserved.append((key, reservation))
+            return None
+        # loads est marqué "beta" par LangChain : on masque ses avertissements
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return loads(value)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.store.put(self._key(prompt, llm_string), dumps(list(return_val)))
+
+    def clear(self, **kwargs) -> None:
+        self.store.clear()
+
+
+class ReleaseOnError(BaseCallbackHandler):
+    """
+    Libère la clé réservée par le cache quand l'appel au LLM échoue.
+
+    Sans lui, les requêtes identiques attendraient wait_timeout secondes
+    une réponse qui ne viendra jamais.
+    """
+
+    # Exécuté dans le contexte de l'appelant (pas dans un thread à part)
+    run_inline = True
+
+    def __init__(self, store: ResponseStore):
+        self.store = store
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List, **kwargs):
+        _reserved.set([])
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs):
+        _reserved.set([])
+
+    def on_llm_error(self, error: BaseException, **kwargs):
+        for key, reservation in _reserved.get() or []:
+            self.store.release(key, reservation)
+        _reserved.set(None)
@@ -1,6 +1,45 @@
+import sys
+import time
+from collections import Counter
 from typing import List, Dict, Optional
 from datetime import datetime
 
+from utils.ring_buffer import SpillingRingBuffer
+from utils.session_log import SessionLog
+
+
+class Message:
+    """
+    Message compact de l'historique.
+
+    Objet à __slots__ (pas de dict par message), rôle interné (une seule
+    chaîne partagée par rôle), horodatage numérique (secondes epoch) et
+    métadonnées absentes (None) quand il n'y en a pas.
+    """
+
+    __slots__ = ("turn", "timestamp", "role", "content", "metadata")
+
+    def __init__(self, turn: int, role: str, content: str, metadata: Optional[Dict] = None, timestamp: float = None):
+        self.turn = turn
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.role = sys.intern(role)
+        self.content = content
+        self.metadata = metadata or None
+
+    def to_dict(self) -> Dict:
+        """Forme JSON du message (fichier de débordement, exports)."""
+        return {
+            "turn": self.turn,
+            "timestamp": self.timestamp,
+            "role": self.role,
+            "content": self.content,
+            "metadata": self.metadata or {}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        return cls(data["turn"], data["role"], data["content"], data.get("metadata"), data["timestamp"])
+
 
 class ConversationManager:
     """
@@ -9,23 +48,61 @@ class ConversationManager:
     Cette classe maintient l'historique complet et fournit
     des méthodes pour accéder au contexte récent.
 
+    Les statistiques sont tenues à jour à chaque message (compteurs par
+    rôle, par effet sonore et par étape, latence des tours) : /stats ne
+    reparcourt jamais l'historique.
+
     Attributes:
-        history: Liste complète des messages
+        history: Messages (Message), les plus anciens débordant sur disque
         start_time: Heure de début de la simulation
         scenario: Le scénario en cours
+        role_counts: Nombre de messages par rôle
+        effect_counts: Nombre d'utilisations de chaque effet sonore
+        stage_counts: Messages de l'arnaqueur par étape du script
     """
 
-    def __init__(self, scenario: str = "tech_support"):
+    def __init__(
+        self,
+        scenario: str = "tech_support",
+        max_messages: int = 1000,
+        spill_dir: Optional[str] = None,
+        session_log: Optional[SessionLog] = None
+    ):
         """
         Initialise le gestionnaire de conversation.
 
         Args:
             scenario: Le scénario d'arnaque en cours
+            max_messages: Messages gardés en mémoire (les plus anciens passent sur disque)
+            spill_dir: Dossier des fichiers de débordement (None = fichier temporaire)
+            session_log: Journal où chaque message est ajouté dès son arrivée (optionnel)
         """
-        self.history: List[Dict] = []
+        self.history = SpillingRingBuffer(
+            max_messages,
+            name="conversation",
+            spill_dir=spill_dir,
+            encode=Message.to_dict,
+            decode=Message.from_dict
+        )
         self.start_time = datetime.now()
         self.scenario = scenario
         self.turn_count = 0
+        self.session_log = session_log
+        self._reset_counters()
+
+    def _reset_counters(self):
+        """Remet à zéro les statistiques incrémentales."""
+        self.role_counts: Counter = Counter()
+        self.effect_counts: Counter = Counter()
+        self.stage_counts: Counter = Counter()
+
+        # Latence d'un tour : message de l'arnaqueur → réponse de Jeanne
+        self._turn_started: Optional[float] = None
+        self._latency_count = 0
+        self._latency_total = 0.0
+        self._latency_min = float("inf")
+        self._latency_max = 0.0
+        self._latency_last = 0.0
 
     def add_message(self, role: str, content: str, metadata: Optional[Dict] = None):
         """
@@ -34,21 +111,41 @@ class ConversationManager:
         Args:
             role: Le rôle ("scammer", "victim", "system")
             content: Le contenu du message
-            metadata: Métadonnées optionnelles (effets sonores, etc.)
-        """
-        message = {
-            "turn": self.turn_count,
-            "timestamp": datetime.now().isoformat(),
-            "role": role,
-            "content": content,
-            "metadata": metadata or {}
-        }
-
+            metadata: Métadonnées optionnelles (effets sonores, étape, etc.)
+        """
+        metadata = metadata or {}
+        message = Message(self.turn_count, role, content, metadata)
         self.history.append(message)
 
+        if self.session_log is not None:
+            self.session_log.append({"type": "message", **message.to_dict()})
+
         if role in ["scammer", "victim"]:
             self.turn_count += 1
 
+        self._update_counters(role, metadata)
+
+    def _update_counters(self, role: str, metadata: Dict):
+        """Met à jour les statistiques avec un nouveau message."""
+        self.role_counts[role] += 1
+
+        if role == "scammer":
+            self._turn_started = time.perf_counter()
+            if "stage" in metadata:
+                self.stage_counts[metadata["stage"]] += 1
+
+        elif role == "victim":
+            self.effect_counts.update(metadata.get("sound_effects") or [])
+
+            if self._turn_started is not None:
+                latency = time.perf_counter() - self._turn_started
+                self._turn_started = None
+                self._latency_count += 1
+                self._latency_total += latency
+                self._latency_min = min(self._latency_min, latency)
+                self._latency_max = max(self._latency_max, latency)
+                self._latency_last = latency
+
     def get_recent_history(self, n: int = 5) -> str:
         """
         Récupère les N derniers échanges formatés.
@@ -59,7 +156,7 @@ class ConversationManager:
         Returns:
             str: Historique formaté
         """
-        recent = self.history[-n:] if len(self.history) >= n else self.history
+        recent = self.history.tail(n)
 
         lines = []
         for msg in recent:
@@ -67,9 +164,9 @@ class ConversationManager:
                 "scammer": "🦹 ARNAQUEUR",
                 "victim": "👵 JEANNE",
                 "system": "⚙️ SYSTÈME"
-            }.get(msg["role"], msg["role"])
+            }.get(msg.role, msg.role)
 
-            lines.append(f"{role_emoji}: {msg['content'][:100]}...")
+            lines.append(f"{role_emoji}: {msg.content[:100]}...")
 
         return "\n".join(lines)
 
@@ -91,16 +188,16 @@ class ConversationManager:
         ]
 
         for msg in self.history:
-            if msg["role"] == "system":
-                lines.append(f"\n[{msg['content']}]\n")
+            if msg.role == "system":
+                lines.append(f"\n[{msg.content}]\n")
             else:
-                role_name = "ARNAQUEUR" if msg["role"] == "scammer" else "JEANNE"
+                role_name = "ARNAQUEUR" if msg.role == "scammer" else "JEANNE"
                 lines.append(f"{role_name}:")
-                lines.append(f"  {msg['content']}")
+                lines.append(f"  {msg.content}")
 
                 # Ajouter les métadonnées si présentes
-                if msg.get("metadata", {}).get("sound_effects"):
-                    effects = msg["metadata"]["sound_effects"]
+                if msg.metadata and msg.metadata.get("sound_effects"):
+                    effects = msg.metadata["sound_effects"]
                     lines.append(f"  🔊 [Effets: {', '.join(effects)}]")
 
                 lines.append("")
@@ -111,55 +208,45 @@ class ConversationManager:
 
         return "\n".join(lines)
 
-    def extract_sound_effects(self, message: str) -> List[str]:
-        """
-        Extrait les effets sonores d'un message.
-
-        Args:
-            message: Le message à analyser
-
-        Returns:
-            List[str]: Liste des effets trouvés
-        """
-        effects = []
-        effect_markers = [
-            "DOG_BARKING",
-            "DOORBELL",
-            "COUGHING",
-            "TV_BACKGROUND",
-            "PHONE_STATIC",
-            "KETTLE_WHISTLE"
-        ]
-
-        for marker in effect_markers:
-            if marker in message:
-                effects.append(marker)
-
-        return effects
-
     def get_statistics(self) -> Dict:
         """
         Génère des statistiques sur la conversation.
 
+        Coût constant : tout est lu dans les compteurs incrémentaux.
+
         Returns:
-            Dict: Statistiques (durée, nombre de messages, etc.)
+            Dict: Statistiques (durée, nombre de messages, effets par type,
+                  messages par étape, latence des tours en ms, etc.)
         """
-        scammer_messages = [m for m in self.history if m["role"] == "scammer"]
-        victim_messages = [m for m in self.history if m["role"] == "victim"]
-
-        total_effects = 0
-        for msg in victim_messages:
-            total_effects += len(self.extract_sound_effects(msg["content"]))
-
         duration = datetime.now() - self.start_time
 
         return {
             "duration_seconds": duration.total_seconds(),
             "total_turns": self.turn_count,
-            "scammer_messages": len(scammer_messages),
-            "victim_messages": len(victim_messages),
-            "sound_effects_used": total_effects,
-            "scenario": self.scenario
+            "scammer_messages": self.role_counts["scammer"],
+            "victim_messages": self.role_counts["victim"],
+            "sound_effects_used": sum(self.effect_counts.values()),
+            "scenario": self.scenario,
+            "messages_by_role": dict(self.role_counts),
+            "sound_effects_by_type": dict(self.effect_counts),
+            "messages_by_stage": dict(self.stage_counts),
+            "turn_latency_ms": self.get_latency_stats()
+        }
+
+    def get_latency_stats(self) -> Dict:
+        """
+        Agrégats de latence des tours (arnaqueur → réponse de Jeanne).
+
+        Returns:
+            Dict: Nombre de tours mesurés, moyenne, min, max et dernier tour (ms)
+        """
+        count = self._latency_count
+        return {
+            "count": count,
+            "mean": self._latency_total / count * 1000 if count else 0.0,
+            "min": self._latency_min * 1000 if count else 0.0,
+            "max": self._latency_max * 1000,
+            "last": self._latency_last * 1000
         }
 
     def save_to_file(self, filepath: str):
@@ -180,8 +267,48 @@ class ConversationManager:
         """
         Réinitialise la conversation.
         """
-        self.history = []
+        self.history.clear()
         self.start_time = datetime.now()
         self.turn_count = 0
+        self._reset_counters()
+        if self.session_log is not None:
+            self.session_log.append({"type": "reset", "start": time.time()})
         print("🔄 Historique réinitialisé.")
 
+    def close(self):
+        """Ferme le journal de session et les fichiers de débordement."""
+        if self.session_log is not None:
+            self.session_log.close()
+        self.history.close()
+
+
+def load_scammer_lines(filepath: str) -> List[str]:
+    """
+    Charge les répliques d'un arnaqueur scripté (mode batch).
+
+    Deux formats sont acceptés :
+    - une transcription sauvegardée (get_full_transcript) : on reprend
+      la réplique indentée sous chaque bloc "ARNAQUEUR:"
+    - un fichier texte simple : une réplique par ligne (lignes vides
+      et commentaires "#" ignorés)
+
+    Args:
+        filepath: Chemin du fichier de script
+
+    Returns:
+        List[str]: Les messages de l'arnaqueur, un par tour
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        raw_lines = f.read().splitlines()
+
+    if any(line.strip() == "ARNAQUEUR:" for line in raw_lines):
+        lines = []
+        for i, line in enumerate(raw_lines[:-1]):
+            if line.strip() == "ARNAQUEUR:" and raw_lines[i + 1].strip():
+                lines.append(raw_lines[i + 1].strip())
+        return lines
+
+    return [
+        line.strip() for line in raw_lines
+        if line.strip() and not line.strip().startswith("#")
+    ]
@@ -0,0 +1,201 @@
+"""
+Instrumentation des agents
+==========================
+
+Un callback LangChain par agent (Directeur, Victime, Modérateur) qui
+mesure chaque appel au LLM :
+- durée totale et délai avant le premier token (streaming)
+- tokens du prompt et de la complétion
+- nombre d'appels d'outils par exécution de l'AgentExecutor
+- erreurs
+
+Les mesures sont gardées dans des buffers circulaires (deque bornée) :
+la mémoire reste constante et les percentiles portent sur les N
+derniers appels, ce qui donne une vue "glissante" pendant un spectacle.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """
+    p50/p95/p99 (rang le plus proche) et moyenne, en millisecondes.
+
+    Args:
+        values: Durées en secondes
+
+    Returns:
+        Dict[str, float]: Statistiques en ms
+    """
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "mean": sum(ordered) / len(ordered) * 1000
+    }
+
+
+class AgentPerfMonitor(BaseCallbackHandler):
+    """
+    Callback de mesure des appels LLM d'un agent.
+
+    À brancher sur le LLM de l'agent (et sur l'AgentExecutor de la
+    Victime pour compter les appels d'outils).
+
+    Attributes:
+        agent_name: Nom de l'agent mesuré
+        llm_calls: Mesures des derniers appels LLM
+        tool_calls: Nombre d'outils utilisés par exécution d'agent
+        errors: Dernières erreurs (horodatage, message)
+    """
+
+    # Mesures très légères : on évite le passage par un thread en async
+    run_inline = True
+
+    def __init__(self, agent_name: str, window: int = 200):
+        """
+        Initialise le moniteur.
+
+        Args:
+            agent_name: Nom de l'agent ("director", "victim", "moderator")
+            window: Taille des buffers circulaires
+        """
+        self.agent_name = agent_name
+        self.llm_calls: deque = deque(maxlen=window)
+        self.tool_calls: deque = deque(maxlen=window)
+        self.errors: deque = deque(maxlen=window)
+        self.total_calls = 0
+        self.total_errors = 0
+        self.total_tool_calls = 0
+
+        self._lock = threading.Lock()
+        self._llm_runs: Dict[UUID, Dict] = {}
+        self._agent_runs: Dict[UUID, int] = {}
+
+    # ------------------------------------------------------------------
+    # Appels LLM
+    # ------------------------------------------------------------------
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        self._start_llm(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any):
+        self._start_llm(run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any):
+        run = self._llm_runs.get(run_id)
+        if run is not None and run["first_token"] is None:
+            run["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+
+        end = time.perf_counter()
+        prompt_tokens, completion_tokens = _token_usage(response)
+        self.llm_calls.append({
+            "wall": end - run["start"],
+            "ttft": run["first_token"] - run["start"] if run["first_token"] else None,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens
+        })
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            self._llm_runs.pop(run_id, None)
+            self.total_errors += 1
+        self.errors.append((time.time(), f"{type(error).__name__}: {error}"))
+
+    def _start_llm(self, run_id: UUID):
+        with self._lock:
+            self._llm_runs[run_id] = {"start": time.perf_counter(), "first_token": None}
+            self.total_calls += 1
+
+    # ------------------------------------------------------------------
+    # Exécutions de l'AgentExecutor (Victime)
+    # ------------------------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, **kwargs: Any):
+        # Branché localement sur l'AgentExecutor : seule sa propre exécution arrive ici
+        self._agent_runs[run_id] = 0
+
+    def on_agent_action(self, action, *, run_id: UUID, **kwargs: Any):
+        if run_id in self._agent_runs:
+            self._agent_runs[run_id] += 1
+            self.total_tool_calls += 1
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any):
+        count = self._agent_runs.pop(run_id, None)
+        if count is not None:
+            self.tool_calls.append(count)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._agent_runs.pop(run_id, None)
+
+    # ------------------------------------------------------------------
+    # Synthèse
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        """
+        Statistiques glissantes sur les derniers appels.
+
+        Returns:
+            Dict: Percentiles de durée et de TTFT, tokens moyens,
+                  outils par exécution, compteurs d'appels et d'erreurs
+        """
+        calls = list(self.llm_calls)
+        ttfts = [c["ttft"] for c in calls if c["ttft"] is not None]
+        tools = list(self.tool_calls)
+
+        def mean(values):
+            values = [v for v in values if v is not None]
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            "agent": self.agent_name,
+            "calls": self.total_calls,
+            "errors": self.total_errors,
+            "window": len(calls),
+            "wall_ms": percentiles([c["wall"] for c in calls]),
+            "ttft_ms": percentiles(ttfts) if ttfts else None,
+            "prompt_tokens": mean(c["prompt_tokens"] for c in calls),
+            "completion_tokens": mean(c["completion_tokens"] for c in calls),
+            "tool_calls_per_run": mean(tools) if tools else None,
+            "last_error": self.errors[-1][1] if self.errors else None
+        }
+
+
+def _token_usage(response) -> tuple:
+    """
+    Extrait (tokens prompt, tokens complétion) d'un LLMResult.
+
+    Les modèles de chat récents renseignent usage_metadata sur le
+    message ; OpenAI le fournit aussi dans llm_output["token_usage"].
+    """
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens"), usage.get("completion_tokens")
@@ -0,0 +1,177 @@
+"""
+Collecte des propositions de l'audience
+=======================================
+
+Avec un public de plusieurs milliers de personnes, on ne peut pas
+envoyer toutes les propositions au Modérateur : le prompt et la latence
+exploseraient. La collecte se fait donc en flux :
+
+1. Pré-filtre local (longueur, mots interdits) : aucun appel au LLM
+2. Limite de débit par source (seau à jetons) : un spectateur ne
+   peut pas inonder la collecte
+3. Liste courte des K propositions les plus demandées, tenue à jour
+   dès la réception avec l'algorithme "Space-Saving" (mémoire fixe,
+   quel que soit le nombre de propositions différentes)
+
+Seule la liste courte, de taille fixe, est envoyée à filter_chain.
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from prompts.scenarios import fold_accents
+
+
+# Résultats de ProposalIntake.submit
+ACCEPTED = "accepted"
+FILTERED = "filtered"
+RATE_LIMITED = "rate_limited"
+
+FORBIDDEN_WORDS = ["mort", "tuer", "suicide", "violence"]
+
+
+class ProposalIntake:
+    """
+    Collecte de propositions avec pré-filtre et liste courte.
+
+    submit() peut être appelé depuis n'importe quel thread (serveur,
+    console) et compte la proposition tout de suite ; drain() est
+    appelé par le Modérateur au moment du vote.
+
+    Attributes:
+        candidates: Propositions suivies (texte normalisé → compteur)
+        stats: Compteurs par résultat de submit()
+    """
+
+    def __init__(
+        self,
+        max_candidates: int = 64,
+        rate_per_minute: float = 6.0,
+        burst: int = 3,
+        min_length: int = 5,
+        max_length: int = 200,
+        max_sources: int = 10000
+    ):
+        """
+        Initialise la collecte.
+
+        Args:
+            max_candidates: Propositions différentes suivies en même temps
+            rate_per_minute: Propositions autorisées par source et par minute
+            burst: Propositions autorisées d'affilée pour une source
+            min_length: Longueur minimale d'une proposition
+            max_length: Longueur maximale (au-delà, tronquée)
+            max_sources: Sources dont on garde le débit (les plus anciennes sont oubliées)
+        """
+        self.max_candidates = max_candidates
+        self.rate_per_second = rate_per_minute / 60
+        self.burst = burst
+        self.min_length = min_length
+        self.max_length = max_length
+        self.max_sources = max_sources
+
+        self.candidates: Dict[str, Dict] = {}
+        self.stats: Dict[str, int] = dict.fromkeys([ACCEPTED, FILTERED, RATE_LIMITED], 0)
+
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._sequence = 0
+
+    def submit(self, proposal: str, source: str = "local") -> str:
+        """
+        Propose un événement et le compte dans la liste courte.
+
+        Args:
+            proposal: Le texte proposé
+            source: Identifiant du spectateur (IP, pseudo...)
+
+        Returns:
+            str: ACCEPTED, FILTERED ou RATE_LIMITED
+        """
+        text = " ".join(proposal.split())[:self.max_length]
+        if len(text) < self.min_length or any(word in fold_accents(text) for word in FORBIDDEN_WORDS):
+            return self._count(FILTERED)
+
+        if not self._take_token(source):
+            return self._count(RATE_LIMITED)
+
+        self._record(text)
+        return self._count(ACCEPTED)
+
+    def drain(self, k: int) -> List[str]:
+        """
+        Retire la liste courte pour un vote et repart de zéro.
+
+        Les k propositions les plus demandées (les plus anciennes à égalité)
+        sont prises et les compteurs vidés sous le même verrou : une
+        proposition acceptée pendant le vote compte pour le vote suivant.
+
+        Args:
+            k: Taille de la liste courte
+
+        Returns:
+            List[str]: Les propositions, de la plus demandée à la moins demandée
+        """
+        with self._lock:
+            best = heapq.nsmallest(
+                k, self.candidates.values(), key=lambda c: (-c["count"], c["order"])
+            )
+            self.candidates = {}
+        return [c["text"] for c in best]
+
+    def clear(self):
+        """Oublie les propositions (après un vote). Les limites de débit restent."""
+        with self._lock:
+            self.candidates = {}
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def _record(self, text: str):
+        """
+        Space-Saving : si la liste est pleine, la proposition la moins
+        demandée est remplacée et son compteur hérité (+1), ce qui borne
+        l'erreur sur les propositions vraiment populaires.
+        """
+        key = fold_accents(text).strip(" .!?")
+        with self._lock:
+            candidate = self.candidates.get(key)
+            if candidate is not None:
+                candidate["count"] += 1
+                return
+
+            count = 1
+            if len(self.candidates) >= self.max_candidates:
+                weakest = min(self.candidates, key=lambda k: self.candidates[k]["count"])
+                count += self.candidates.pop(weakest)["count"]
+
+            self._sequence += 1
+            self.candidates[key] = {"text": text, "count": count, "order": self._sequence}
+
+    def _take_token(self, source: str) -> bool:
+        """Seau à jetons par source : burst jetons, rechargés à rate_per_second."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(source, None)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_second)
+                bucket[1] = now
+
+            self._buckets[source] = bucket
+            if len(self._buckets) > self.max_sources:
+                self._buckets.popitem(last=False)
+
+            if bucket[0] < 1:
+                return False
+            bucket[0] -= 1
+            return True
+
+    def _count(self, status: str) -> str:
+        with self._lock:
+            self.stats[status] += 1
+        return status
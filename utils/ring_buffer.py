@@ -0,0 +1,141 @@
+"""
+Buffer circulaire avec débordement sur disque
+=============================================
+
+Pour les longues sessions (tests d'endurance de 24h, spectacles en
+continu), les historiques ne doivent pas grossir en mémoire. Seules les
+N dernières entrées restent en mémoire ; les plus anciennes sont écrites
+en JSON (une ligne par entrée) dans un fichier de débordement.
+
+L'itération relit d'abord le fichier puis la mémoire : l'historique
+complet reste disponible (transcription, export) sans occuper de RAM.
+"""
+
+import json
+import tempfile
+import threading
+from collections import deque
+from typing import Any, Callable, Iterator, List, Optional
+
+
+class SpillingRingBuffer:
+    """
+    Séquence en ajout seul : N entrées en mémoire, le reste sur disque.
+
+    Attributes:
+        maxlen: Entrées gardées en mémoire
+        spilled: Nombre d'entrées écrites sur disque
+        spill_path: Fichier de débordement (créé au premier débordement)
+    """
+
+    def __init__(
+        self,
+        maxlen: int,
+        name: str = "history",
+        spill_dir: Optional[str] = None,
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None
+    ):
+        """
+        Initialise le buffer.
+
+        Args:
+            maxlen: Entrées gardées en mémoire
+            name: Préfixe du fichier de débordement
+            spill_dir: Dossier du fichier de débordement (conservé) ;
+                       None = fichier temporaire du système, supprimé à la fermeture
+            encode: Conversion d'une entrée en objet JSON (défaut: identité)
+            decode: Conversion inverse à la relecture (défaut: identité)
+        """
+        self.maxlen = maxlen
+        self.name = name
+        self.spill_dir = spill_dir
+        self.spill_path: Optional[str] = None
+        self.spilled = 0
+
+        self._encode = encode or (lambda entry: entry)
+        self._decode = decode or (lambda data: data)
+        self._memory: deque = deque()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, entry: Any):
+        """
+        Ajoute une entrée ; la plus ancienne part sur disque si la mémoire est pleine.
+
+        Args:
+            entry: L'entrée à ajouter
+        """
+        with self._lock:
+            self._memory.append(entry)
+            if len(self._memory) > self.maxlen:
+                self._spill(self._memory.popleft())
+
+    def tail(self, n: int) -> List[Any]:
+        """
+        Les n dernières entrées (au plus maxlen, lues en mémoire uniquement).
+
+        Args:
+            n: Nombre d'entrées
+
+        Returns:
+            List[Any]: Les entrées, de la plus ancienne à la plus récente
+        """
+        with self._lock:
+            if n <= 0:
+                return []
+            return list(self._memory)[-n:]
+
+    def clear(self):
+        """Vide la mémoire et le fichier de débordement."""
+        with self._lock:
+            self._memory.clear()
+            if self._file is not None:
+                self._file.seek(0)
+                self._file.truncate()
+            self.spilled = 0
+
+    def close(self):
+        """
+        Ferme le fichier de débordement (supprimé s'il est temporaire).
+
+        Les entrées débordées sont oubliées : ensuite, le buffer ne contient
+        que les entrées en mémoire, et un nouvel ajout repart d'un nouveau
+        fichier.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.spill_path = None
+            self.spilled = 0
+
+    def __len__(self) -> int:
+        return self.spilled + len(self._memory)
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            memory = list(self._memory)
+            spilled = self.spilled
+            if spilled:
+                self._file.flush()
+
+        # Lecture en flux par un second descripteur : seules les entrées
+        # présentes au début de l'itération sont relues
+        if spilled:
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                for _, line in zip(range(spilled), f):
+                    yield self._decode(json.loads(line))
+        yield from memory
+
+    def _spill(self, entry: Any):
+        if self._file is None:
+            # Fichier temporaire nommé : relisible par un second descripteur
+            self._file = tempfile.NamedTemporaryFile(
+                mode="w", encoding="utf-8", dir=self.spill_dir,
+                prefix=f"{self.name}_", suffix=".jsonl", delete=not self.spill_dir
+            )
+            self.spill_path = self._file.name
+
+        self._file.write(json.dumps(self._encode(entry), ensure_ascii=False) + "\n")
+        self.spilled += 1
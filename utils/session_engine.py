@@ -0,0 +1,503 @@
+"""
+Moteur multi-sessions
+=====================
+
+TheatreSimulation est liée à la console (input, print) : une partie
+par processus. Pour une classe ou un événement, le moteur héberge des
+centaines de parties simultanées dans un seul processus, sur une seule
+boucle asyncio :
+
+- Un registre de sessions isolées : chacune a ses propres agents
+  (Victime, Directeur, Modérateur) et son ConversationManager
+- Une API programmatique : submit_message() dépose le message d'un
+  joueur et rend un numéro de tour, get_reply() attend la réponse
+  de Jeanne pour ce tour (send() fait les deux)
+- Les tours d'une même session sont joués dans l'ordre, un par un
+- Limites de concurrence : messages en attente de réponse par session
+  (au-delà, refus immédiat), tours joués en même temps par le moteur
+  (les autres attendent leur tour), nombre de sessions
+- Les sessions inactives sont fermées automatiquement, y compris
+  celles dont les réponses prêtes ne sont jamais récupérées
+- Les agents des sessions sont silencieux (quiet) : rien n'est affiché
+  dans la console du processus hôte
+
+Exemple :
+    engine = SessionEngine()
+    session_id = await engine.create_session("bank_fraud")
+    reply = await engine.send(session_id, "Bonjour, ici votre banque")
+    print(reply["response"], reply["sound_effects"])
+    await engine.close_session(session_id)
+"""
+
+import asyncio
+import sqlite3
+import time
+import uuid
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+from config import SimulationConfig
+from utils.memory import ConversationManager
+from utils.perf import percentiles
+from utils.session_log import SessionLog, rotate_logs
+from utils.transcript_index import TranscriptIndex
+
+if TYPE_CHECKING:
+    from agents import VictimAgent, DirectorAgent, ModeratorAgent
+
+
+# Résultats de SessionEngine.submit_message
+ACCEPTED = "accepted"
+UNKNOWN_SESSION = "unknown_session"
+SESSION_BUSY = "session_busy"
+
+
+class EngineSession:
+    """
+    Une partie hébergée par le moteur.
+
+    Attributes:
+        session_id: Identifiant de la session
+        scenario: Le scénario joué
+        audience_mode: Votes (simulés) de l'audience tous les N tours
+        victim, director, moderator: Les agents de la session
+        conversation: Historique et statistiques de la session
+        turn: Nombre de messages reçus
+        last_active: Date (time.monotonic) du dernier message ou de la dernière réponse
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        scenario: str,
+        audience_mode: bool,
+        pipelined: bool,
+        victim: "VictimAgent",
+        director: "DirectorAgent",
+        moderator: "ModeratorAgent",
+        conversation: ConversationManager
+    ):
+        self.session_id = session_id
+        self.scenario = scenario
+        self.audience_mode = audience_mode
+        self.pipelined = pipelined
+        self.victim = victim
+        self.director = director
+        self.moderator = moderator
+        self.conversation = conversation
+        self.turn = 0
+        self.last_active = time.monotonic()
+
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.replies: Dict[int, asyncio.Future] = {}
+        self.worker: Optional[asyncio.Task] = None
+        self._pending_objective: Optional[asyncio.Task] = None
+
+    async def play_turn(self, turn: int, scammer_input: str) -> Dict:
+        """
+        Joue un tour : Directeur, vote éventuel, réponse de Jeanne.
+
+        Même déroulé que TheatreSimulation._aplay_turn, sans affichage
+        (agents construits en mode quiet).
+
+        Args:
+            turn: Numéro du tour
+            scammer_input: Le message du joueur
+
+        Returns:
+            Dict: Réponse de Jeanne, effets sonores, étape, contrainte du vote
+        """
+        start = time.perf_counter()
+        if self.pipelined:
+            # L'étape enregistrée tient compte de l'analyse du tour précédent
+            await self.apply_pending_objective()
+        self.conversation.add_message(
+            "scammer",
+            scammer_input,
+            metadata={"stage": self.director.current_stage + 1}
+        )
+        recent_history = self.conversation.get_recent_history(n=4)
+
+        if self.pipelined:
+            self._pending_objective = asyncio.create_task(
+                self.director.aanalyze_and_update(
+                    scammer_message=scammer_input,
+                    recent_history=recent_history
+                )
+            )
+        else:
+            self.victim.update_objective(await self.director.aanalyze_and_update(
+                scammer_message=scammer_input,
+                recent_history=recent_history
+            ))
+
+        constraint = None
+        if self.audience_mode and turn % SimulationConfig.AUDIENCE_VOTE_FREQUENCY == 0:
+            choices = await self.moderator.agenerate_choices(self.conversation.get_recent_history(n=2))
+            constraint = self.moderator.run_vote(choices, simulate=True)["winner"]
+            self.victim.set_audience_constraint(constraint)
+
+        response = await self.victim.arespond(scammer_input)
+        effects = [event.effect for event in self.victim.last_effects]
+        self.conversation.add_message("victim", response, metadata={"sound_effects": effects})
+
+        return {
+            "session_id": self.session_id,
+            "turn": turn,
+            "response": response,
+            "sound_effects": effects,
+            "stage": self.director.current_stage + 1,
+            "audience_constraint": constraint,
+            "latency": time.perf_counter() - start
+        }
+
+    async def apply_pending_objective(self):
+        """Attend l'analyse en cours du Directeur et applique son objectif."""
+        if self._pending_objective is None:
+            return
+
+        task, self._pending_objective = self._pending_objective, None
+        try:
+            self.victim.update_objective(await task)
+        except Exception as e:
+            print(f"⚠️ Erreur Directeur ({self.session_id}): {e}")
+
+    def outstanding(self) -> int:
+        """Messages reçus dont la réponse n'a pas encore été récupérée."""
+        return len(self.replies)
+
+    def busy(self) -> bool:
+        """True si un tour est en cours ou en attente d'être joué."""
+        return any(not future.done() for future in self.replies.values())
+
+
+class SessionEngine:
+    """
+    Registre de sessions et API submit_message / get_reply.
+
+    Le moteur n'est pas thread-safe : toutes ses méthodes sont appelées
+    depuis la même boucle asyncio (serveur web, bot, benchmark...).
+
+    Attributes:
+        sessions: Sessions ouvertes, par identifiant
+        max_sessions: Nombre maximal de sessions ouvertes
+        max_pending: Messages en attente de réponse par session
+        idle_timeout: Inactivité (s) avant fermeture automatique (0 = jamais)
+        stats: Compteurs (sessions créées/fermées, tours joués, refus...)
+    """
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        max_concurrent_turns: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        session_log: Optional[bool] = None
+    ):
+        """
+        Initialise le moteur (les valeurs par défaut viennent de SimulationConfig).
+
+        Args:
+            max_sessions: Nombre maximal de sessions ouvertes
+            max_concurrent_turns: Tours joués en même temps, toutes sessions confondues
+            max_pending: Messages en attente de réponse par session
+            idle_timeout: Inactivité (s) avant fermeture automatique (0 = jamais)
+            session_log: Journal JSONL pour chaque session
+        """
+        self.max_sessions = max_sessions or SimulationConfig.ENGINE_MAX_SESSIONS
+        self.max_pending = max_pending or SimulationConfig.ENGINE_SESSION_MAX_PENDING
+        self.idle_timeout = SimulationConfig.ENGINE_SESSION_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.session_log = SimulationConfig.SESSION_LOG if session_log is None else session_log
+
+        self.sessions: Dict[str, EngineSession] = {}
+        self.stats: Counter = Counter()
+
+        self._turn_slots = asyncio.Semaphore(max_concurrent_turns or SimulationConfig.ENGINE_MAX_CONCURRENT_TURNS)
+        # Sessions en cours de construction : elles comptent déjà dans max_sessions
+        self._opening: Set[str] = set()
+        self._latencies: deque = deque(maxlen=SimulationConfig.PERF_WINDOW)
+        self._reaper: Optional[asyncio.Task] = None
+
+        if self.session_log:
+            rotate_logs(SimulationConfig.SESSION_LOG_DIR, keep=SimulationConfig.SESSION_LOG_KEEP)
+
+    async def create_session(
+        self,
+        scenario: str = "tech_support",
+        audience_mode: bool = False,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        Ouvre une session avec ses propres agents.
+
+        Les agents sont construits dans un thread : la boucle continue de
+        servir les autres sessions pendant ce temps.
+
+        Args:
+            scenario: Le scénario joué
+            audience_mode: Active les votes (simulés) de l'audience
+            session_id: Identifiant imposé (défaut: aléatoire)
+
+        Returns:
+            str: Identifiant de la session
+
+        Raises:
+            ValueError: Si l'identifiant est déjà utilisé
+            RuntimeError: Si le nombre maximal de sessions est atteint
+        """
+        session_id = session_id or uuid.uuid4().hex[:12]
+        if session_id in self.sessions or session_id in self._opening:
+            raise ValueError(f"Session déjà ouverte: {session_id}")
+        if len(self.sessions) + len(self._opening) >= self.max_sessions:
+            await self.close_idle()
+            if len(self.sessions) + len(self._opening) >= self.max_sessions:
+                self.stats["sessions_refused"] += 1
+                raise RuntimeError(f"Nombre maximal de sessions atteint ({self.max_sessions})")
+            if session_id in self.sessions or session_id in self._opening:
+                raise ValueError(f"Session déjà ouverte: {session_id}")
+
+        # La place est réservée avant la construction (pendant laquelle
+        # d'autres create_session s'exécutent) et libérée en cas d'échec
+        self._opening.add(session_id)
+        try:
+            session = await asyncio.to_thread(self._build_session, session_id, scenario, audience_mode)
+        finally:
+            self._opening.discard(session_id)
+
+        session.worker = asyncio.create_task(self._serve(session))
+        self.sessions[session_id] = session
+        self.stats["sessions_created"] += 1
+
+        if self.idle_timeout and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+        return session_id
+
+    def submit_message(self, session_id: str, text: str) -> Tuple[str, Optional[int]]:
+        """
+        Dépose le message d'un joueur ; la réponse est jouée en arrière-plan.
+
+        Args:
+            session_id: La session du joueur
+            text: Le message de l'arnaqueur
+
+        Returns:
+            Tuple[str, Optional[int]]: Résultat (ACCEPTED, UNKNOWN_SESSION,
+                                       SESSION_BUSY) et numéro du tour si accepté
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            self.stats[UNKNOWN_SESSION] += 1
+            return UNKNOWN_SESSION, None
+        if session.outstanding() >= self.max_pending:
+            self.stats[SESSION_BUSY] += 1
+            return SESSION_BUSY, None
+
+        session.turn += 1
+        session.last_active = time.monotonic()
+        session.replies[session.turn] = asyncio.get_running_loop().create_future()
+        session.inbox.put_nowait((session.turn, text))
+        self.stats[ACCEPTED] += 1
+        return ACCEPTED, session.turn
+
+    async def get_reply(self, session_id: str, turn: int, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Attend la réponse de Jeanne pour un tour.
+
+        La réponse n'est rendue qu'une fois : elle libère une place dans
+        la limite de messages en attente de la session.
+
+        Args:
+            session_id: La session du joueur
+            turn: Numéro rendu par submit_message
+            timeout: Attente maximale en secondes (None = sans limite)
+
+        Returns:
+            Optional[Dict]: La réponse (voir EngineSession.play_turn), {"error": ...}
+                            si le tour a échoué, ou None si le tour est inconnu,
+                            la session fermée ou le délai dépassé
+        """
+        session = self.sessions.get(session_id)
+        if session is None or turn not in session.replies:
+            return None
+
+        future = session.replies[turn]
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return None
+        except asyncio.CancelledError:
+            # Session fermée pendant l'attente ; sinon c'est l'appelant qui est annulé
+            if future.cancelled():
+                return None
+            raise
+        except Exception:
+            pass
+
+        session.replies.pop(turn, None)
+        if future.exception() is not None:
+            return {"session_id": session_id, "turn": turn, "error": str(future.exception())}
+        return future.result()
+
+    async def send(self, session_id: str, text: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Envoie un message et attend la réponse (submit_message puis get_reply).
+
+        Args:
+            session_id: La session du joueur
+            text: Le message de l'arnaqueur
+            timeout: Attente maximale en secondes
+
+        Returns:
+            Dict: La réponse, ou {"error": ...} si le message est refusé ou sans réponse
+        """
+        status, turn = self.submit_message(session_id, text)
+        if status != ACCEPTED:
+            return {"session_id": session_id, "error": status}
+
+        reply = await self.get_reply(session_id, turn, timeout)
+        return reply if reply is not None else {"session_id": session_id, "turn": turn, "error": "timeout"}
+
+    async def close_session(self, session_id: str) -> Optional[Dict]:
+        """
+        Ferme une session : réponses en attente annulées, journal fermé et indexé.
+
+        Args:
+            session_id: La session à fermer
+
+        Returns:
+            Optional[Dict]: Statistiques de la conversation (None si session inconnue)
+        """
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+
+        session.worker.cancel()
+        await asyncio.gather(session.worker, return_exceptions=True)
+        await session.apply_pending_objective()
+        for future in session.replies.values():
+            future.cancel()
+
+        stats = session.conversation.get_statistics()
+        log = session.conversation.session_log
+        session.conversation.close()
+        if log is not None and SimulationConfig.TRANSCRIPT_INDEX:
+            await asyncio.to_thread(self._index_log, str(log.path))
+
+        self.stats["sessions_closed"] += 1
+        return stats
+
+    async def close_idle(self) -> int:
+        """
+        Ferme les sessions inactives depuis plus de idle_timeout secondes.
+
+        Une session dont un tour est en cours ou en attente n'est pas
+        inactive ; des réponses prêtes mais jamais récupérées ne la
+        retiennent pas (le délai court depuis la dernière réponse).
+
+        Returns:
+            int: Nombre de sessions fermées
+        """
+        if not self.idle_timeout:
+            return 0
+
+        now = time.monotonic()
+        idle = [
+            session_id for session_id, session in self.sessions.items()
+            if now - session.last_active > self.idle_timeout and not session.busy()
+        ]
+        for session_id in idle:
+            await self.close_session(session_id)
+        self.stats["sessions_expired"] += len(idle)
+        return len(idle)
+
+    async def shutdown(self):
+        """Ferme toutes les sessions et arrête la fermeture automatique."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        for session_id in list(self.sessions):
+            await self.close_session(session_id)
+
+    def snapshot(self) -> Dict:
+        """
+        État du moteur.
+
+        Returns:
+            Dict: Sessions ouvertes, messages en attente, compteurs et latence des tours (ms)
+        """
+        return {
+            "sessions": len(self.sessions),
+            "outstanding": sum(s.outstanding() for s in self.sessions.values()),
+            "counters": dict(self.stats),
+            "turn_latency_ms": percentiles(list(self._latencies))
+        }
+
+    def _build_session(self, session_id: str, scenario: str, audience_mode: bool) -> EngineSession:
+        """Construit les agents et l'historique d'une session (dans un thread)."""
+        from agents import VictimAgent, DirectorAgent, ModeratorAgent
+
+        victim = VictimAgent(quiet=True)
+
+        log = None
+        if self.session_log:
+            log = SessionLog(
+                SimulationConfig.SESSION_LOG_DIR,
+                scenario=scenario,
+                fsync_every=SimulationConfig.SESSION_LOG_FSYNC_EVERY,
+                fsync_interval=SimulationConfig.SESSION_LOG_FSYNC_INTERVAL,
+                session_id=session_id
+            )
+
+        return EngineSession(
+            session_id=session_id,
+            scenario=scenario,
+            audience_mode=audience_mode,
+            pipelined=SimulationConfig.PIPELINED_DIRECTOR,
+            victim=victim,
+            director=DirectorAgent(scenario=scenario, quiet=True),
+            moderator=ModeratorAgent(quiet=True),
+            conversation=ConversationManager(
+                scenario=scenario,
+                max_messages=SimulationConfig.HISTORY_MEMORY_MESSAGES,
+                spill_dir=SimulationConfig.HISTORY_SPILL_DIR,
+                session_log=log
+            )
+        )
+
+    async def _serve(self, session: EngineSession):
+        """Joue les messages d'une session dans l'ordre, un tour à la fois."""
+        while True:
+            turn, text = await session.inbox.get()
+            future = session.replies.get(turn)
+
+            async with self._turn_slots:
+                try:
+                    reply = await session.play_turn(turn, text)
+                except Exception as e:
+                    self.stats["turn_errors"] += 1
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                    continue
+
+            session.last_active = time.monotonic()
+            self.stats["turns"] += 1
+            self._latencies.append(reply["latency"])
+            if future is not None and not future.done():
+                future.set_result(reply)
+
+    async def _reap_idle(self):
+        """Ferme périodiquement les sessions inactives."""
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 2))
+            await self.close_idle()
+
+    def _index_log(self, path: str):
+        """Ajoute le journal d'une session fermée à l'index de recherche."""
+        try:
+            index = TranscriptIndex(SimulationConfig.TRANSCRIPT_INDEX_PATH)
+            index.update([path])
+            index.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Indexation de la session impossible: {e}")
@@ -0,0 +1,187 @@
+"""
+Journal de session
+==================
+
+Chaque message de la conversation est ajouté, au moment où il arrive,
+à un fichier JSONL propre à la session (une ligne par événement) :
+un plantage ou un Ctrl-C ne fait plus perdre la partie.
+
+- Écriture en ajout seul, coût constant par message
+- flush() à chaque événement (survit à un plantage du processus),
+  fsync() groupé : tous les N événements ou toutes les X secondes
+  (survit, à cette fenêtre près, à une coupure de la machine)
+- La transcription lisible (.txt) se reconstruit à la demande depuis
+  le journal (render_transcript)
+- Au démarrage, les anciens journaux inactifs sont compressés (gzip)
+  et seuls les plus récents sont conservés
+"""
+
+import gzip
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+class SessionLog:
+    """
+    Journal JSONL d'une session.
+
+    Attributes:
+        session_id: Identifiant de la session
+        path: Chemin du journal
+        events: Nombre d'événements écrits
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        scenario: str,
+        fsync_every: int = 20,
+        fsync_interval: float = 1.0,
+        session_id: Optional[str] = None
+    ):
+        """
+        Crée le journal de la session et écrit l'événement d'ouverture.
+
+        Args:
+            directory: Dossier des journaux
+            scenario: Le scénario de la session
+            fsync_every: fsync après ce nombre d'événements
+            fsync_interval: fsync si la dernière synchronisation date de plus de X secondes
+            session_id: Identifiant de la session (défaut: date + identifiant aléatoire)
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        if session_id is None:
+            session_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.session_id = session_id
+        self.path = Path(directory) / f"session_{session_id}.jsonl"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.events = 0
+
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self.append({"type": "session", "scenario": scenario, "start": time.time()})
+
+    def append(self, event: Dict):
+        """
+        Ajoute un événement au journal.
+
+        Args:
+            event: L'événement (sérialisable en JSON)
+        """
+        if self._file is None:
+            return
+
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.events += 1
+        self._unsynced += 1
+
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Force l'écriture sur disque des événements en attente."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        """Synchronise et ferme le journal."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+
+def read_events(path: str) -> Iterator[Dict]:
+    """
+    Relit les événements d'un journal (.jsonl ou .jsonl.gz).
+
+    Une dernière ligne tronquée (plantage pendant l'écriture) est ignorée.
+
+    Args:
+        path: Chemin du journal
+
+    Yields:
+        Dict: Les événements, dans l'ordre
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def render_transcript(path: str) -> str:
+    """
+    Reconstruit la transcription lisible d'une session depuis son journal.
+
+    Args:
+        path: Chemin du journal
+
+    Returns:
+        str: Transcription au format de ConversationManager.get_full_transcript
+    """
+    from utils.memory import ConversationManager, Message
+
+    conversation = None
+    for event in read_events(path):
+        kind = event.get("type")
+        if kind == "session":
+            conversation = ConversationManager(scenario=event.get("scenario", "?"))
+            conversation.start_time = datetime.fromtimestamp(event["start"])
+        elif kind == "reset" and conversation is not None:
+            conversation.history.clear()
+            conversation.turn_count = 0
+            conversation.start_time = datetime.fromtimestamp(event["start"])
+        elif kind == "message" and conversation is not None:
+            message = Message.from_dict(event)
+            conversation.history.append(message)
+            if message.role in ["scammer", "victim"]:
+                conversation.turn_count += 1
+
+    if conversation is None:
+        raise ValueError(f"Journal de session invalide: {path}")
+    return conversation.get_full_transcript()
+
+
+def rotate_logs(directory: str, keep: int = 20, idle_seconds: float = 3600):
+    """
+    Compresse les journaux inactifs et supprime les plus anciens.
+
+    Un journal non modifié depuis idle_seconds est considéré comme terminé
+    (une autre session peut tourner en parallèle dans le même dossier).
+
+    Args:
+        directory: Dossier des journaux
+        keep: Nombre de journaux conservés (compressés ou non)
+        idle_seconds: Inactivité avant compression
+    """
+    folder = Path(directory)
+    if not folder.is_dir():
+        return
+
+    now = time.time()
+    for log in folder.glob("session_*.jsonl"):
+        if now - log.stat().st_mtime < idle_seconds:
+            continue
+        with open(log, "rb") as src, gzip.open(f"{log}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        log.unlink()
+
+    archives = sorted(folder.glob("session_*.jsonl.gz"), key=lambda p: p.stat().st_mtime, reverse=True)
+    active = len(list(folder.glob("session_*.jsonl")))
+    for old in archives[max(0, keep - active):]:
+        old.unlink()
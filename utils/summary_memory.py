@@ -0,0 +1,234 @@
+"""
+Mémoire à budget de tokens pour la Victime
+==========================================
+
+ConversationBufferMemory renvoie tout l'historique à chaque appel :
+la taille du prompt, la latence et le coût grossissent à chaque tour,
+jusqu'à dépasser la fenêtre de contexte lors d'un long appel.
+
+BudgetedSummaryMemory garde :
+- les N derniers échanges mot pour mot
+- un résumé courant de tout ce qui précède
+
+Les échanges qui sortent de la fenêtre sont résumés EN ARRIÈRE-PLAN
+(thread dédié), hors du chemin de réponse. En attendant, ils restent
+disponibles tels quels, dans la limite du budget : la taille du prompt
+reste à peu près constante quelle que soit la durée de l'appel.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain.memory.chat_memory import BaseChatMemory
+from langchain_core.messages import BaseMessage, SystemMessage, get_buffer_string
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import PrivateAttr
+
+
+# Pool partagé par toutes les mémoires du processus (peu de résumés simultanés)
+_summary_executor: Optional[ThreadPoolExecutor] = None
+_summary_executor_lock = threading.Lock()
+
+
+def _get_summary_executor() -> ThreadPoolExecutor:
+    global _summary_executor
+    with _summary_executor_lock:
+        if _summary_executor is None:
+            _summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summary")
+        return _summary_executor
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimation rapide du nombre de tokens (≈ 4 caractères par token).
+
+    On évite volontairement les compteurs exacts : celui de Gemini fait
+    un appel réseau, ce qui ralentirait chaque tour.
+    """
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Coupe un texte pour qu'il tienne dans max_tokens (même estimation).
+
+    Args:
+        text: Le texte à couper
+        max_tokens: Nombre de tokens disponibles
+
+    Returns:
+        str: Le texte, ou son début suivi de "…"
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, (max_tokens - 1) * 4 - 1)].rstrip() + "…"
+
+
+SUMMARY_SYSTEM_PROMPT = """
+# 📝 RÔLE : Résumeur de conversation
+
+Tu résumes un appel téléphonique entre un arnaqueur et Mme Jeanne Dubois (78 ans).
+Garde uniquement ce qui est utile pour la suite : identité annoncée par l'arnaqueur,
+ce qu'il a demandé, les excuses et inventions déjà utilisées par Jeanne
+(noms, codes faux, événements), et le ton de l'échange.
+Réponds en quelques phrases, sans introduction.
+"""
+
+
+class BudgetedSummaryMemory(BaseChatMemory):
+    """
+    Mémoire conversationnelle bornée en tokens avec résumé en arrière-plan.
+
+    Attributes:
+        llm: Modèle utilisé pour les résumés
+        memory_key: Nom de la variable injectée dans le prompt
+        keep_exchanges: Nombre d'échanges (question + réponse) gardés tels quels
+        max_tokens: Budget total (résumé + messages) renvoyé au prompt
+        summary: Résumé courant des échanges plus anciens
+    """
+
+    llm: Any
+    memory_key: str = "chat_history"
+    keep_exchanges: int = 4
+    max_tokens: int = 2000
+    summary: str = ""
+
+    # Messages sortis de la fenêtre, pas encore intégrés au résumé
+    _pending: List[BaseMessage] = PrivateAttr(default_factory=list)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _summarizing: bool = PrivateAttr(default=False)
+    _summary_chain: Any = PrivateAttr(default=None)
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Construit l'historique à injecter, dans la limite du budget.
+
+        Le dernier échange est toujours gardé mot pour mot. Le résumé passe
+        ensuite (tronqué s'il dépasse ce qui reste du budget), puis les
+        messages plus anciens (fenêtre et messages en attente de résumé)
+        tant que le budget le permet.
+        """
+        with self._lock:
+            summary = self.summary
+            candidates = self._pending + list(self.chat_memory.messages)
+
+        last_exchange = candidates[-2:]
+        older = candidates[:-2]
+        used = sum(estimate_tokens(str(m.content)) for m in last_exchange)
+
+        history: List[BaseMessage] = []
+        if summary:
+            header = "RÉSUMÉ DE L'APPEL JUSQU'ICI: "
+            room = self.max_tokens - used - estimate_tokens(header)
+            if room > 0:
+                history.append(SystemMessage(content=header + truncate_to_tokens(summary, room)))
+                used += estimate_tokens(history[0].content)
+
+        recent: List[BaseMessage] = []
+        for message in reversed(older):
+            cost = estimate_tokens(str(message.content))
+            if used + cost > self.max_tokens:
+                break
+            recent.append(message)
+            used += cost
+
+        history.extend(reversed(recent))
+        history.extend(last_exchange)
+        return {self.memory_key: history}
+
+    async def aload_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.load_memory_variables(inputs)
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        """Ajoute l'échange puis sort de la fenêtre les plus anciens."""
+        super().save_context(inputs, outputs)
+        self._roll_window()
+
+    async def asave_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        await super().asave_context(inputs, outputs)
+        self._roll_window()
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self.summary = ""
+            self._pending = []
+
+    def wait_for_summary(self, timeout: float = 30.0):
+        """
+        Attend la fin des résumés en cours (utile en batch ou en test).
+
+        Args:
+            timeout: Attente maximale en secondes
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._summarizing:
+                    return
+            time.sleep(0.01)
+
+    def _roll_window(self):
+        """Déplace les échanges hors fenêtre vers la file de résumé."""
+        messages = self.chat_memory.messages
+        overflow = len(messages) - 2 * self.keep_exchanges
+        if overflow <= 0:
+            return
+
+        with self._lock:
+            self._pending.extend(messages[:overflow])
+            self.chat_memory.messages = messages[overflow:]
+            if self._summarizing:
+                return
+            self._summarizing = True
+
+        _get_summary_executor().submit(self._summarize_pending)
+
+    def _summarize_pending(self):
+        """Intègre les messages en attente au résumé (thread d'arrière-plan)."""
+        while True:
+            with self._lock:
+                batch = list(self._pending)
+                summary = self.summary
+                if not batch:
+                    self._summarizing = False
+                    return
+
+            try:
+                new_summary = self._get_summary_chain().invoke({
+                    "summary": summary or "(aucun)",
+                    "new_lines": get_buffer_string(batch, human_prefix="Arnaqueur", ai_prefix="Jeanne")
+                })
+            except Exception as e:
+                print(f"⚠️ Erreur résumé mémoire: {e}")
+                with self._lock:
+                    self._summarizing = False
+                return
+
+            with self._lock:
+                self.summary = new_summary.strip()
+                del self._pending[:len(batch)]
+
+    def _get_summary_chain(self):
+        if self._summary_chain is None:
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", SUMMARY_SYSTEM_PROMPT),
+                ("human", """
+RÉSUMÉ ACTUEL:
+{summary}
+
+NOUVEAUX ÉCHANGES:
+{new_lines}
+
+Nouveau résumé:
+""")
+            ])
+            self._summary_chain = prompt | self.llm | StrOutputParser()
+        return self._summary_chain
@@ -0,0 +1,315 @@
+"""
+Index des transcriptions
+========================
+
+Index inversé sur disque (SQLite FTS5) de toutes les répliques des
+transcriptions (.txt produits par get_full_transcript) et des journaux
+de session (.jsonl / .jsonl.gz).
+
+Chaque réplique est indexée avec : son texte (sans accents ni casse),
+le rôle, le scénario, les effets sonores et l'étape du script (connue
+seulement pour les journaux de session).
+
+La mise à jour est incrémentale : un fichier déjà indexé et inchangé
+(taille, date de modification) n'est pas relu ; un fichier disparu
+(journal compressé par la rotation, par exemple) sort de l'index.
+
+SYNTAXE DES RECHERCHES :
+    anydesk                         mots du texte (tous requis)
+    "carte cadeau"                  expression exacte
+    role:scammer / role:victim      rôle
+    effect:KETTLE_WHISTLE           effet sonore
+    scenario:bank_fraud             scénario
+    stage:3                         étape du script (journaux uniquement)
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.session_log import read_events
+
+
+ROLE_NAMES = {"ARNAQUEUR": "scammer", "JEANNE": "victim"}
+
+_FILTER_PATTERN = re.compile(r'(role|effect|scenario|stage):(\S+)')
+
+# Version du schéma (PRAGMA user_version) ; un index plus ancien est
+# reconstruit à partir des fichiers
+SCHEMA_VERSION = 1
+
+
+def parse_transcript(path: str) -> Tuple[str, List[Dict]]:
+    """
+    Découpe une transcription .txt en répliques.
+
+    Args:
+        path: Chemin de la transcription
+
+    Returns:
+        Tuple[str, List[Dict]]: Scénario et répliques (turn, role, content, effects)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    scenario = "?"
+    turns: List[Dict] = []
+    current: Optional[Dict] = None
+
+    def close_turn():
+        if current is not None:
+            current["content"] = "\n".join(current.pop("lines")).strip()
+            turns.append(current)
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("🎬 Scénario:"):
+            scenario = stripped.split(":", 1)[1].strip()
+        elif stripped in ("ARNAQUEUR:", "JEANNE:"):
+            close_turn()
+            current = {"turn": len(turns), "role": ROLE_NAMES[stripped[:-1]], "lines": [], "effects": []}
+        elif stripped.startswith("=" * 10) or stripped == "FIN DE LA TRANSCRIPTION":
+            close_turn()
+            current = None
+        elif current is not None and stripped.startswith("🔊 [Effets:"):
+            current["effects"] = [e.strip() for e in stripped[len("🔊 [Effets:"):].rstrip("]").split(",") if e.strip()]
+        elif current is not None:
+            current["lines"].append(line)
+
+    close_turn()
+    return scenario, turns
+
+
+def parse_session_log(path: str) -> Tuple[str, List[Dict]]:
+    """
+    Extrait les répliques d'un journal de session.
+
+    Args:
+        path: Chemin du journal (.jsonl ou .jsonl.gz)
+
+    Returns:
+        Tuple[str, List[Dict]]: Scénario et répliques (turn, role, content, effects, stage)
+    """
+    scenario = "?"
+    turns: List[Dict] = []
+    stage = None
+
+    for event in read_events(path):
+        kind = event.get("type")
+        if kind == "session":
+            scenario = event.get("scenario", "?")
+        elif kind == "message" and event.get("role") in ("scammer", "victim"):
+            metadata = event.get("metadata") or {}
+            if event["role"] == "scammer":
+                stage = metadata.get("stage", stage)
+            turns.append({
+                "turn": event.get("turn", len(turns)),
+                "role": event["role"],
+                "content": event["content"],
+                "effects": metadata.get("sound_effects") or [],
+                "stage": stage
+            })
+
+    return scenario, turns
+
+
+class TranscriptIndex:
+    """
+    Index inversé des transcriptions et journaux de session.
+
+    Attributes:
+        path: Fichier SQLite de l'index
+    """
+
+    def __init__(self, path: str):
+        """
+        Ouvre (ou crée) l'index.
+
+        Args:
+            path: Fichier SQLite de l'index
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS documents")
+            self._conn.execute("DROP TABLE IF EXISTS turns")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        # Les répliques d'un document occupent les rowid first_rowid à
+        # first_rowid + turn_count - 1 de turns : les retirer ne parcourt
+        # pas toute la table
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                scenario TEXT,
+                first_rowid INTEGER NOT NULL,
+                turn_count INTEGER NOT NULL
+            )
+        """)
+        # Texte et effets indexés ; le reste sert de filtre et d'affichage
+        self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS turns USING fts5(
+                content,
+                effects,
+                role UNINDEXED,
+                scenario UNINDEXED,
+                stage UNINDEXED,
+                doc_id UNINDEXED,
+                turn UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        self._conn.commit()
+
+    def update(self, paths: Iterable[str]) -> Dict[str, int]:
+        """
+        Indexe les fichiers nouveaux ou modifiés, retire les fichiers disparus.
+
+        Args:
+            paths: Fichiers ou dossiers (.txt, .jsonl, .jsonl.gz)
+
+        Returns:
+            Dict[str, int]: Fichiers indexés, inchangés et retirés
+        """
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0}
+
+        with self._lock:
+            for file in _expand(paths):
+                stat = file.stat()
+                row = self._conn.execute(
+                    "SELECT id, mtime, size FROM documents WHERE path = ?", (str(file),)
+                ).fetchone()
+                if row and row[1] == stat.st_mtime and row[2] == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+
+                try:
+                    if file.suffix == ".txt":
+                        scenario, turns = parse_transcript(str(file))
+                    else:
+                        scenario, turns = parse_session_log(str(file))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠️ Fichier ignoré ({file}): {e}")
+                    continue
+
+                if row:
+                    self._delete_document(row[0])
+                last = self._conn.execute("SELECT rowid FROM turns ORDER BY rowid DESC LIMIT 1").fetchone()
+                first_rowid = (last[0] if last else 0) + 1
+                cursor = self._conn.execute(
+                    "INSERT INTO documents (path, mtime, size, scenario, first_rowid, turn_count) VALUES (?, ?, ?, ?, ?, ?)",
+                    (str(file), stat.st_mtime, stat.st_size, scenario, first_rowid, len(turns))
+                )
+                self._conn.executemany(
+                    "INSERT INTO turns (rowid, content, effects, role, scenario, stage, doc_id, turn) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (first_rowid + i, t["content"], " ".join(t["effects"]), t["role"], scenario,
+                         t.get("stage"), cursor.lastrowid, t["turn"])
+                        for i, t in enumerate(turns)
+                    ]
+                )
+                counts["indexed"] += 1
+
+            for doc_id, path in self._conn.execute("SELECT id, path FROM documents").fetchall():
+                if not Path(path).exists():
+                    self._delete_document(doc_id)
+                    counts["removed"] += 1
+
+            self._conn.commit()
+
+        return counts
+
+    def search(self, query: str, limit: int = 50) -> List[Dict]:
+        """
+        Cherche les répliques correspondant à la requête.
+
+        Args:
+            query: Mots et filtres (voir la syntaxe en tête de module)
+            limit: Nombre maximal de résultats
+
+        Returns:
+            List[Dict]: Répliques trouvées, dans l'ordre d'indexation
+                        (path, scenario, turn, role, stage, effects, content)
+        """
+        filters = dict((key, value) for key, value in _FILTER_PATTERN.findall(query))
+        text = _FILTER_PATTERN.sub("", query).strip()
+
+        match_parts = []
+        terms = _fts_terms(text)
+        if terms:
+            match_parts.append(f"content : ({terms})")
+        if "effect" in filters:
+            match_parts.append(f'effects : "{filters["effect"].replace(chr(34), "")}"')
+
+        conditions, params = [], []
+        if match_parts:
+            conditions.append("turns MATCH ?")
+            params.append(" AND ".join(match_parts))
+        for key in ("role", "scenario", "stage"):
+            if key in filters:
+                value = filters[key]
+                conditions.append(f"turns.{key} = ?")
+                params.append(int(value) if key == "stage" and value.isdigit() else value)
+
+        sql = """
+            SELECT documents.path, turns.scenario, turns.turn, turns.role,
+                   turns.stage, turns.effects, turns.content
+            FROM turns JOIN documents ON documents.id = turns.doc_id
+        """
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY turns.rowid LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                "path": path, "scenario": scenario, "turn": turn, "role": role,
+                "stage": stage, "effects": effects.split() if effects else [], "content": content
+            }
+            for path, scenario, turn, role, stage, effects, content in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _delete_document(self, doc_id: int):
+        first_rowid, turn_count = self._conn.execute(
+            "SELECT first_rowid, turn_count FROM documents WHERE id = ?", (doc_id,)
+        ).fetchone()
+        self._conn.execute(
+            "DELETE FROM turns WHERE rowid BETWEEN ? AND ?", (first_rowid, first_rowid + turn_count - 1)
+        )
+        self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+
+def _expand(paths: Iterable[str]) -> List[Path]:
+    """Fichiers indexables d'une liste de fichiers et de dossiers."""
+    files = []
+    for p in (Path(path).resolve() for path in paths):
+        if p.is_dir():
+            files.extend(sorted(p.glob("transcript_*.txt")))
+            files.extend(sorted(p.glob("session_*.jsonl")))
+            files.extend(sorted(p.glob("session_*.jsonl.gz")))
+        elif p.is_file():
+            files.append(p)
+    return files
+
+
+def _fts_terms(text: str) -> str:
+    """Requête libre → requête FTS5 : expressions entre guillemets gardées, mots échappés."""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+        value = (phrase or word).replace('"', "")
+        if value:
+            terms.append(f'"{value}"')
+    return " AND ".join(terms)
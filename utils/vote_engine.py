@@ -0,0 +1,212 @@
+"""
+Moteur de vote de l'audience
+============================
+
+- VoteWindow : un tour de vote limité dans le temps. Les votes sont
+  répartis sur un nombre fixe de bandes (par hachage de l'identifiant du
+  spectateur), chacune avec son verrou, ses votants et ses compteurs :
+  pas de verrou global à chaque vote, et une mémoire qui ne dépend pas
+  du nombre de threads du serveur. Les bandes sont additionnées au
+  décompte.
+
+- VoteSimulator : audience simulée pour les répétitions. Les préférences
+  du public sont tirées d'une loi de Dirichlet, les votes d'une loi
+  multinomiale : un seul tirage NumPy, quelle que soit la taille du
+  public (100 ou 10 millions de spectateurs).
+
+Les résultats sont de simples listes d'entiers, consommées telles quelles
+par ModeratorAgent (vote_history, format_vote_result).
+"""
+
+import random
+import threading
+import time
+from typing import List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# Résultats de VoteWindow.cast
+VOTE_ACCEPTED = "accepted"
+VOTE_DUPLICATE = "duplicate"
+VOTE_INVALID = "invalid"
+VOTE_CLOSED = "closed"
+
+
+class VoteWindow:
+    """
+    Tour de vote à durée limitée avec compteurs répartis en bandes.
+
+    Attributes:
+        choices: Les propositions soumises au vote
+        deadline: Fin du vote (time.monotonic), None = sans limite
+        closed: True une fois le vote clos
+    """
+
+    def __init__(self, choices: List[str], duration: Optional[float] = None, stripes: int = 64):
+        """
+        Ouvre un tour de vote.
+
+        Args:
+            choices: Les propositions soumises au vote
+            duration: Durée du vote en secondes (None = jusqu'à close())
+            stripes: Nombre de bandes (verrou, votants et compteurs)
+        """
+        self.choices = list(choices)
+        self.deadline = time.monotonic() + duration if duration else None
+        self.closed = False
+
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._voters = [set() for _ in range(stripes)]
+        self._counts = [[0] * len(self.choices) for _ in range(stripes)]
+
+    def is_open(self) -> bool:
+        """True tant que le vote n'est ni clos ni expiré."""
+        return not self.closed and (self.deadline is None or time.monotonic() < self.deadline)
+
+    def remaining(self) -> float:
+        """Secondes restantes avant la fin du vote (0 si expiré ou sans limite)."""
+        if self.deadline is None or self.closed:
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cast(self, client_id: str, choice_index: int) -> str:
+        """
+        Enregistre le vote d'un spectateur (un seul vote par spectateur).
+
+        Args:
+            client_id: Identifiant du spectateur
+            choice_index: Index du choix (à partir de 0)
+
+        Returns:
+            str: VOTE_ACCEPTED, VOTE_DUPLICATE, VOTE_INVALID ou VOTE_CLOSED
+        """
+        if not 0 <= choice_index < len(self.choices):
+            return VOTE_INVALID
+
+        stripe = hash(client_id) % len(self._locks)
+        with self._locks[stripe]:
+            # Vérifié sous le verrou : close() prend toutes les bandes
+            # avant d'additionner, aucun vote ne peut arriver après
+            if not self.is_open():
+                return VOTE_CLOSED
+            voters = self._voters[stripe]
+            if client_id in voters:
+                return VOTE_DUPLICATE
+            voters.add(client_id)
+            self._counts[stripe][choice_index] += 1
+        return VOTE_ACCEPTED
+
+    def add_counts(self, counts: List[int]):
+        """
+        Ajoute des votes déjà agrégés (autre serveur, simulation).
+
+        Args:
+            counts: Votes par choix
+        """
+        with self._locks[0]:
+            shard = self._counts[0]
+            for i, count in enumerate(counts[:len(shard)]):
+                shard[i] += count
+
+    def tally(self) -> List[int]:
+        """
+        Additionne les compteurs de toutes les bandes.
+
+        Returns:
+            List[int]: Votes par choix
+        """
+        totals = [0] * len(self.choices)
+        for lock, counts in zip(self._locks, self._counts):
+            with lock:
+                for i, count in enumerate(counts):
+                    totals[i] += count
+        return totals
+
+    def close(self) -> List[int]:
+        """
+        Clôt le vote et retourne le décompte final.
+
+        Toutes les bandes sont verrouillées le temps de la clôture : un
+        vote en cours est compté avant, les suivants sont refusés.
+
+        Returns:
+            List[int]: Votes par choix
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self.closed = True
+            return [sum(column) for column in zip(*self._counts)]
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def voter_count(self) -> int:
+        """Nombre de spectateurs ayant voté."""
+        return sum(len(voters) for voters in self._voters)
+
+
+class VoteSimulator:
+    """
+    Audience simulée : préférences Dirichlet, votes multinomiaux.
+
+    Attributes:
+        concentration: Paramètre de la loi de Dirichlet (petit = public
+                       tranché, grand = votes équilibrés)
+    """
+
+    def __init__(self, seed: Optional[int] = None, concentration: float = 1.0):
+        """
+        Initialise le simulateur.
+
+        Args:
+            seed: Graine pour des répétitions reproductibles
+            concentration: Paramètre de la loi de Dirichlet
+        """
+        self.concentration = concentration
+        if NUMPY_AVAILABLE:
+            self._rng = np.random.default_rng(seed)
+        else:
+            self._rng = random.Random(seed)
+
+    def simulate(self, num_choices: int, audience_size: int) -> List[int]:
+        """
+        Simule un vote complet.
+
+        Args:
+            num_choices: Nombre de choix
+            audience_size: Nombre de votants
+
+        Returns:
+            List[int]: Votes par choix (somme = audience_size)
+        """
+        return self.simulate_rounds(num_choices, audience_size, 1)[0]
+
+    def simulate_rounds(self, num_choices: int, audience_size: int, rounds: int) -> List[List[int]]:
+        """
+        Simule plusieurs votes indépendants en un seul tirage vectorisé.
+
+        Args:
+            num_choices: Nombre de choix
+            audience_size: Nombre de votants par vote
+            rounds: Nombre de votes
+
+        Returns:
+            List[List[int]]: Votes par choix, pour chaque vote
+        """
+        if NUMPY_AVAILABLE:
+            preferences = self._rng.dirichlet([self.concentration] * num_choices, size=rounds)
+            return self._rng.multinomial(audience_size, preferences).tolist()
+
+        # Sans NumPy : préférences Dirichlet via des lois Gamma, votes tirés un par un
+        results = []
+        for _ in range(rounds):
+            weights = [self._rng.gammavariate(self.concentration, 1.0) for _ in range(num_choices)]
+            picks = self._rng.choices(range(num_choices), weights=weights, k=audience_size)
+            results.append([picks.count(i) for i in range(num_choices)])
+        return results